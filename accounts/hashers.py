@@ -0,0 +1,79 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, must_update_salt
+
+# Django's default; lower PASSWORD_HASH_ITERATIONS values are raised to it
+MIN_ITERATIONS = PBKDF2PasswordHasher.iterations
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _mark_pool_thread():
+    _local.in_pool = True
+
+
+def hash_pool():
+    """
+    The process-wide pool PASSWORD_HASH_WORKERS threads wide, or None when the
+    setting is 0 and hashes run on the calling thread.
+    """
+    global _pool
+    workers = getattr(settings, "PASSWORD_HASH_WORKERS", os.cpu_count())
+    if not workers:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                workers,
+                thread_name_prefix="password-hash",
+                initializer=_mark_pool_thread,
+            )
+    return _pool
+
+
+async def run_hashing(func, *args):
+    """
+    Await func(*args), e.g. check_password(), on hash_pool(), so the event
+    loop serves other requests while it hashes rather than blocking a thread
+    of the caller. Without a pool it runs on a thread of its own.
+    """
+    pool = hash_pool()
+    if pool is None:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+    return await asyncio.wrap_future(pool.submit(func, *args))
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with PASSWORD_HASH_ITERATIONS rounds, at least
+    MIN_ITERATIONS, computed on hash_pool(). hashlib releases the GIL while
+    hashing, so the pool bounds how many cores a login storm can take from
+    the other requests of a threaded worker. Stored hashes with other round
+    counts still verify; those with fewer rounds are rehashed by
+    check_password() on the next login, and those with more are kept.
+    """
+
+    @property
+    def iterations(self):
+        configured = getattr(settings, "PASSWORD_HASH_ITERATIONS", None) or 0
+        return max(configured, MIN_ITERATIONS)
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded["iterations"] < self.iterations or must_update_salt(
+            decoded["salt"], self.salt_entropy
+        )
+
+    def encode(self, password, salt, iterations=None):
+        pool = hash_pool()
+        # Work already running on the pool, see run_hashing(), hashes in place
+        if pool is None or getattr(_local, "in_pool", False):
+            return super().encode(password, salt, iterations)
+        return pool.submit(super().encode, password, salt, iterations).result()
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.utils import timezone
+
+from accounts.hashers import run_hashing
+from accounts.models import User
+
+
+def _login_is_recent(user, now):
+    resolution = timedelta(seconds=getattr(settings, "LAST_LOGIN_RESOLUTION", 300))
+    return user.last_login is not None and now - user.last_login < resolution
+
+
+def record_login(user):
+    """
+    Update last_login unless it was set in the last LAST_LOGIN_RESOLUTION
+    seconds, so repeated logins write a user's row once per window. Returns
+    whether it wrote.
+    """
+    now = timezone.now()
+    if _login_is_recent(user, now):
+        return False
+    User.objects.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
+    return True
+
+
+async def arecord_login(user):
+    """record_login() for async views."""
+    now = timezone.now()
+    if _login_is_recent(user, now):
+        return False
+    await User.objects.filter(pk=user.pk).aupdate(last_login=now)
+    user.last_login = now
+    return True
+
+
+async def aauthenticate(username, password):
+    """
+    authenticate() with ModelBackend's rules for async views: the active user
+    with this username and password, or None. The password is checked, and
+    rehashed when check_password() asks for it, through run_hashing(), so no
+    thread waits on PBKDF2 while the event loop does.
+    """
+    if username is None or password is None:
+        return None
+    user = await User._default_manager.filter(
+        **{User.USERNAME_FIELD: username}
+    ).afirst()
+    if user is None:
+        # Hash anyway, like ModelBackend, so unknown usernames take as long
+        await run_hashing(make_password, password)
+        return None
+
+    rehash = []
+    if not await run_hashing(check_password, password, user.password, rehash.append):
+        return None
+    if not getattr(user, "is_active", True):
+        return None
+    if rehash:
+        user.password = await run_hashing(make_password, password)
+        await User.objects.filter(pk=user.pk).aupdate(password=user.password)
+    return user
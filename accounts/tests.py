@@ -1,3 +1,175 @@
-from django.test import TestCase
+import json
+from datetime import time
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.hashers import PooledPBKDF2PasswordHasher, hash_pool
+from accounts.models import User
+from api.v1.auth.views import AsyncLoginView
+from orders.models import Order
+from restaurants.models import Locations, Restaurant
+
+
+class TokenClaimsAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username="owner", password="secret-pass", role=User.RESTAURANT_OWNER
+        )
+        self.restaurant = Restaurant.objects.create(
+            owner_name=self.owner,
+            name="Restaurant",
+            featured_image="restaurants/images/featured.jpg",
+            rating="4.5",
+            location=Locations.objects.create(name="Kochi"),
+            email="owner@example.com",
+            address="MG Road",
+            phone_number="9999999999",
+            opening_time=time(9, 0),
+            closing_time=time(22, 30),
+        )
+        self.customer = User.objects.create_user(
+            username="customer", password="secret-pass", role=User.CUSTOMER
+        )
+        Order.objects.create(
+            user=self.customer,
+            restaurant=self.restaurant,
+            customer_location="Kakkanad",
+            customer_phone="9999999999",
+        )
+
+    def login(self, username):
+        response = self.client.post(
+            reverse("login"), {"username": username, "password": "secret-pass"}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get(self, name, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        # Copied now: the next request resets the connection's query log
+        return response, [query["sql"] for query in queries.captured_queries]
+
+    def test_login_tokens_carry_username_and_role(self):
+        access = AccessToken(self.login("owner")["access"])
+        self.assertEqual(access["username"], "owner")
+        self.assertEqual(access["role"], User.RESTAURANT_OWNER)
+
+        refreshed = self.client.post(
+            reverse("token_refresh"), {"refresh": self.login("owner")["refresh"]}
+        )
+        self.assertEqual(
+            AccessToken(refreshed.data["access"])["role"], User.RESTAURANT_OWNER
+        )
+
+    def test_owner_orders_need_no_user_or_restaurant_lookup(self):
+        claimless = RefreshToken.for_user(self.owner).access_token
+        response, looked_up = self.get("restaurant-order-list", claimless)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response, queries = self.get(
+            "restaurant-order-list", self.login("owner")["access"]
+        )
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(len(queries), len(looked_up) - 2)
+        self.assertFalse([sql for sql in queries if 'FROM "accounts_user"' in sql])
+
+    def test_claims_user_loads_other_fields_on_demand(self):
+        response, queries = self.get("user-details", self.login("customer")["access"])
+
+        self.assertEqual(response.data["email"], "")
+        self.assertEqual(response.data["role"], User.CUSTOMER)
+        self.assertEqual(len(queries), 1)
+
+    def test_tokens_without_claims_are_looked_up(self):
+        access = RefreshToken.for_user(self.customer).access_token
+        response, queries = self.get("order-list-create", access)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIn("accounts_user", queries[0])
+
+
+class LoginThroughputTests(APITestCase):
+    def setUp(self):
+        # Round counts this low keep the tests fast
+        self.enterContext(mock.patch("accounts.hashers.MIN_ITERATIONS", 500))
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.user = User.objects.create_user(
+                username="customer", password="secret-pass", role=User.CUSTOMER
+            )
+
+    def login(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("login"), {"username": "customer", "password": "secret-pass"}
+            )
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries.captured_queries]
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_passwords_are_hashed_on_the_pool(self):
+        with mock.patch.object(
+            hash_pool(), "submit", wraps=hash_pool().submit
+        ) as submit:
+            self.login()
+        submit.assert_called_once()
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=2000)
+    def test_changed_iterations_rehash_on_login(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        self.login()
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertTrue(self.user.check_password("secret-pass"))
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=2000)
+    async def test_async_logins_await_the_pool(self):
+        async def login(password):
+            request = AsyncRequestFactory().post(
+                reverse("login"),
+                {"username": "customer", "password": password},
+                content_type="application/json",
+            )
+            return await AsyncLoginView.as_view()(request)
+
+        with mock.patch.object(
+            hash_pool(), "submit", wraps=hash_pool().submit
+        ) as submit:
+            response = await login("secret-pass")
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual((data["username"], data["role"]), ("customer", "customer"))
+        # The check, then the rehash to 2000 rounds
+        self.assertEqual(submit.call_count, 2)
+
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertIsNotNone(user.last_login)
+        self.assertEqual((await login("wrong")).status_code, 401)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=200)
+    def test_iterations_are_never_lowered(self):
+        self.assertEqual(PooledPBKDF2PasswordHasher().iterations, 500)
+        self.login()
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_last_login_is_written_once_per_window(self):
+        first = self.login()
+        second = self.login()
+
+        self.assertTrue([sql for sql in first if sql.startswith("UPDATE")])
+        self.assertFalse([sql for sql in second if sql.startswith("UPDATE")])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
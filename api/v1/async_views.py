@@ -0,0 +1,77 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from api.v1.renderers import ORJSONRenderer
+
+
+def async_catalog_views_enabled():
+    return getattr(settings, "ASYNC_CATALOG_VIEWS", False)
+
+
+def catalog_view(async_view_class):
+    """
+    The async view when ASYNC_CATALOG_VIEWS is on, else its DRF view. Also
+    routes logins, see AsyncLoginView.
+    """
+    if async_catalog_views_enabled():
+        return async_view_class.as_view()
+    return async_view_class.sync_view_class.as_view()
+
+
+class AsyncCatalogView(View):
+    """
+    Async-native GET for a read-only catalog endpoint, for ASGI deployments.
+    Only anonymous JSON reads are served here. Writes, authenticated requests,
+    ?format= and the browsable API go to `sync_view_class`, the DRF view this
+    stands in for, so their responses and permission checks do not change.
+    Subclasses may serve other `async_methods`, see AsyncLoginView.
+    """
+
+    sync_view_class = None
+    sync_view = None
+    # Methods served here; parser_classes parse their bodies
+    async_methods = ("GET",)
+    parser_classes = ()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(
+            sync_view=sync_to_async(cls.sync_view_class.as_view()), **initkwargs
+        )
+        # Like APIView: requests delegated to DRF get its CSRF checks instead
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in self.async_methods or not self.serves_async(request):
+            return await self.sync_view(request, *args, **kwargs)
+
+        handler = getattr(self, request.method.lower())
+        parsers = [parser_class() for parser_class in self.parser_classes]
+        try:
+            response = await handler(Request(request, parsers=parsers), *args, **kwargs)
+        except APIException as exc:
+            response = self.render({"detail": exc.detail}, status=exc.status_code)
+        response["Allow"] = ", ".join(self.sync_view_class().allowed_methods)
+        patch_vary_headers(response, ("Accept",))
+        return response
+
+    def serves_async(self, request):
+        return (
+            "HTTP_AUTHORIZATION" not in request.META
+            and "format" not in request.GET
+            and "text/html" not in request.headers.get("Accept", "")
+        )
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            ORJSONRenderer().render(data),
+            status=status,
+            content_type="application/json",
+        )
@@ -0,0 +1,37 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import User
+from .tokens import USER_CLAIMS
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without a user query per request. Tokens from
+    tokens_for_user() carry the user's id, username and role, and the request
+    user is a User instance built from them with every other field deferred,
+    so it filters, compares and assigns like the real row and loads a field
+    from the database only when a view reads it. Tokens issued before these
+    claims existed are authenticated with a lookup as before.
+
+    Claims are as fresh as the token: a deactivated user keeps access until
+    ACCESS_TOKEN_LIFETIME runs out, and a role change shows after next login.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        claims = {field: validated_token[field] for field in USER_CLAIMS}
+        claims[User._meta.pk.attname] = user_id
+        fields = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(None, fields, [claims[field] for field in fields])
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 
-from restaurants.models import Restaurant
+from restaurants.ownership import owned_restaurant_id
 
 User = get_user_model()
 
@@ -25,11 +25,8 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def get_restaurant_ids(self, obj):
-        # Fetch the first restaurant ID for the user if they are a restaurant owner
-        if obj.role == "restaurant_owner":
-            restaurant = Restaurant.objects.filter(owner_name=obj).first()
-            return restaurant.id if restaurant else None
-        return None
+        # The restaurant ID for the user if they are a restaurant owner
+        return owned_restaurant_id(obj, self.context.get("request"))
 
     def create(self, validated_data):
         """
@@ -0,0 +1,13 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Claims that ClaimsJWTAuthentication builds the request user from. Refreshed
+# access tokens copy them from the refresh token.
+USER_CLAIMS = ("username", "role")
+
+
+def tokens_for_user(user):
+    """A refresh token, and through it access tokens, carrying USER_CLAIMS."""
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
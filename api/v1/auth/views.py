@@ -4,9 +4,10 @@ from rest_framework import status
 from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
 from .serializers import UserSerializer
-from django.contrib.auth.models import update_last_login
-from rest_framework_simplejwt.tokens import RefreshToken
-from accounts.models import User
+from accounts.logins import record_login, arecord_login, aauthenticate
+from api.v1.async_views import AsyncCatalogView
+from api.v1.renderers import ORJSONParser
+from .tokens import tokens_for_user
 
 
 class RegisterView(APIView):
@@ -14,7 +15,7 @@ class RegisterView(APIView):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             return Response(
                 {
                     "message": "User registered successfully",
@@ -26,6 +27,21 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+INVALID_CREDENTIALS = {"error": "Invalid credentials"}
+
+
+def login_data(user, username):
+    refresh = tokens_for_user(user)
+    return {
+        "message": "Login successful",
+        "refresh": str(refresh),
+        "access": str(refresh.access_token),
+        "username": str(username),
+        "email": user.email,
+        "role": user.role,
+    }
+
+
 class LoginView(APIView):
     def post(self, request):
         username = request.data.get("username")
@@ -33,28 +49,46 @@ class LoginView(APIView):
         user = authenticate(request, username=username, password=password)
 
         if user is not None:
-            refresh = RefreshToken.for_user(user)
-            update_last_login(None, user)
-            return Response(
-                {
-                    "message": "Login successful",
-                    "refresh": str(refresh),
-                    "access": str(refresh.access_token),
-                    "username": str(username),
-                    "email": user.email,
-                    "role": user.role,
-                }
-            )
+            data = login_data(user, username)
+            record_login(user)
+            return Response(data)
+
+        return Response(INVALID_CREDENTIALS, status=status.HTTP_401_UNAUTHORIZED)
+
+
+class AsyncLoginView(AsyncCatalogView):
+    """
+    LoginView for ASGI deployments. The sync view holds a thread of Django's
+    sync executor for the whole PBKDF2 check, which serializes logins; here
+    the event loop awaits the hash pool instead, see aauthenticate(). JSON
+    bodies only, and users are authenticated with ModelBackend's rules.
+    """
 
-        return Response(
-            {"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED
+    sync_view_class = LoginView
+    async_methods = ("POST",)
+    parser_classes = (ORJSONParser,)
+
+    def serves_async(self, request):
+        return (
+            super().serves_async(request) and request.content_type == "application/json"
         )
 
+    async def post(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        username, password = data.get("username"), data.get("password")
+        user = await aauthenticate(username, password)
+        if user is None:
+            return self.render(INVALID_CREDENTIALS, status=401)
+
+        data = login_data(user, username)
+        await arecord_login(user)
+        return self.render(data)
+
 
 class UserDetailsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(user, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
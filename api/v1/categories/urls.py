@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CategoryList
+from api.v1.async_views import catalog_view
+from .views import AsyncCategoryList
 
 
 urlpatterns = [
-    path("", CategoryList.as_view(), name="category-list"),
+    path("", catalog_view(AsyncCategoryList), name="category-list"),
 ]
@@ -3,14 +3,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import viewsets
 from restaurants.models import Category
+from api.v1.async_views import AsyncCatalogView
+from api.v1.compiled import alist
+from api.v1.reference_cache import reference_response, areference_response
 from .serializers import CategorySerializer
 
 
 class CategoryList(APIView):
     def get(self, request):
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return reference_response(
+            request,
+            Category,
+            lambda: CategorySerializer(Category.objects.all(), many=True).data,
+        )
 
     def post(self, request):
         serializer = CategorySerializer(data=request.data)
@@ -18,3 +23,15 @@ class CategoryList(APIView):
             serializer.save()  # Save the new category
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncCategoryList(AsyncCatalogView):
+    sync_view_class = CategoryList
+
+    async def get(self, request):
+        async def aget_data():
+            return CategorySerializer(
+                await alist(Category.objects.all()), many=True
+            ).data
+
+        return await areference_response(request, Category, aget_data)
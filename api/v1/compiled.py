@@ -0,0 +1,151 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from api.v1.representation_cache import absolutize_urls
+
+# Fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+async def alist(queryset):
+    return [row async for row in queryset]
+
+
+def compiled_reads_enabled():
+    return getattr(settings, "COMPILED_READ_SERIALIZERS", True)
+
+
+def _file_url(storage):
+    def convert(name):
+        return storage.url(name) if name else None
+
+    return convert
+
+
+def compile_fields(serializer, names):
+    """
+    (name, convert) accessors reproducing serializer.fields[name] for a raw
+    .values() column. convert is None where the column is already the
+    representation; file fields convert to their storage URL, left relative.
+    """
+    model = serializer.Meta.model
+    compiled = []
+    for name in names:
+        field = serializer.fields[name]
+        if isinstance(field, serializers.FileField):
+            convert = _file_url(model._meta.get_field(field.source).storage)
+        elif isinstance(field, PASSTHROUGH_FIELDS):
+            convert = None
+        else:
+            convert = field.to_representation
+        compiled.append((name, convert))
+    return compiled
+
+
+class CompiledReader:
+    """
+    Read-only stand-in for a ModelSerializer on list endpoints. fetch() loads
+    everything a page needs with a few .values() queries and assemble() builds
+    the representations from those rows without going through DRF fields, so
+    the output must stay byte-identical to `serializer_class`.
+
+    Fetching and assembling are separate steps, so async views only need an
+    afetch() that runs the same queries through the async ORM.
+    """
+
+    serializer_class = None
+    # Fields assembled from the row's own columns, in any order
+    column_fields = ()
+    # Fields holding file URLs, or dicts of them, made absolute against the request
+    url_fields = ()
+
+    _compiled = None
+
+    def __init__(self, context=None):
+        self.context = context or {}
+
+    @classmethod
+    def compiled(cls):
+        if cls.__dict__.get("_compiled") is None:
+            serializer = cls.serializer_class()
+            cls._compiled = (
+                list(serializer.fields),
+                dict(compile_fields(serializer, cls.column_fields)),
+            )
+        return cls._compiled
+
+    def read(self, objects):
+        """Representations of model instances or primary keys, in their order."""
+        pks = [getattr(obj, "pk", obj) for obj in objects]
+        return self.assemble(pks, self.fetch(pks))
+
+    async def aread(self, objects):
+        pks = [getattr(obj, "pk", obj) for obj in objects]
+        return self.assemble(pks, await self.afetch(pks))
+
+    def fetch(self, pks):
+        raise NotImplementedError
+
+    async def afetch(self, pks):
+        raise NotImplementedError
+
+    def assemble(self, pks, fetched):
+        raise NotImplementedError
+
+    def build(self, row, computed):
+        """One representation, with `computed` supplying the non-column fields."""
+        field_names, converters = self.compiled()
+        data = {}
+        for name in field_names:
+            if name in computed:
+                data[name] = computed[name]
+                continue
+            value = row[name]
+            convert = converters[name]
+            data[name] = value if value is None or convert is None else convert(value)
+        for name in self.url_fields:
+            if data[name]:
+                data[name] = absolutize_urls(data[name], self.absolute_url)
+        return data
+
+    def absolute_url(self, url):
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class CompiledReadMixin:
+    """
+    Lets a generic list view render GET lists with `compiled_reader_class`
+    instead of its serializer, unless COMPILED_READ_SERIALIZERS is off.
+    """
+
+    compiled_reader_class = None
+
+    def uses_compiled_reader(self):
+        return (
+            self.compiled_reader_class is not None
+            and self.request.method == "GET"
+            and compiled_reads_enabled()
+        )
+
+    def serialize_list(self, objects):
+        if self.uses_compiled_reader():
+            return self.compiled_reader_class(self.get_serializer_context()).read(
+                objects
+            )
+        return self.get_serializer(objects, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_list(page))
+        return Response(self.serialize_list(queryset))
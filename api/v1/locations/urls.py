@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import LocationsList
+from api.v1.async_views import catalog_view
+from .views import AsyncLocationsList
 
 
 urlpatterns = [
-    path("", LocationsList.as_view(), name="Locations-list"),
+    path("", catalog_view(AsyncLocationsList), name="Locations-list"),
 ]
@@ -3,11 +3,28 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import viewsets
 from restaurants.models import Locations
+from api.v1.async_views import AsyncCatalogView
+from api.v1.compiled import alist
+from api.v1.reference_cache import reference_response, areference_response
 from .serializers import LocationsSerializer
 
 
 class LocationsList(APIView):
     def get(self, request):
-        locations = Locations.objects.all()
-        serializer = LocationsSerializer(locations, many=True)
-        return Response(serializer.data)
+        return reference_response(
+            request,
+            Locations,
+            lambda: LocationsSerializer(Locations.objects.all(), many=True).data,
+        )
+
+
+class AsyncLocationsList(AsyncCatalogView):
+    sync_view_class = LocationsList
+
+    async def get(self, request):
+        async def aget_data():
+            return LocationsSerializer(
+                await alist(Locations.objects.all()), many=True
+            ).data
+
+        return await areference_response(request, Locations, aget_data)
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from api.v1.pagination import KeysetPagination
+
+
+class OrderCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 100
+    max_page_size = 500
+
+
+class OrderSyncPagination(KeysetPagination):
+    """
+    Walks the orders changed after a watermark in (updated_at, id) order. The
+    watermark is the key of the last order returned, handed back as ?since=.
+
+    updated_at is set when a row is saved, not when its transaction commits,
+    so a change can become visible behind a watermark already handed out.
+    While has_more is set the watermark continues exactly after the last
+    order; once caught up it is re-read from ORDER_SYNC_OVERLAP seconds
+    earlier, so orders may be returned again and clients keep the latest copy
+    by id. Changes committed more than that long after they were saved can
+    still be missed.
+    """
+
+    ordering = ("updated_at", "id")
+    cursor_query_param = "since"
+    page_size = 500
+    max_page_size = 1000
+
+    def get_overlap(self):
+        return timedelta(seconds=getattr(settings, "ORDER_SYNC_OVERLAP", 60))
+
+    def decode_cursor(self, request, model):
+        key, reverse = super().decode_cursor(request, model)
+        self.since_key = key
+        if key is not None and self.cursor.get("caught_up") and self.get_overlap():
+            # Every order updated from the overlap on; ids are positive
+            key = [key[0] - self.get_overlap(), 0]
+        return key, reverse
+
+    def get_watermark(self):
+        if self.next_key is not None:
+            return self.encode_token(self.last_key)
+        # A re-read overlap can end before the watermark it started from
+        keys = [key for key in (self.last_key, self.since_key) if key is not None]
+        if not keys:
+            return None
+        return self.encode_token(max(keys), caught_up=1)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        results = super().paginate_queryset(queryset, request, view)
+        self.last_key = self.get_key(results[-1]) if results else None
+        return results
@@ -0,0 +1,13 @@
+from django.db.models import Prefetch
+
+from orders.models import Order, OrderItem
+
+
+def order_queryset():
+    """Orders with the relations OrderSerializer renders loaded up front."""
+    return Order.objects.select_related("restaurant", "user").prefetch_related(
+        Prefetch(
+            "order_items",
+            queryset=OrderItem.objects.select_related("menu_item").order_by("id"),
+        )
+    )
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from orders.models import Order, OrderItem
+from restaurants.models import FoodItem
+from restaurants.images import srcset
+from api.v1.compiled import CompiledReader, compile_fields
+from api.v1.representation_cache import absolutize_urls
+from .serializers import OrderSerializer, FoodItemSerializer
+
+IMAGE_STORAGE = FoodItem._meta.get_field("image").storage
+
+
+class OrderReader(CompiledReader):
+    """Compiled OrderSerializer output for order listings."""
+
+    serializer_class = OrderSerializer
+    column_fields = (
+        "id",
+        "total_price",
+        "status",
+        "created_at",
+        "customer_location",
+        "customer_phone",
+        "is_deleted",
+    )
+    menu_item_columns = ("id", "name", "price", "image", "image_variants")
+
+    _menu_item_fields = None
+
+    @classmethod
+    def menu_item_fields(cls):
+        if cls._menu_item_fields is None:
+            cls._menu_item_fields = compile_fields(
+                FoodItemSerializer(), ("id", "name", "price")
+            )
+        return cls._menu_item_fields
+
+    def fetch(self, pks):
+        orders = Order.objects.filter(pk__in=pks).values(
+            *self.column_fields, "restaurant_id", "restaurant__name", "user__username"
+        )
+        # Items are ordered as order_queryset() orders them, see queries.py
+        order_items = (
+            OrderItem.objects.filter(order__in=pks)
+            .order_by("id")
+            .values_list(
+                "order_id",
+                "id",
+                "quantity",
+                *[f"menu_item__{column}" for column in self.menu_item_columns],
+            )
+        )
+        return {row["id"]: row for row in orders}, list(order_items)
+
+    def assemble(self, pks, fetched):
+        orders, order_items = fetched
+        # OrderItemSerializer renders menu items without the request context
+        menu_item_serializer = FoodItemSerializer()
+        items_by_order = defaultdict(list)
+        for order_id, pk, quantity, *menu_item in order_items:
+            items_by_order[order_id].append(
+                {
+                    "id": pk,
+                    "menu_item": self.menu_item(menu_item_serializer, menu_item),
+                    "quantity": quantity,
+                }
+            )
+
+        return [
+            self.build(
+                orders[pk],
+                {
+                    "restaurant": {
+                        "id": orders[pk]["restaurant_id"],
+                        "name": orders[pk]["restaurant__name"],
+                    },
+                    "order_items": items_by_order.get(pk, []),
+                    "user": orders[pk]["user__username"],
+                },
+            )
+            for pk in pks
+            if pk in orders
+        ]
+
+    def menu_item(self, serializer, values):
+        *values, image, variants = values
+        data = {
+            name: value if value is None or convert is None else convert(value)
+            for (name, convert), value in zip(self.menu_item_fields(), values)
+        }
+        data["image"] = (
+            serializer.absolute_url(IMAGE_STORAGE.url(image)) if image else None
+        )
+        data["image_srcset"] = absolutize_urls(
+            srcset(variants, IMAGE_STORAGE), serializer.absolute_url
+        )
+        return data
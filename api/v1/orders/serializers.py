@@ -1,24 +1,154 @@
+from collections.abc import Mapping
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
+from api.v1.representation_cache import CachedListSerializer, CachedRepresentationMixin
 from orders.models import Order, OrderItem
+from orders.tasks import queue_order_emails, send_order_receipt
+from tasks.queue import enqueue_many
+from restaurants.images import srcset
 from restaurants.models import Restaurant, FoodItem
 
 
-class FoodItemSerializer(serializers.ModelSerializer):
+def _primary_keys(values):
+    keys = set()
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            keys.add(value)
+        elif isinstance(value, str) and value.isdigit():
+            keys.add(int(value))
+    return keys
+
+
+def prefetch_order_relations(context, orders):
+    """
+    Load every restaurant and menu item referenced by the raw `orders` payloads
+    with one in_bulk() query each and store the maps in the serializer context,
+    where PrefetchedPrimaryKeyRelatedField picks them up.
+    """
+    orders = [order for order in orders if isinstance(order, Mapping)]
+    restaurant_ids = _primary_keys(order.get("restaurant") for order in orders)
+    menu_item_ids = _primary_keys(
+        item.get("menu_item")
+        for order in orders
+        if isinstance(order.get("order_items"), list)
+        for item in order["order_items"]
+        if isinstance(item, Mapping)
+    )
+
+    for key, model, ids in (
+        ("restaurants", Restaurant, restaurant_ids),
+        ("menu_items", FoodItem, menu_item_ids),
+    ):
+        objects = context.setdefault(key, {})
+        missing = ids - objects.keys()
+        if missing:
+            objects.update(model.objects.in_bulk(missing))
+
+
+def order_total(items_data):
+    """Price validated order items from the menu."""
+    return sum(
+        (item["menu_item"].price * item["quantity"] for item in items_data),
+        Decimal("0.00"),
+    )
+
+
+def max_order_total():
+    """The largest total Order.total_price can store."""
+    field = Order._meta.get_field("total_price")
+    whole_digits = field.max_digits - field.decimal_places
+    return Decimal(10) ** whole_digits - Decimal(1).scaleb(-field.decimal_places)
+
+
+def place_orders(user, orders_data):
+    """
+    Insert validated orders for `user` in one transaction: a single bulk insert
+    for the orders and another for all of their line items. Totals are priced
+    from the menu rather than trusted from the client. A receipt per order is
+    queued with the orders and sent by a worker.
+    """
+    orders, order_items = [], []
+    order_ids = Order.generate_order_ids(len(orders_data))
+    for order_id, data in zip(order_ids, orders_data):
+        data = dict(data)
+        items_data = data.pop("order_items")
+        order = Order(user=user, order_id=order_id, **data)
+        order.total_price = order_total(items_data)
+        orders.append(order)
+        order_items.append(items_data)
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    menu_item=item["menu_item"],
+                    quantity=item["quantity"],
+                )
+                for order, items_data in zip(orders, order_items)
+                for item in items_data
+            ]
+        )
+        if queue_order_emails():
+            enqueue_many(send_order_receipt, [(order.pk,) for order in orders])
+
+    prefetch_related_objects(
+        orders,
+        Prefetch(
+            "order_items",
+            queryset=OrderItem.objects.select_related("menu_item").order_by("id"),
+        ),
+    )
+    return orders
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys from the in_bulk() map stored in the serializer context
+    under `context_key`, and only queries for keys that map does not hold.
+    """
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        objects = self.context.get(self.context_key) or {}
+        pk = next(iter(_primary_keys([data])), None)
+        if pk in objects:
+            return objects[pk]
+        return super().to_internal_value(data)
+
+
+class FoodItemSerializer(CachedRepresentationMixin, serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    url_fields = ("image", "image_srcset")
+    cache_version = 2
 
     class Meta:
         model = FoodItem
-        fields = ["id", "name", "price", "image"]
+        fields = ["id", "name", "price", "image", "image_srcset"]
+        list_serializer_class = CachedListSerializer
 
     def get_image(self, obj):
+        # Stored relative in the representation cache; see absolute_url()
+        return obj.image.url if obj.image else None
+
+    def get_image_srcset(self, obj):
+        return srcset(obj.image_variants, obj.image.storage)
+
+    def absolute_url(self, url):
         request = self.context.get("request")
-        if request and obj.image:
-            return request.build_absolute_uri(obj.image.url)
-        elif obj.image:
-            # Fallback to a default base URL if request is not available
-            base_url = "http://localhost:8000"
-            return f"{base_url}{obj.image.url}"
-        return None
+        if request:
+            return request.build_absolute_uri(url)
+        # Fallback to a default base URL if request is not available
+        base_url = "http://localhost:8000"
+        return f"{base_url}{url}"
 
 
 class RestaurantSerializer(serializers.ModelSerializer):
@@ -28,11 +158,15 @@ class RestaurantSerializer(serializers.ModelSerializer):
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    menu_item = serializers.PrimaryKeyRelatedField(queryset=FoodItem.objects.all())
+    menu_item = PrefetchedPrimaryKeyRelatedField(
+        "menu_items", queryset=FoodItem.objects.all()
+    )
 
     class Meta:
         model = OrderItem
         fields = ["id", "menu_item", "quantity"]
+        # Also keeps quantity * price within Order.total_price, see validate()
+        extra_kwargs = {"quantity": {"min_value": 1, "max_value": 1000}}
 
     def to_representation(self, instance):
         # Customize the representation to include menu item details
@@ -42,9 +176,9 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    order_items = OrderItemSerializer(many=True)
-    restaurant = serializers.PrimaryKeyRelatedField(
-        queryset=Restaurant.objects.all()  # Accept restaurant ID
+    order_items = OrderItemSerializer(many=True, allow_empty=False)
+    restaurant = PrefetchedPrimaryKeyRelatedField(
+        "restaurants", queryset=Restaurant.objects.all()  # Accept restaurant ID
     )
     # Add this line to include the username
     user = serializers.StringRelatedField()
@@ -63,6 +197,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "customer_phone",
             "is_deleted",
         ]
+        read_only_fields = ["total_price"]
 
     def get_order_items(self, obj):
         # Use MenuItemSerializer to serialize `menu_item` data
@@ -77,41 +212,38 @@ class OrderSerializer(serializers.ModelSerializer):
             for item in obj.order_items.all()
         ]
 
-    def create(self, validated_data):
-        # Print validated data to inspect it
-        print("Validated data:", validated_data)
-        # Extract order items data
-        order_items_data = validated_data.pop("order_items")
+    def to_internal_value(self, data):
+        prefetch_order_relations(self.context, [data])
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if "order_items" not in attrs:
+            return attrs
+
+        restaurant = attrs.get("restaurant") or self.instance.restaurant
+        for item_data in attrs["order_items"]:
+            menu_item = item_data["menu_item"]
+            if menu_item.restaurant_id != restaurant.id:
+                raise serializers.ValidationError(
+                    {"order_items": f"{menu_item.name} is not served by {restaurant}."}
+                )
+            if not menu_item.is_orderable:
+                raise serializers.ValidationError(
+                    {"order_items": f"{menu_item.name} is currently unavailable."}
+                )
+        if order_total(attrs["order_items"]) > max_order_total():
+            raise serializers.ValidationError(
+                {"order_items": f"Orders cannot total more than {max_order_total()}."}
+            )
+        return attrs
 
+    def create(self, validated_data):
         # Get the user from the request context
         user = self.context["request"].user
-
-        # Pop the restaurant from validated_data and create the order
-        restaurant = validated_data.pop("restaurant")
-        order = Order.objects.create(user=user, restaurant=restaurant, **validated_data)
-
-        # Loop through each order item and create the corresponding OrderItem
-        for item_data in order_items_data:
-            # Get the menu_item ID from the data
-            # Access menu_item id directly from the object
-            menu_item_id = item_data["menu_item"].id
-
-            # Create OrderItem with the associated order and menu_item
-            OrderItem.objects.create(
-                order=order,
-                menu_item_id=menu_item_id,  # Use menu_item_id directly
-                quantity=item_data["quantity"],
-            )
-
-        return order
+        return place_orders(user, [validated_data])[0]
 
     def to_representation(self, instance):
         # Customize the representation to include restaurant details
         representation = super().to_representation(instance)
         representation["restaurant"] = RestaurantSerializer(instance.restaurant).data
-
-        # Include order items in the representation
-        representation["order_items"] = OrderItemSerializer(
-            instance.order_items.all(), many=True
-        ).data
         return representation
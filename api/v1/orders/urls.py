@@ -1,8 +1,10 @@
 from django.urls import path
 from .views import (
     OrderListCreateView,
+    OrderBatchCreateView,
     OrderView,
     OrderDetailView,
+    OrderFeedView,
     RestaurantOrderListView,
     OrderItemListCreateView,
     OrderItemDetailView,
@@ -12,6 +14,7 @@ urlpatterns = [
     # Orders URLs
     path("", OrderView.as_view(), name="orders"),
     path("orders-create/", OrderListCreateView.as_view(), name="order-list-create"),
+    path("batch/", OrderBatchCreateView.as_view(), name="order-batch-create"),
     path(
         "orders-list/<int:pk>/", OrderDetailView.as_view(), name="order-list-detail"
     ),  # Retrieve, update, delete a specific order
@@ -21,6 +24,7 @@ urlpatterns = [
         RestaurantOrderListView.as_view(),
         name="restaurant-order-list",
     ),  # List restaurant-specific orders
+    path("feed/", OrderFeedView.as_view(), name="order-feed"),
     # Order Items URLs
     path(
         "order-items/", OrderItemListCreateView.as_view(), name="order-item-list-create"
@@ -1,13 +1,74 @@
-from rest_framework import generics, permissions, status
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import generics, permissions, renderers, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from orders.feed import (
+    astream_events,
+    get_broker,
+    publish_order_event,
+    publish_order_events,
+    restaurant_channel,
+    stream_events,
+)
 from orders.models import Order, OrderItem
-from restaurants.models import Restaurant
-from .serializers import OrderSerializer, OrderItemSerializer
+from orders.tasks import queue_order_emails, send_order_status
+from tasks.queue import enqueue
+from restaurants.ownership import owned_restaurant_id
+from api.v1.compiled import CompiledReadMixin
+from api.v1.pagination import KeysetPaginationMixin
+from .serializers import (
+    OrderSerializer,
+    OrderItemSerializer,
+    place_orders,
+    prefetch_order_relations,
+)
+from .pagination import OrderCursorPagination, OrderSyncPagination
+from .queries import order_queryset
+from .readers import OrderReader
+
+
+class OrderSyncMixin:
+    """
+    Adds delta sync to a list view: ?since=<watermark> returns only orders
+    created, updated or soft-deleted after the watermark, plus the next one.
+    Send an empty ?since= for the first sync. Orders can be returned again by
+    later syncs, see OrderSyncPagination; keep the latest copy by id. Results are rendered with
+    CompiledReadMixin.serialize_list().
+    """
+
+    def get_sync_queryset(self):
+        return self.get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        if OrderSyncPagination.cursor_query_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        paginator = OrderSyncPagination()
+        orders = paginator.paginate_queryset(self.get_sync_queryset(), request, self)
+        return Response(
+            {
+                "watermark": paginator.get_watermark(),
+                "has_more": paginator.next_key is not None,
+                "results": self.serialize_list(
+                    [order for order in orders if not order.is_deleted]
+                ),
+                "deleted": [order.id for order in orders if order.is_deleted],
+            }
+        )
 
 
 # View for users to create orders and list their own orders
-class OrderListCreateView(generics.ListCreateAPIView):
+class OrderListCreateView(
+    OrderSyncMixin,
+    CompiledReadMixin,
+    KeysetPaginationMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = OrderSerializer
+    compiled_reader_class = OrderReader
+    keyset_pagination_class = OrderCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_serializer_context(self):
@@ -17,12 +78,18 @@ class OrderListCreateView(generics.ListCreateAPIView):
         # Users can only see their own orders
         return Order.objects.filter(user=self.request.user, is_deleted=False)
 
+    def get_sync_queryset(self):
+        # Soft-deleted orders are included so clients can drop them
+        orders = Order.objects if self.uses_compiled_reader() else order_queryset()
+        return orders.filter(user=self.request.user)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data, context={"request": request}
         )
         if serializer.is_valid():
-            serializer.save()  # Save the order and associate it with the user
+            order = serializer.save()  # Save the order and associate it with the user
+            publish_order_event("order.created", order.restaurant_id, serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -38,33 +105,122 @@ class OrderListCreateView(generics.ListCreateAPIView):
         )
 
 
-class OrderView(generics.ListCreateAPIView):
+class OrderView(CompiledReadMixin, KeysetPaginationMixin, generics.ListCreateAPIView):
     serializer_class = OrderSerializer
+    compiled_reader_class = OrderReader
+    keyset_pagination_class = OrderCursorPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_serializer_context(self):
         return {"request": self.request}
 
     def get_queryset(self):
-        restaurant = Restaurant.objects.filter(owner_name=self.request.user).first()
-        if restaurant:
-            return Order.objects.filter(restaurant=restaurant)
+        restaurant_id = owned_restaurant_id(self.request.user, self.request)
+        if restaurant_id:
+            return Order.objects.filter(restaurant_id=restaurant_id)
         return Order.objects.all()
 
+    def perform_create(self, serializer):
+        order = serializer.save()
+        publish_order_event("order.created", order.restaurant_id, serializer.data)
+
 
 # View for restaurant owners to list orders related to their restaurant
-class RestaurantOrderListView(generics.ListAPIView):
+class RestaurantOrderListView(
+    OrderSyncMixin, CompiledReadMixin, KeysetPaginationMixin, generics.ListAPIView
+):
     serializer_class = OrderSerializer
+    compiled_reader_class = OrderReader
+    keyset_pagination_class = OrderCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         # Fetch orders for the restaurant owned by the current user
-        restaurant = Restaurant.objects.filter(owner_name=self.request.user).first()
-        if restaurant:
-            return Order.objects.filter(restaurant=restaurant)
+        restaurant_id = owned_restaurant_id(self.request.user, self.request)
+        if restaurant_id:
+            return Order.objects.filter(restaurant_id=restaurant_id)
         return Order.objects.none()
 
 
+# View for kiosks and partners to place many orders in one request
+class OrderBatchCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    max_batch_size = 500
+
+    def post(self, request):
+        data = request.data
+        orders = data.get("orders") if isinstance(data, dict) else data
+        if not isinstance(orders, list) or not orders:
+            return Response(
+                {"error": "Expected a non-empty list of orders."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(orders) > self.max_batch_size:
+            return Response(
+                {"error": f"A batch can hold at most {self.max_batch_size} orders."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # With atomic set, one invalid order rejects the whole batch
+        atomic = isinstance(data, dict) and data.get("atomic") is True
+
+        # One lookup pass for every restaurant and menu item in the batch
+        context = {"request": request}
+        prefetch_order_relations(context, orders)
+
+        results, valid = [], []
+        for index, payload in enumerate(orders):
+            serializer = OrderSerializer(data=payload, context=context)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+                results.append(None)
+            else:
+                results.append(
+                    {"index": index, "status": "error", "errors": serializer.errors}
+                )
+
+        if valid and not (atomic and len(valid) < len(orders)):
+            created = place_orders(request.user, [data for _, data in valid])
+            serialized = OrderSerializer(created, many=True, context=context).data
+            for (index, _), order_data in zip(valid, serialized):
+                results[index] = {
+                    "index": index,
+                    "status": "created",
+                    "order": order_data,
+                }
+            publish_order_events(
+                "order.created",
+                [
+                    (order.restaurant_id, order_data)
+                    for order, order_data in zip(created, serialized)
+                ],
+            )
+        else:
+            valid = []
+
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = {
+                    "index": index,
+                    "status": "skipped",
+                    "errors": {"detail": "Batch rejected because of invalid orders."},
+                }
+
+        if len(valid) == len(orders):
+            response_status = status.HTTP_201_CREATED
+        elif valid:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {
+                "created": len(valid),
+                "failed": len(orders) - len(valid),
+                "results": results,
+            },
+            status=response_status,
+        )
+
+
 # View for restaurant owners to update the status of an order
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Order.objects.all()
@@ -75,7 +231,7 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         order = self.get_object()
 
         # Ensure only the restaurant owner can update the order
-        if request.user != order.restaurant.owner_name:
+        if order.restaurant_id != owned_restaurant_id(request.user, request):
             return Response(
                 {"error": "You are not authorized to update this order."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -90,13 +246,59 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
                 {"error": "Invalid status choice."}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        previous_status = order.status
         serializer = self.get_serializer(order, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            order = serializer.save()
+            if order.status != previous_status:
+                publish_order_event(
+                    "order.status_changed", order.restaurant_id, serializer.data
+                )
+                if queue_order_emails():
+                    enqueue(send_order_status, order.pk, order.status)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class EventStreamRenderer(renderers.JSONRenderer):
+    # Lets EventSource clients past content negotiation; errors still render as JSON
+    media_type = "text/event-stream"
+    format = "event-stream"
+
+
+# Server-sent event stream of new orders and status changes for an owner's restaurant
+class OrderFeedView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [renderers.JSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        restaurant_id = owned_restaurant_id(request.user, request)
+        if not restaurant_id:
+            return Response(
+                {"error": "Only restaurant owners have an order feed."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Under ASGI the stream is consumed on the event loop without a worker thread
+        asynchronous = isinstance(request._request, ASGIRequest)
+        if not asynchronous and not getattr(settings, "ORDER_FEED_SYNC_STREAMS", False):
+            # A sync worker would be held for the whole stream
+            return Response(
+                {"error": "The order feed is only served by the ASGI deployment."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        subscription = get_broker().subscribe(
+            restaurant_channel(restaurant_id), asynchronous=asynchronous
+        )
+        events = astream_events if asynchronous else stream_events
+        response = StreamingHttpResponse(
+            events(subscription), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 # View to create and list order items
 class OrderItemListCreateView(generics.ListCreateAPIView):
     queryset = OrderItem.objects.all()
@@ -0,0 +1,199 @@
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination over a fixed key such as ("-created_at", "-id"). Each page
+    is fetched with a WHERE on the key of the last row seen instead of an OFFSET,
+    so deep pages cost the same as the first one. No COUNT(*) runs unless the
+    client asks for it with ?with_count=1 (cached) or ?with_count=estimate.
+    """
+
+    ordering = ("id",)
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    count_cache_timeout = 60
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = self.get_count(queryset, request)
+        return self.paginate_results(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views."""
+        self.count = await sync_to_async(self.get_count)(queryset, request)
+        queryset = self.page_queryset(queryset, request)
+        return self.paginate_results([row async for row in queryset])
+
+    def page_queryset(self, queryset, request):
+        """The rows of the requested page, plus one to tell if there are more."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.key, self.reverse = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(*self.get_ordering(self.reverse))
+        if self.key is not None:
+            queryset = queryset.filter(self.keyset_filter(self.key, self.reverse))
+        return queryset[: self.page_size + 1]
+
+    def paginate_results(self, results):
+        key, reverse = self.key, self.reverse
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else key is not None
+        has_previous = key is not None if not reverse else has_more
+        self.next_key = self.get_key(results[-1]) if has_next and results else None
+        self.previous_key = (
+            self.get_key(results[0]) if has_previous and results else None
+        )
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    def keyset_filter(self, key, reverse):
+        # (a, b) after (x, y)  ==  a > x OR (a = x AND b > y), flipped per direction.
+        condition = Q()
+        for field, value in reversed(list(zip(self.ordering, key))):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            after = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            condition = after | (Q(**{name: value}) & condition) if condition else after
+        return condition
+
+    def get_key(self, instance):
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    def encode_cursor(self, key, reverse):
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_token(key, reverse)
+        )
+
+    def encode_token(self, key, reverse=False, **flags):
+        payload = {
+            "k": [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in key
+            ],
+            "r": int(reverse),
+            **flags,
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        # The decoded token, for flags added by subclasses
+        self.cursor = {}
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            fields = [
+                model._meta.get_field(field.lstrip("-")) for field in self.ordering
+            ]
+            values = payload["k"]
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            if any(value is None for value in values):
+                raise ValueError
+            # clean() also checks the column's range where the database has one
+            key = [field.clean(value, None) for field, value in zip(fields, values)]
+            self.cursor = payload
+            return key, bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        return self.encode_cursor(self.next_key, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_key is None:
+            return None
+        return self.encode_cursor(self.previous_key, reverse=True)
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if not mode:
+            return None
+        if mode == "estimate" and connection.vendor == "postgresql":
+            return self.estimate_count(queryset)
+
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        cache_key = "keyset-count:" + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+        return cache.get_or_set(cache_key, queryset.count, self.count_cache_timeout)
+
+    def estimate_count(self, queryset):
+        """Row estimate from the Postgres planner; no rows are read."""
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPaginationMixin:
+    """
+    Lets a generic list view switch to keyset pagination when the request
+    carries a cursor parameter; send an empty ?cursor= for the first page.
+    """
+
+    keyset_pagination_class = None
+
+    def uses_keyset_pagination(self):
+        return (
+            self.keyset_pagination_class is not None
+            and self.keyset_pagination_class.cursor_query_param
+            in self.request.query_params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.uses_keyset_pagination():
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from api.v1.renderers import ORJSONRenderer
+
+
+class LRUCache:
+    """A small thread-safe, process-local LRU map."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+_rendered = LRUCache()
+
+
+def _timeout():
+    return getattr(settings, "REFERENCE_CACHE_TIMEOUT", 300)
+
+
+def _version_key(model):
+    return f"reference-version:{model._meta.db_table}"
+
+
+def table_version(model):
+    """
+    Current version of a reference table. Versions live in Django's cache and
+    expire after REFERENCE_CACHE_TIMEOUT, which bounds staleness on backends
+    that are not shared between processes.
+    """
+    return cache.get_or_set(_version_key(model), time.time_ns, _timeout())
+
+
+def bump_table_version(model):
+    # Bump now for this transaction's readers and again after commit, so a
+    # render racing the commit cannot be cached under the final version.
+    cache.set(_version_key(model), time.time_ns(), _timeout())
+    transaction.on_commit(
+        lambda: cache.set(_version_key(model), time.time_ns(), _timeout())
+    )
+
+
+def _render_entry(data):
+    body = ORJSONRenderer().render(data)
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _conditional_response(request, entry):
+    body, etag = entry
+    if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def reference_response(request, model, get_data):
+    """
+    Serve a rarely-changing table as JSON bytes rendered once per version, with
+    a strong ETag so clients can revalidate with If-None-Match.
+    """
+    version = table_version(model)
+    key = (model._meta.db_table, version)
+
+    entry = _rendered.get(key)
+    if entry is None:
+        shared_key = f"reference-body:{key[0]}:{version}"
+        entry = cache.get(shared_key)
+        if entry is None:
+            entry = _render_entry(get_data())
+            cache.set(shared_key, entry, _timeout())
+        _rendered.set(key, entry)
+    return _conditional_response(request, entry)
+
+
+async def areference_response(request, model, aget_data):
+    """reference_response() for async views; `aget_data` is a coroutine function."""
+    version = await cache.aget_or_set(_version_key(model), time.time_ns, _timeout())
+    key = (model._meta.db_table, version)
+
+    entry = _rendered.get(key)
+    if entry is None:
+        shared_key = f"reference-body:{key[0]}:{version}"
+        entry = await cache.aget(shared_key)
+        if entry is None:
+            entry = _render_entry(await aget_data())
+            await cache.aset(shared_key, entry, _timeout())
+        _rendered.set(key, entry)
+    return _conditional_response(request, entry)
@@ -0,0 +1,122 @@
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on top of orjson, which encodes datetimes, dates and times
+    natively. Everything else orjson does not know, such as Decimal, goes
+    through DRF's encoder, so the output matches JSONRenderer's compact form.
+    Falls back to JSONRenderer when orjson is not installed or the client
+    asks for indented or ASCII-only output.
+    """
+
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.default, option=self.options)
+        # Same strict javascript subset as JSONRenderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on top of orjson for UTF-8 bodies, with the same errors."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace("_", "-") not in ("utf-8", "utf8")
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+def _split_envelope(renderer, envelope, items_key):
+    return renderer.render({**envelope, items_key: []}).rsplit(b"[]", 1)
+
+
+def iter_json_envelope(envelope, items_key, items, serialize, chunk_size):
+    """
+    Yield `envelope` with `items` rendered under `items_key` as JSON, one
+    chunk of `chunk_size` items at a time. The bytes are the ones JSONRenderer
+    produces for the equivalent dict, so clients cannot tell the difference.
+    """
+    renderer = ORJSONRenderer()
+    head, tail = _split_envelope(renderer, envelope, items_key)
+    yield head + b"["
+
+    items = iter(items)
+    separator = b""
+    while chunk := list(islice(items, chunk_size)):
+        yield separator + renderer.render(serialize(chunk))[1:-1]
+        separator = b","
+    yield b"]" + tail
+
+
+async def aiter_json_envelope(envelope, items_key, chunks):
+    """iter_json_envelope() over an async iterable of serialized chunks."""
+    renderer = ORJSONRenderer()
+    head, tail = _split_envelope(renderer, envelope, items_key)
+    yield head + b"["
+
+    separator = b""
+    async for chunk in chunks:
+        if chunk:
+            yield separator + renderer.render(chunk)[1:-1]
+            separator = b","
+    yield b"]" + tail
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    A JSON response for unpaginated listings that is encoded while it is sent.
+    Rows are read with queryset.iterator(), so memory stays bounded by
+    `chunk_size` whatever the size of the result. Prefetches run per chunk.
+    """
+
+    def __init__(
+        self, envelope, items_key, queryset, serialize, chunk_size=500, **kwargs
+    ):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(
+            iter_json_envelope(
+                envelope,
+                items_key,
+                queryset.iterator(chunk_size=chunk_size),
+                serialize,
+                chunk_size,
+            ),
+            **kwargs,
+        )
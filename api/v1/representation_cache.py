@@ -0,0 +1,129 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from rest_framework import serializers
+
+RENDERING_FOR_CACHE = "rendering_for_cache"
+
+# Hits and misses of cached_representations() in this process, e.g. for
+# benchmarks.run; approximate under threads
+stats = Counter()
+
+
+def _timeout():
+    return getattr(settings, "REPRESENTATION_CACHE_TIMEOUT", 300)
+
+
+def _version_key(model, pk):
+    return f"representation-version:{model._meta.label_lower}:{pk}"
+
+
+def object_versions(model, pks):
+    """
+    Current cache version of each object. A version that is missing, e.g.
+    evicted, is replaced with a fresh one rather than reset, so entries written
+    under an older version can never be served again.
+    """
+    keys = {pk: _version_key(model, pk) for pk in pks}
+    found = cache.get_many(keys.values())
+    versions, missing = {}, {}
+    for pk, key in keys.items():
+        if key in found:
+            versions[pk] = found[key]
+        else:
+            versions[pk] = missing[key] = time.time_ns()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def absolutize_urls(value, absolute_url):
+    """`value` with its relative URLs made absolute, including srcset dicts."""
+    if isinstance(value, dict):
+        return {key: absolutize_urls(url, absolute_url) for key, url in value.items()}
+    return absolute_url(value) if value else value
+
+
+def invalidate_representations(model, pks):
+    """Retire every cached representation of these objects."""
+    pks = {pk for pk in pks if pk is not None}
+    if not pks:
+        return
+
+    def bump():
+        cache.set_many({_version_key(model, pk): time.time_ns() for pk in pks}, None)
+
+    # Bump now for this transaction's readers and again after commit, so a
+    # render racing the commit cannot be cached under the final version.
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return self.child.cached_representations(list(iterable))
+
+
+class CachedRepresentationMixin:
+    """
+    Caches a ModelSerializer's output per object under (model, pk, version) in
+    Django's cache. Lists fetch all of their entries with one get_many().
+
+    Entries are rendered without a request, so the URLs named in `url_fields`
+    are stored relative and made absolute per response by absolute_url().
+    Subclasses customise their output in render_representation() instead of
+    to_representation(), and add CachedListSerializer as the Meta's
+    list_serializer_class. Bump `cache_version` when the output shape changes.
+    """
+
+    cache_version = 1
+    url_fields = ()
+
+    def to_representation(self, instance):
+        if self.context.get(RENDERING_FOR_CACHE):
+            return self.render_representation(instance)
+        return self.cached_representations([instance])[0]
+
+    def render_representation(self, instance):
+        return super().to_representation(instance)
+
+    def representation_key(self, pk, version):
+        serializer_class = type(self)
+        return (
+            f"representation:{serializer_class.__module__}."
+            f"{serializer_class.__qualname__}:{self.cache_version}:{pk}:{version}"
+        )
+
+    def cached_representations(self, instances):
+        versions = object_versions(self.Meta.model, [obj.pk for obj in instances])
+        keys = [self.representation_key(obj.pk, versions[obj.pk]) for obj in instances]
+        found = cache.get_many(keys)
+
+        renderer, missing, representations = None, {}, []
+        for instance, key in zip(instances, keys):
+            data = found.get(key)
+            if data is None:
+                if renderer is None:
+                    renderer = type(self)(context={RENDERING_FOR_CACHE: True})
+                data = missing[key] = dict(renderer.to_representation(instance))
+            representations.append(self.absolutize(dict(data)))
+
+        stats["hits"] += len(instances) - len(missing)
+        stats["misses"] += len(missing)
+        if missing:
+            cache.set_many(missing, _timeout())
+        return representations
+
+    def absolutize(self, data):
+        for field in self.url_fields:
+            if data.get(field):
+                data[field] = absolutize_urls(data[field], self.absolute_url)
+        return data
+
+    def absolute_url(self, url):
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
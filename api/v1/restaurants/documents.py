@@ -0,0 +1,100 @@
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework.utils.encoders import JSONEncoder
+
+from restaurants.availability import availability_index, aavailability_index
+from restaurants.models import Restaurant, MenuDocument
+from api.v1.representation_cache import absolutize_urls
+from .queries import restaurant_queryset
+from .serializers import RestaurantSerializer
+
+
+def build_menu_document(restaurant_id):
+    """
+    Render the RestaurantDetails payload for a restaurant. It is rendered without
+    a request, so image fields hold relative URLs until the document is served,
+    and lists every item; availability is applied when it is served.
+    """
+    restaurant = restaurant_queryset().get(pk=restaurant_id)
+    return RestaurantSerializer(restaurant).data
+
+
+def refresh_menu_document(restaurant_id, replace=True):
+    """
+    Build and store a restaurant's menu document. Rebuilds after a write
+    replace the stored document; with `replace` off, as on a read miss, it is
+    only stored if there is none yet, since the menu may have been read before
+    a concurrent write committed and that write's rebuild must win.
+    """
+    try:
+        document = build_menu_document(restaurant_id)
+    except Restaurant.DoesNotExist:
+        MenuDocument.objects.filter(restaurant_id=restaurant_id).delete()
+        return None
+
+    content = json.dumps(document, cls=JSONEncoder)
+    if replace:
+        MenuDocument.objects.update_or_create(
+            restaurant_id=restaurant_id, defaults={"content": content}
+        )
+    else:
+        MenuDocument.objects.bulk_create(
+            [MenuDocument(restaurant_id=restaurant_id, content=content)],
+            ignore_conflicts=True,
+        )
+    return document
+
+
+def _stored_menu_document(restaurant_id):
+    return MenuDocument.objects.filter(restaurant_id=restaurant_id).values_list(
+        "content", flat=True
+    )
+
+
+def _available_menu(document, index):
+    document["food_menu"] = index.available_items(document.get("food_menu", []))
+    return document
+
+
+def get_menu_document(restaurant_id):
+    """
+    Fetch the stored menu document, building it on a miss, with the menu
+    narrowed to the items that are available right now.
+    """
+    content = _stored_menu_document(restaurant_id).first()
+    if content is not None:
+        document = json.loads(content)
+    else:
+        document = refresh_menu_document(restaurant_id, replace=False)
+        if document is None:
+            raise Restaurant.DoesNotExist
+    return _available_menu(document, availability_index(restaurant_id))
+
+
+async def aget_menu_document(restaurant_id):
+    """get_menu_document() for async views; misses are built in a thread."""
+    content = await _stored_menu_document(restaurant_id).afirst()
+    if content is not None:
+        document = json.loads(content)
+    else:
+        document = await sync_to_async(refresh_menu_document)(
+            restaurant_id, replace=False
+        )
+        if document is None:
+            raise Restaurant.DoesNotExist
+    return _available_menu(document, await aavailability_index(restaurant_id))
+
+
+def absolutize_menu_document(document, request):
+    """Turn the relative image URLs of a stored document into absolute ones."""
+    for field in ("featured_image", "featured_image_srcset"):
+        if document.get(field):
+            document[field] = absolutize_urls(
+                document[field], request.build_absolute_uri
+            )
+    for item in document.get("food_menu", []):
+        for field in ("image", "image_srcset"):
+            if item.get(field):
+                item[field] = absolutize_urls(item[field], request.build_absolute_uri)
+    return document
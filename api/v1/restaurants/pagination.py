@@ -1,4 +1,8 @@
+from django.core.paginator import InvalidPage
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+from api.v1.pagination import KeysetPagination
 
 
 class StandardResultSetPagination(pagination.PageNumberPagination):
@@ -6,3 +10,35 @@ class StandardResultSetPagination(pagination.PageNumberPagination):
     page_query_param = "page"
     page_size_query_param = "page_size"
     max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views: the count and the page's rows are
+        read with the async ORM, the page arithmetic is Django's Paginator.
+        """
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(
+            range(await queryset.acount()), page_size
+        )
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+
+        bottom = (self.page.number - 1) * page_size
+        self.page.object_list = [
+            row async for row in queryset[bottom : bottom + page_size]
+        ]
+        self.request = request
+        return list(self.page)
+
+
+class RestaurantCursorPagination(KeysetPagination):
+    ordering = ("id",)
+    page_size = 10
+    max_page_size = 100
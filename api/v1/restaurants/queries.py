@@ -0,0 +1,24 @@
+from django.db.models import Prefetch
+
+from restaurants.models import Restaurant, FoodItem, Category
+
+
+def ordered_categories():
+    # The compiled readers in readers.py list categories in this order too
+    return Prefetch("categories", queryset=Category.objects.order_by("id"))
+
+
+def food_item_queryset():
+    """Food items, by id, with the categories FoodItemSerializer renders."""
+    return FoodItem.objects.order_by("id").prefetch_related(ordered_categories())
+
+
+def restaurant_queryset():
+    """
+    Restaurants with every relation RestaurantSerializer touches loaded up front,
+    so a page costs the same fixed number of queries whatever its size.
+    """
+    return Restaurant.objects.select_related("location").prefetch_related(
+        ordered_categories(),
+        Prefetch("food_items", queryset=food_item_queryset()),
+    )
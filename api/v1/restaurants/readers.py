@@ -0,0 +1,157 @@
+from collections import defaultdict
+
+from restaurants.images import srcset
+from restaurants.models import Restaurant, FoodItem, Category
+from api.v1.compiled import CompiledReader, alist
+from .serializers import RestaurantSerializer, FoodItemSerializer
+
+
+IMAGE_STORAGE = FoodItem._meta.get_field("image").storage
+FEATURED_IMAGE_STORAGE = Restaurant._meta.get_field("featured_image").storage
+
+
+def _group(pairs):
+    groups = defaultdict(list)
+    for key, value in pairs:
+        groups[key].append(value)
+    return groups
+
+
+class FoodItemReader(CompiledReader):
+    """Compiled FoodItemSerializer output, read by restaurant for menus."""
+
+    serializer_class = FoodItemSerializer
+    column_fields = (
+        "id",
+        "restaurant",
+        "image",
+        "name",
+        "description",
+        "price",
+        "food_type",
+        "rating",
+        "is_available",
+    )
+    url_fields = ("image", "image_srcset")
+    # Columns of the .values() rows assemble_rows() takes
+    value_columns = column_fields + ("image_variants",)
+
+    # Rows are ordered as food_item_queryset() orders them, see queries.py
+    def rows(self, restaurant_ids):
+        return (
+            FoodItem.objects.filter(restaurant__in=restaurant_ids)
+            .order_by("id")
+            .values(*self.value_columns)
+        )
+
+    def category_names(self, food_item_ids):
+        return (
+            Category.objects.filter(food_items__in=food_item_ids)
+            .order_by("id")
+            .values_list("food_items", "name")
+        )
+
+    def fetch(self, restaurant_ids):
+        food_items = list(self.rows(restaurant_ids))
+        categories = self.category_names([row["id"] for row in food_items])
+        return food_items, _group(categories)
+
+    async def afetch(self, restaurant_ids):
+        food_items = await alist(self.rows(restaurant_ids))
+        categories = self.category_names([row["id"] for row in food_items])
+        return food_items, _group(await alist(categories))
+
+    async def aread_rows(self, food_items):
+        """Representations of .values() rows of `column_fields`, e.g. a chunk."""
+        categories = self.category_names([row["id"] for row in food_items])
+        return self.assemble_rows((food_items, _group(await alist(categories))))
+
+    def assemble(self, restaurant_ids, fetched):
+        menus = defaultdict(list)
+        for food_item in self.assemble_rows(fetched):
+            menus[food_item["restaurant"]].append(food_item)
+        return menus
+
+    def assemble_rows(self, fetched):
+        food_items, categories = fetched
+        return [
+            self.build(
+                row,
+                {
+                    "categories": categories.get(row["id"], []),
+                    "image_srcset": srcset(row["image_variants"], IMAGE_STORAGE),
+                },
+            )
+            for row in food_items
+        ]
+
+
+class RestaurantReader(CompiledReader):
+    """Compiled RestaurantSerializer output for restaurant listings."""
+
+    serializer_class = RestaurantSerializer
+    column_fields = (
+        "id",
+        "featured_image",
+        "name",
+        "rating",
+        "outlet",
+        "email",
+        "address",
+        "phone_number",
+        "working_days",
+        "opening_time",
+        "closing_time",
+        "offer_text",
+        "delivery_time",
+        "owner_name",
+        "latitude",
+        "longitude",
+    )
+    url_fields = ("featured_image", "featured_image_srcset")
+
+    def rows(self, pks):
+        return Restaurant.objects.filter(pk__in=pks).values(
+            *self.column_fields, "location__name", "featured_image_variants"
+        )
+
+    def category_names(self, pks):
+        return (
+            Category.objects.filter(restaurant__in=pks)
+            .order_by("id")
+            .values_list("restaurant", "name")
+        )
+
+    def fetch(self, pks):
+        return (
+            {row["id"]: row for row in self.rows(pks)},
+            _group(self.category_names(pks)),
+            FoodItemReader(self.context).fetch(pks),
+        )
+
+    async def afetch(self, pks):
+        return (
+            {row["id"]: row for row in await alist(self.rows(pks))},
+            _group(await alist(self.category_names(pks))),
+            await FoodItemReader(self.context).afetch(pks),
+        )
+
+    def assemble(self, pks, fetched):
+        restaurants, categories, food_items = fetched
+        menus = FoodItemReader(self.context).assemble(pks, food_items)
+        return [
+            self.build(
+                restaurants[pk],
+                {
+                    "categories": categories.get(pk, []),
+                    "location": restaurants[pk]["location__name"],
+                    "featured_image_srcset": srcset(
+                        restaurants[pk]["featured_image_variants"],
+                        FEATURED_IMAGE_STORAGE,
+                    ),
+                    "food_menu": menus.get(pk, []),
+                },
+            )
+            for pk in pks
+            if pk in restaurants
+        ]
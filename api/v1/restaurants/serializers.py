@@ -1,4 +1,10 @@
 from rest_framework import serializers
+from api.v1.representation_cache import (
+    CachedListSerializer,
+    CachedRepresentationMixin,
+    absolutize_urls,
+)
+from restaurants.images import srcset
 from restaurants.models import Restaurant, FoodItem, Category, Locations
 from accounts.models import User
 
@@ -10,15 +16,23 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "role"]
 
 
-class FoodItemSerializer(serializers.ModelSerializer):
+class FoodItemSerializer(CachedRepresentationMixin, serializers.ModelSerializer):
     categories = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), many=True
     )
     restaurant = serializers.PrimaryKeyRelatedField(queryset=Restaurant.objects.all())
+    image_srcset = serializers.SerializerMethodField()
+    url_fields = ("image", "image_srcset")
+    cache_version = 2
 
     class Meta:
         model = FoodItem
-        fields = "__all__"
+        exclude = ["image_variants"]
+        list_serializer_class = CachedListSerializer
+
+    def get_image_srcset(self, obj):
+        # Resized copies of image; stored relative like it
+        return srcset(obj.image_variants, obj.image.storage)
 
     def validate_restaurant(self, value):
         """Ensure the restaurant ID is valid."""
@@ -35,8 +49,8 @@ class FoodItemSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("One or more categories are invalid.")
         return value
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
+    def render_representation(self, instance):
+        representation = super().render_representation(instance)
         representation["categories"] = [
             category.name for category in instance.categories.all()
         ]  # Add category names for easier frontend use
@@ -65,10 +79,17 @@ class RestaurantSerializer(serializers.ModelSerializer):
     location = serializers.PrimaryKeyRelatedField(queryset=Locations.objects.all())
     food_menu = FoodItemSerializer(many=True, source="food_items", read_only=True)
     featured_image = serializers.ImageField(required=False)
+    featured_image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Restaurant
-        fields = "__all__"
+        exclude = ["geohash", "featured_image_variants"]
+
+    def get_featured_image_srcset(self, obj):
+        urls = srcset(obj.featured_image_variants, obj.featured_image.storage)
+        request = self.context.get("request")
+        # Absolute when featured_image is, i.e. when there is a request
+        return absolutize_urls(urls, request.build_absolute_uri) if request else urls
 
     def validate_owner_name(self, value):
         if value.role != "restaurant_owner":
@@ -84,6 +105,17 @@ class RestaurantSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("One or more categories are invalid.")
         return value
 
+    def validate(self, attrs):
+        coordinates = [
+            attrs.get(name, getattr(self.instance, name, None))
+            for name in ("latitude", "longitude")
+        ]
+        if coordinates.count(None) == 1:
+            raise serializers.ValidationError(
+                "Latitude and longitude must be set together."
+            )
+        return attrs
+
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         representation["categories"] = [
@@ -125,3 +157,17 @@ class RestaurantSerializer(serializers.ModelSerializer):
         instance.save()
 
         return instance
+
+
+class FoodItemAvailabilitySerializer(serializers.Serializer):
+    food_items = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=1000
+    )
+    is_available = serializers.BooleanField()
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0.1, max_value=50, default=5)
+    open_now = serializers.BooleanField(default=False)
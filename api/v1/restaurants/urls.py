@@ -1,16 +1,27 @@
 from django.urls import path
+from api.v1.async_views import catalog_view
 from .views import (
-    RestaurantList,
     FoodItemList,
-    RestaurantDetails,
-    FoodItems,
     FoodItemCreateView,
+    FoodItemAvailability,
+    RestaurantMenu,
+    AsyncRestaurantList,
+    AsyncRestaurantDetails,
+    AsyncFoodItems,
 )
 
 urlpatterns = [
-    path("", RestaurantList.as_view(), name="restaurant-list"),
-    path("<int:pk>/", RestaurantDetails.as_view(), name="restaurantDetails-list"),
-    path("food-items/", FoodItems.as_view(), name="food_item"),
+    path("", catalog_view(AsyncRestaurantList), name="restaurant-list"),
+    path(
+        "<int:pk>/", catalog_view(AsyncRestaurantDetails), name="restaurantDetails-list"
+    ),
+    path(
+        "<int:pk>/availability/",
+        FoodItemAvailability.as_view(),
+        name="food-item-availability",
+    ),
+    path("<int:pk>/menu/", RestaurantMenu.as_view(), name="restaurant-menu"),
+    path("food-items/", catalog_view(AsyncFoodItems), name="food_item"),
     path("food-item/<int:pk>/", FoodItemList.as_view(), name="fooditem-detail"),
     path("create-food-items/", FoodItemCreateView.as_view(), name="create-food-item"),
 ]
@@ -1,40 +1,142 @@
+import io
 import json
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import MultiPartParser
 from restaurants.models import Restaurant, FoodItem
-from .serializers import RestaurantSerializer, FoodItemSerializer
-from .pagination import StandardResultSetPagination
+from restaurants.search import search_restaurants, ranked_restaurant_ids, order_by_rank
+from restaurants.availability import set_availability
+from restaurants.geo import nearby_restaurants, restaurant_local_time
+from restaurants.menu_io import (
+    FORMATS,
+    MenuImportError,
+    export_rows,
+    format_from_name,
+    import_menu,
+    read_rows,
+    render_rows,
+)
+from .serializers import (
+    RestaurantSerializer,
+    FoodItemSerializer,
+    FoodItemAvailabilitySerializer,
+    NearbyQuerySerializer,
+)
+from .pagination import StandardResultSetPagination, RestaurantCursorPagination
+from .queries import restaurant_queryset, food_item_queryset
+from .documents import (
+    get_menu_document,
+    aget_menu_document,
+    absolutize_menu_document,
+)
+from .readers import RestaurantReader, FoodItemReader
+from asgiref.sync import sync_to_async
+from api.v1.async_views import AsyncCatalogView
+from api.v1.compiled import compiled_reads_enabled
+from api.v1.renderers import StreamingJSONResponse, aiter_json_envelope
 
 
 class RestaurantList(APIView):
     # permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        restaurants = Restaurant.objects.all()
+        if "lat" in request.GET or "lng" in request.GET:
+            return self.get_nearby(request)
+
+        compiled = compiled_reads_enabled()
+        # The compiled reader fetches its own rows, so pages only need ids
+        restaurants = (
+            Restaurant.objects.only("id") if compiled else restaurant_queryset()
+        )
 
         query = request.GET.get("q")
         if query:
-            restaurants = restaurants.filter(name__icontains=query)
+            restaurants = search_restaurants(restaurants, query)
 
-        pagination = StandardResultSetPagination()
-        paginated_restaurants = pagination.paginate_queryset(restaurants, request)
+        # Keyset pages follow id order, so ranked search results stay on page numbers.
+        if "cursor" in request.GET and not query:
+            pagination = RestaurantCursorPagination()
+            paginated_restaurants = pagination.paginate_queryset(restaurants, request)
+            count = pagination.count
+        else:
+            pagination = StandardResultSetPagination()
+            paginated_restaurants = pagination.paginate_queryset(restaurants, request)
+            count = pagination.page.paginator.count
 
-        serializer = RestaurantSerializer(
-            paginated_restaurants, many=True, context={"request": request}
-        )
+        if compiled:
+            data = RestaurantReader({"request": request}).read(paginated_restaurants)
+        else:
+            data = RestaurantSerializer(
+                paginated_restaurants, many=True, context={"request": request}
+            ).data
 
         response_data = {
             "status_code": 6000,
-            "count": pagination.page.paginator.count,
+            "count": count,
             "next": pagination.get_next_link(),
             "previous": pagination.get_previous_link(),
-            "data": serializer.data,
+            "data": data,
         }
 
         return Response(response_data)
 
+    def get_nearby(self, request):
+        """
+        Restaurants within ?radius= km (5 by default) of ?lat=&lng=, nearest
+        first with their distance_km; ?open_now=1 keeps the ones open now.
+        """
+        params = NearbyQuerySerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(
+                {
+                    "status_code": 400,
+                    "message": "Invalid location.",
+                    "errors": params.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        location = params.validated_data
+        nearby = nearby_restaurants(
+            location["lat"],
+            location["lng"],
+            location["radius"],
+            open_at=restaurant_local_time() if location["open_now"] else None,
+        )
+        query = request.GET.get("q")
+        if query:
+            hits = set(ranked_restaurant_ids(query))
+            nearby = [(pk, distance) for pk, distance in nearby if pk in hits]
+        distances = dict(nearby)
+
+        pagination = StandardResultSetPagination()
+        page = pagination.paginate_queryset(list(distances), request)
+        if compiled_reads_enabled():
+            data = RestaurantReader({"request": request}).read(page)
+        else:
+            restaurants = restaurant_queryset().in_bulk(page)
+            data = RestaurantSerializer(
+                [restaurants[pk] for pk in page if pk in restaurants],
+                many=True,
+                context={"request": request},
+            ).data
+        for restaurant in data:
+            restaurant["distance_km"] = round(distances[restaurant["id"]], 3)
+
+        return Response(
+            {
+                "status_code": 6000,
+                "count": pagination.page.paginator.count,
+                "next": pagination.get_next_link(),
+                "previous": pagination.get_previous_link(),
+                "data": data,
+            }
+        )
+
     def post(self, request):
         serializer = RestaurantSerializer(
             data=request.data, context={"request": request}
@@ -64,19 +166,7 @@ class RestaurantDetails(APIView):
 
     def get(self, request, pk):
         try:
-
-            restaurant = Restaurant.objects.get(pk=pk)
-
-            serializer = RestaurantSerializer(restaurant, context={"request": request})
-            restaurant_data = serializer.data
-
-            food_menu = [
-                item
-                for item in restaurant_data.get("food_menu", [])
-                if not item.get("is_available", False)
-            ]
-
-            restaurant_data["food_menu"] = food_menu
+            restaurant_data = absolutize_menu_document(get_menu_document(pk), request)
 
             return Response(
                 {
@@ -101,7 +191,7 @@ class FoodItemList(APIView):
 
     def get(self, request, pk: int) -> Response:
         try:
-            food_item = FoodItem.objects.get(pk=pk, is_available=False)
+            food_item = food_item_queryset().get(pk=pk, is_available=True)
             serializer = FoodItemSerializer(food_item, context={"request": request})
             return Response(
                 {
@@ -123,9 +213,22 @@ class FoodItemList(APIView):
 class FoodItems(APIView):
 
     permission_classes = [AllowAny]
+    stream_chunk_size = 500
 
     def get(self, request):
-        food_items = FoodItem.objects.filter(is_available=False)
+        food_items = food_item_queryset().filter(is_available=True)
+
+        # The catalog is unpaginated, so JSON clients get it streamed
+        if isinstance(request.accepted_renderer, JSONRenderer):
+            return StreamingJSONResponse(
+                {"status_code": 6000},
+                "data",
+                food_items,
+                lambda chunk: FoodItemSerializer(
+                    chunk, many=True, context={"request": request}
+                ).data,
+                chunk_size=self.stream_chunk_size,
+            )
 
         serializer = FoodItemSerializer(
             food_items, many=True, context={"request": request}
@@ -149,3 +252,245 @@ class FoodItemCreateView(APIView):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def owned_restaurant(request, pk):
+    """(restaurant, None) for the request user's restaurant, else (None, error)."""
+    try:
+        restaurant = Restaurant.objects.get(pk=pk)
+    except Restaurant.DoesNotExist:
+        return None, Response(
+            {"status_code": 6001, "message": "Restaurant not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if restaurant.owner_name_id != request.user.pk:
+        return None, Response(
+            {"error": "You are not authorized to update this menu."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return restaurant, None
+
+
+class FoodItemAvailability(APIView):
+    """Owners mark many menu items available or unavailable at once."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        restaurant, error = owned_restaurant(request, pk)
+        if error:
+            return error
+
+        serializer = FoodItemAvailabilitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "status_code": 400,
+                    "message": "Availability update failed.",
+                    "errors": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        food_item_ids = set(serializer.validated_data["food_items"])
+        unknown = food_item_ids - set(
+            restaurant.food_items.filter(pk__in=food_item_ids).values_list(
+                "id", flat=True
+            )
+        )
+        if unknown:
+            return Response(
+                {
+                    "status_code": 400,
+                    "message": "Availability update failed.",
+                    "errors": {
+                        "food_items": [
+                            f"Not on this restaurant's menu: {sorted(unknown)}"
+                        ]
+                    },
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        is_available = serializer.validated_data["is_available"]
+        changed = set_availability(restaurant.pk, food_item_ids, is_available)
+        return Response(
+            {
+                "status_code": 6000,
+                "data": {"is_available": is_available, "updated": sorted(changed)},
+            }
+        )
+
+
+class RestaurantMenu(APIView):
+    """
+    Owners export their whole menu as JSON lines, or CSV with ?as=csv, and
+    import one in either format as the request body or as a multipart upload
+    in a "file" field. Imports upsert items, see restaurants/menu_io.py.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    body_formats = {
+        "text/csv": "csv",
+        "application/x-ndjson": "jsonl",
+        "application/jsonl": "jsonl",
+    }
+
+    def get(self, request, pk):
+        restaurant, error = owned_restaurant(request, pk)
+        if error:
+            return error
+
+        fmt = request.query_params.get("as", "jsonl")
+        if fmt not in FORMATS:
+            return Response(
+                {"status_code": 400, "message": f"Export as one of {FORMATS}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(
+            render_rows(export_rows([restaurant.pk]), fmt),
+            content_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="menu-{restaurant.pk}.{fmt}"'
+        )
+        return response
+
+    def post(self, request, pk):
+        restaurant, error = owned_restaurant(request, pk)
+        if error:
+            return error
+
+        media_type = request.content_type.split(";")[0].strip().lower()
+        try:
+            if media_type == "multipart/form-data":
+                upload = request.FILES.get("file")
+                if upload is None:
+                    return Response(
+                        {"status_code": 400, "message": "No file was submitted."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                fmt = format_from_name(upload.name)
+                lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            elif media_type in self.body_formats:
+                fmt = self.body_formats[media_type]
+                lines = io.StringIO(request.body.decode("utf-8-sig"), newline="")
+            else:
+                return Response(
+                    {
+                        "status_code": 415,
+                        "message": "Send CSV or JSON lines, or upload a file.",
+                    },
+                    status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                )
+            summary = import_menu(read_rows(lines, fmt), restaurant_id=restaurant.pk)
+        except UnicodeDecodeError:
+            return Response(
+                {"status_code": 400, "message": "Menus must be UTF-8 encoded."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except MenuImportError as exc:
+            return Response(
+                {
+                    "status_code": 400,
+                    "message": "Menu import failed.",
+                    "errors": exc.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"status_code": 6000, "data": summary})
+
+
+class AsyncRestaurantList(AsyncCatalogView):
+    sync_view_class = RestaurantList
+
+    def serves_async(self, request):
+        # Only the compiled reader has an async fetch; nearby searches are
+        # CPU-bound past the index scan and stay in the DRF view
+        return (
+            compiled_reads_enabled()
+            and "lat" not in request.GET
+            and "lng" not in request.GET
+            and super().serves_async(request)
+        )
+
+    async def get(self, request):
+        restaurants = Restaurant.objects.only("id")
+
+        query = request.GET.get("q")
+        if query:
+            restaurant_ids = await sync_to_async(ranked_restaurant_ids)(query)
+            restaurants = order_by_rank(restaurants, restaurant_ids)
+
+        if "cursor" in request.GET and not query:
+            pagination = RestaurantCursorPagination()
+            page = await pagination.apaginate_queryset(restaurants, request)
+            count = pagination.count
+        else:
+            pagination = StandardResultSetPagination()
+            page = await pagination.apaginate_queryset(restaurants, request)
+            count = pagination.page.paginator.count
+
+        return self.render(
+            {
+                "status_code": 6000,
+                "count": count,
+                "next": pagination.get_next_link(),
+                "previous": pagination.get_previous_link(),
+                "data": await RestaurantReader({"request": request}).aread(page),
+            }
+        )
+
+
+class AsyncRestaurantDetails(AsyncCatalogView):
+    sync_view_class = RestaurantDetails
+
+    async def get(self, request, pk):
+        try:
+            document = await aget_menu_document(pk)
+        except Restaurant.DoesNotExist:
+            return self.render(
+                {"status_code": 6001, "message": "Restaurant not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return self.render(
+            {
+                "status_code": 6000,
+                "data": absolutize_menu_document(document, request),
+            }
+        )
+
+
+class AsyncFoodItems(AsyncCatalogView):
+    sync_view_class = FoodItems
+
+    def serves_async(self, request):
+        return compiled_reads_enabled() and super().serves_async(request)
+
+    async def get(self, request):
+        return StreamingHttpResponse(
+            aiter_json_envelope(
+                {"status_code": 6000},
+                "data",
+                self.chunks(FoodItemReader({"request": request})),
+            ),
+            content_type="application/json",
+        )
+
+    async def chunks(self, reader):
+        chunk_size = self.sync_view_class.stream_chunk_size
+        rows = (
+            FoodItem.objects.filter(is_available=True)
+            .order_by("id")
+            .values(*reader.value_columns)
+            .aiterator(chunk_size=chunk_size)
+        )
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield await reader.aread_rows(chunk)
+                chunk = []
+        if chunk:
+            yield await reader.aread_rows(chunk)
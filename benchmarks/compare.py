@@ -0,0 +1,48 @@
+"""
+Compare two benchmarks.run result files, e.g. from two commits.
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+
+METRICS = ["p50_ms", "p99_ms", "queries_per_request", "peak_memory_kib"]
+
+
+def change(before, after):
+    if before is None or after is None:
+        return "n/a"
+    if not before:
+        return f"{after}"
+    return f"{after} ({(after - before) / before:+.0%})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    options = parser.parse_args()
+
+    with open(options.before) as before_file, open(options.after) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+
+    print(
+        f"{before['commit']} ({before['database']}) -> {after['commit']} ({after['database']})"
+    )
+    if before["dataset"] != after["dataset"]:
+        print(f"datasets differ: {before['dataset']} vs {after['dataset']}")
+
+    print(f"{'scenario':20}" + "".join(f"{metric:>28}" for metric in METRICS))
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name, {})
+        print(
+            f"{name:20}"
+            + "".join(
+                f"{change(old.get(metric), new.get(metric)):>28}" for metric in METRICS
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import random
+from dataclasses import dataclass, field
+from datetime import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.models import User
+from orders.models import Order, OrderItem
+from restaurants.models import Restaurant, FoodItem, Category, Locations
+from restaurants.geo import encode
+from restaurants.search import refresh_search_documents
+
+PASSWORD = "benchmark-password"
+
+CATEGORY_NAMES = ["Biryani", "Kerala", "Chinese", "Desserts", "Juices", "Pizza"]
+LOCATION_NAMES = ["Kochi", "Kozhikode", "Thrissur", "Kannur"]
+DISHES = ["Biryani", "Parotta", "Beef Fry", "Mandi", "Shawarma", "Falooda", "Appam"]
+
+# Restaurants are spread over a box of about 40km around this point
+CENTER = (9.9312, 76.2673)
+SPREAD_DEGREES = 0.2
+
+
+@dataclass
+class Dataset:
+    restaurant_ids: list = field(default_factory=list)
+    menus: dict = field(default_factory=dict)
+    customers: list = field(default_factory=list)
+    password: str = PASSWORD
+
+    def describe(self):
+        return {
+            "restaurants": len(self.restaurant_ids),
+            "food_items": sum(len(menu) for menu in self.menus.values()),
+            "customers": len(self.customers),
+            "orders": Order.objects.count(),
+        }
+
+
+def generate(restaurants, items, orders, customers=20, seed=0):
+    """
+    Insert `restaurants` restaurants with `items` food items each and `orders`
+    orders spread over `customers` customers, reproducibly for a given seed.
+    """
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+
+    coordinates = [
+        tuple(
+            Decimal(f"{center + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES):.6f}")
+            for center in CENTER
+        )
+        for _ in range(restaurants)
+    ]
+
+    with transaction.atomic():
+        categories = Category.objects.bulk_create(
+            [Category(name=name) for name in CATEGORY_NAMES]
+        )
+        locations = Locations.objects.bulk_create(
+            [Locations(name=name) for name in LOCATION_NAMES]
+        )
+        owners = User.objects.bulk_create(
+            [
+                User(
+                    username=f"owner-{index}",
+                    password=password,
+                    role=User.RESTAURANT_OWNER,
+                )
+                for index in range(restaurants)
+            ]
+        )
+        customer_users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"customer-{index}", password=password, role=User.CUSTOMER
+                )
+                for index in range(customers)
+            ]
+        )
+
+        restaurant_rows = Restaurant.objects.bulk_create(
+            [
+                Restaurant(
+                    owner_name=owner,
+                    name=f"{rng.choice(DISHES)} House {index}",
+                    featured_image=f"restaurants/images/{index}.jpg",
+                    rating=Decimal(rng.randint(30, 50)) / 10,
+                    location=rng.choice(locations),
+                    email=f"owner-{index}@example.com",
+                    address=f"{index} MG Road",
+                    phone_number="9999999999",
+                    working_days=["monday", "tuesday", "wednesday", "thursday"],
+                    opening_time=time(9, 0),
+                    closing_time=time(22, 30),
+                    delivery_time="30 mins",
+                    latitude=latitude,
+                    longitude=longitude,
+                    # bulk_create skips the pre_save signal that sets it
+                    geohash=encode(float(latitude), float(longitude)),
+                )
+                for (index, owner), (latitude, longitude) in zip(
+                    enumerate(owners), coordinates
+                )
+            ]
+        )
+        Restaurant.categories.through.objects.bulk_create(
+            [
+                Restaurant.categories.through(
+                    restaurant_id=restaurant.pk, category_id=category.pk
+                )
+                for restaurant in restaurant_rows
+                for category in rng.sample(categories, 2)
+            ]
+        )
+
+        food_items = FoodItem.objects.bulk_create(
+            [
+                FoodItem(
+                    restaurant=restaurant,
+                    name=f"{rng.choice(DISHES)} {index}",
+                    description="House special",
+                    price=Decimal(rng.randint(40, 400)),
+                    rating=Decimal(rng.randint(30, 50)) / 10,
+                    image=f"food_items/images/{index}.jpg",
+                )
+                for restaurant in restaurant_rows
+                for index in range(items)
+            ]
+        )
+        FoodItem.categories.through.objects.bulk_create(
+            [
+                FoodItem.categories.through(
+                    fooditem_id=food_item.pk, category_id=rng.choice(categories).pk
+                )
+                for food_item in food_items
+            ]
+        )
+
+        menus = {restaurant.pk: [] for restaurant in restaurant_rows}
+        for food_item in food_items:
+            menus[food_item.restaurant_id].append(food_item)
+
+        order_rows, order_item_rows = [], []
+        order_ids = Order.generate_order_ids(orders)
+        for order_id in order_ids:
+            restaurant = rng.choice(restaurant_rows)
+            lines = rng.sample(menus[restaurant.pk], min(3, len(menus[restaurant.pk])))
+            order = Order(
+                order_id=order_id,
+                user=rng.choice(customer_users),
+                restaurant=restaurant,
+                customer_location="Kakkanad",
+                customer_phone="9999999999",
+                total_price=sum((item.price for item in lines), Decimal("0.00")),
+            )
+            order_rows.append(order)
+            order_item_rows.append(lines)
+        Order.objects.bulk_create(order_rows)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=order, menu_item=item, quantity=1)
+                for order, lines in zip(order_rows, order_item_rows)
+                for item in lines
+            ]
+        )
+
+    # bulk_create() skips the signals that maintain search documents
+    refresh_search_documents([restaurant.pk for restaurant in restaurant_rows])
+    return Dataset(
+        restaurant_ids=[restaurant.pk for restaurant in restaurant_rows],
+        menus={pk: [item.pk for item in menu] for pk, menu in menus.items()},
+        customers=[user.username for user in customer_users],
+    )
@@ -0,0 +1,78 @@
+"""
+Time password hashing at several PBKDF2 round counts to pick
+PASSWORD_HASH_ITERATIONS.
+
+    python -m benchmarks.hashers [--iterations 600000 900000 --concurrency 16]
+
+For each round count this reports the latency of one hash and the throughput
+of `concurrency` simultaneous logins, hashed on the calling threads and then
+through the PASSWORD_HASH_WORKERS pool. Pick the highest round count whose
+latency and throughput fit the login budget. Round counts below Django's
+default are raised to it, as the hasher does, and reported as such.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from accounts.hashers import PooledPBKDF2PasswordHasher  # noqa: E402
+
+
+def latency_ms(hasher, samples):
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.encode("benchmark-password", hasher.salt())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def throughput(hasher, concurrency, per_thread):
+    def logins(_):
+        for _ in range(per_thread):
+            hasher.encode("benchmark-password", hasher.salt())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as requests:
+        list(requests.map(logins, range(concurrency)))
+    return concurrency * per_thread / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        nargs="+",
+        default=[600_000, 800_000, 1_000_000, 1_200_000],
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="logins")
+    parser.add_argument("--samples", type=int, default=5)
+    options = parser.parse_args()
+
+    workers = settings.PASSWORD_HASH_WORKERS
+    print(f"{os.cpu_count()} cpus, {workers} hash pool workers")
+    print(f"{'iterations':>10} {'ms/hash':>9} {'inline/s':>9} {'pooled/s':>9}")
+    for iterations in options.iterations:
+        with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+            hasher = PooledPBKDF2PasswordHasher()
+            with override_settings(PASSWORD_HASH_WORKERS=0):
+                latency = latency_ms(hasher, options.samples)
+                inline = throughput(hasher, options.concurrency, options.samples)
+            pooled = throughput(hasher, options.concurrency, options.samples)
+            iterations = hasher.iterations
+        print(f"{iterations:>10} {latency:>9.1f} {inline:>9.1f} {pooled:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Compare ORJSONRenderer/ORJSONParser with DRF's JSONRenderer/JSONParser on
+payloads shaped like the RestaurantDetails and order-list responses.
+
+    python -m benchmarks.renderers [--number 200]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import timeit
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "swiggy.settings")
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.v1.renderers import ORJSONParser, ORJSONRenderer, orjson  # noqa: E402
+
+
+def food_item(index, restaurant_id, native):
+    price = Decimal("80.00") + index
+    return {
+        "id": index,
+        "categories": ["Biryani", "Kerala"],
+        "restaurant": restaurant_id,
+        "image": f"http://localhost:8000/media/food_items/images/{index}.jpg",
+        "name": f"Chicken Biryani {index}",
+        "description": "Malabar style dum biryani with raita and pickle",
+        "price": price if native else str(price),
+        "food_type": "non-veg",
+        "rating": Decimal("4.3") if native else "4.3",
+        "is_available": True,
+    }
+
+
+def restaurant_details(native, menu_size=60):
+    opening, closing = time(9, 0), time(22, 30)
+    return {
+        "status_code": 6000,
+        "data": {
+            "id": 1,
+            "categories": ["Biryani", "Kerala", "Desserts"],
+            "location": "Kochi",
+            "food_menu": [food_item(i, 1, native) for i in range(menu_size)],
+            "featured_image": "http://localhost:8000/media/restaurants/1.jpg",
+            "name": "Paragon",
+            "rating": Decimal("4.6") if native else "4.6",
+            "outlet": "Kozhikode",
+            "email": "paragon@example.com",
+            "address": "Kannur Road, Kozhikode",
+            "phone_number": "9999999999",
+            "working_days": ["monday", "tuesday", "wednesday", "thursday"],
+            "opening_time": opening if native else opening.isoformat(),
+            "closing_time": closing if native else closing.isoformat(),
+            "offer_text": "20% off",
+            "delivery_time": "30 mins",
+            "owner_name": 2,
+        },
+    }
+
+
+def order_list(native, page_size=100):
+    start = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+    orders = []
+    for index in range(page_size):
+        created_at = start - timedelta(minutes=index, microseconds=index)
+        total = Decimal("243.00") + index
+        orders.append(
+            {
+                "id": index,
+                "restaurant": {"id": 1, "name": "Paragon"},
+                "total_price": total if native else str(total),
+                "status": "PENDING",
+                "created_at": (
+                    created_at
+                    if native
+                    else created_at.isoformat().replace("+00:00", "Z")
+                ),
+                "order_items": [
+                    {
+                        "id": index * 3 + line,
+                        "menu_item": {
+                            key: food_item(line, 1, native)[key]
+                            for key in ("id", "name", "price", "image")
+                        },
+                        "quantity": line + 1,
+                    }
+                    for line in range(3)
+                ],
+                "user": "customer",
+                "customer_location": "Kakkanad",
+                "customer_phone": "9999999999",
+                "is_deleted": False,
+            }
+        )
+    return {"count": 5000, "next": None, "previous": None, "results": orders}
+
+
+def measure(function, number, repeat=5):
+    timings = timeit.repeat(function, number=number, repeat=repeat)
+    return statistics.median(timings) / number * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=200)
+    options = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed; ORJSON* classes fall back to stdlib json")
+
+    payloads = {
+        "restaurant details": restaurant_details(native=False),
+        "restaurant details (native types)": restaurant_details(native=True),
+        "order list": order_list(native=False),
+        "order list (native types)": order_list(native=True),
+    }
+
+    print(f"{'payload':36} {'step':6} {'drf us':>10} {'orjson us':>10} {'speedup':>8}")
+    for name, payload in payloads.items():
+        body = JSONRenderer().render(payload)
+        assert ORJSONRenderer().render(payload) == body, name
+
+        results = {
+            "render": (
+                measure(lambda: JSONRenderer().render(payload), options.number),
+                measure(lambda: ORJSONRenderer().render(payload), options.number),
+            ),
+            "parse": (
+                measure(lambda: JSONParser().parse(io.BytesIO(body)), options.number),
+                measure(lambda: ORJSONParser().parse(io.BytesIO(body)), options.number),
+            ),
+        }
+        for step, (default, fast) in results.items():
+            print(
+                f"{name:36} {step:6} {default:10.1f} {fast:10.1f} "
+                f"{default / fast:7.1f}x"
+            )
+        print(f"{'':36} {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    main()
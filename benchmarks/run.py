@@ -0,0 +1,389 @@
+"""
+Benchmark the API hot paths on generated data and store the results as JSON.
+
+    python -m benchmarks.run [--restaurants 50 --items 20 --orders 2000]
+    python -m benchmarks.run --url http://127.0.0.1:8000
+
+By default requests go through the Django test client against a fresh test
+database, which also reports queries and peak memory per request. With --url
+the data is written to the benchmark database instead and a server started
+with DJANGO_SETTINGS_MODULE=benchmarks.settings is driven over HTTP, which
+reports latency only. Compare two result files with benchmarks.compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from api.v1.representation_cache import stats as representation_stats  # noqa: E402
+from benchmarks.data import CENTER, SPREAD_DEGREES, generate  # noqa: E402
+from restaurants.geo import nearby_candidates, nearby_restaurants  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class InProcessClient:
+    measures_queries = True
+
+    def __init__(self):
+        self.client = APIClient()
+
+    def request(self, method, path, data=None, token=None):
+        extra = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        if data is not None:
+            extra["format"] = "json"
+        response = getattr(self.client, method)(path, data, **extra)
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+        return response.status_code, len(body)
+
+
+class HTTPClient:
+    measures_queries = False
+
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self.session.request(
+            method, self.base_url + path, json=data, headers=headers
+        )
+        return response.status_code, len(response.content)
+
+
+class Scenario:
+    """One endpoint; build() returns the next (method, path, data, token)."""
+
+    # Logins hash a password, so fewer of them keep runs short
+    max_requests = None
+
+    def __init__(self, dataset, tokens, rng):
+        self.dataset = dataset
+        self.tokens = tokens
+        self.rng = rng
+
+    def customer(self):
+        username = self.rng.choice(self.dataset.customers)
+        return username, self.tokens[username]
+
+    def summary(self):
+        """Extra results, computed after the timed requests."""
+        return {}
+
+
+class RestaurantList(Scenario):
+    name = "restaurant-list"
+
+    def build(self):
+        pages = max(len(self.dataset.restaurant_ids) // 10, 1)
+        path = f"{reverse('restaurant-list')}?page={self.rng.randint(1, pages)}"
+        return "get", path, None, None
+
+
+class NearbyRestaurants(Scenario):
+    name = "nearby-restaurants"
+    # NearbyQuerySerializer's default radius
+    radius_km = 5
+    # Rows read from the geohash index per restaurant in range; the covering
+    # cells span about 8 times the circle's area
+    max_candidates_per_hit = 12
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.points = []
+
+    def build(self):
+        latitude, longitude = (
+            center + self.rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            for center in CENTER
+        )
+        self.points.append((latitude, longitude))
+        return (
+            "get",
+            f"{reverse('restaurant-list')}?lat={latitude:.6f}&lng={longitude:.6f}",
+            None,
+            None,
+        )
+
+    def summary(self):
+        candidates = hits = 0
+        for latitude, longitude in self.points:
+            candidates += nearby_candidates(latitude, longitude, self.radius_km).count()
+            hits += len(nearby_restaurants(latitude, longitude, self.radius_km))
+        if hits and candidates / hits > self.max_candidates_per_hit:
+            raise AssertionError(
+                f"{candidates / hits:.1f} candidates per nearby restaurant, "
+                f"expected at most {self.max_candidates_per_hit}"
+            )
+        return {
+            "candidates_per_request": round(candidates / len(self.points), 2),
+            "candidates_per_hit": round(candidates / hits, 2) if hits else None,
+        }
+
+
+class RestaurantDetails(Scenario):
+    name = "restaurant-details"
+
+    def build(self):
+        restaurant_id = self.rng.choice(self.dataset.restaurant_ids)
+        return (
+            "get",
+            reverse("restaurantDetails-list", args=[restaurant_id]),
+            None,
+            None,
+        )
+
+
+class FoodItems(Scenario):
+    name = "food-items"
+
+    def build(self):
+        return "get", reverse("food_item"), None, None
+
+
+class OrderCreate(Scenario):
+    name = "order-create"
+
+    def build(self):
+        restaurant_id = self.rng.choice(self.dataset.restaurant_ids)
+        menu = self.dataset.menus[restaurant_id]
+        payload = {
+            "restaurant": restaurant_id,
+            "customer_location": "Kakkanad",
+            "customer_phone": "9999999999",
+            "order_items": [
+                {"menu_item": pk, "quantity": self.rng.randint(1, 3)}
+                for pk in self.rng.sample(menu, min(2, len(menu)))
+            ],
+        }
+        return "post", reverse("order-list-create"), payload, self.customer()[1]
+
+
+class OrderList(Scenario):
+    name = "order-list"
+
+    def build(self):
+        return "get", reverse("order-list-create"), None, self.customer()[1]
+
+
+class Login(Scenario):
+    name = "login"
+    max_requests = 20
+
+    def build(self):
+        username = self.customer()[0]
+        payload = {"username": username, "password": self.dataset.password}
+        return "post", reverse("login"), payload, None
+
+
+SCENARIOS = [
+    RestaurantList,
+    NearbyRestaurants,
+    RestaurantDetails,
+    FoodItems,
+    OrderCreate,
+    OrderList,
+    Login,
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def hit_rate(lookups):
+    """Share of cache lookups that hit, or None without lookups."""
+    total = lookups["hits"] + lookups["misses"]
+    return round(lookups["hits"] / total, 3) if total else None
+
+
+def run_scenario(client, scenario, requests_count, warmup, samples):
+    if scenario.max_requests:
+        requests_count = min(requests_count, scenario.max_requests)
+        samples = min(samples, scenario.max_requests)
+    for _ in range(warmup):
+        client.request(*scenario.build())
+
+    latencies, statuses, sizes = [], {}, []
+    lookups_before = representation_stats.copy()
+    for _ in range(requests_count):
+        request = scenario.build()
+        started = time.perf_counter()
+        status, size = client.request(*request)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+        sizes.append(size)
+
+    result = {
+        "requests": requests_count,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "throughput_rps": round(1000 * requests_count / sum(latencies), 1),
+        "mean_response_bytes": round(statistics.mean(sizes)),
+        "status_codes": {str(status): count for status, count in statuses.items()},
+        "representation_cache_hit_rate": hit_rate(
+            representation_stats - lookups_before
+        ),
+        "queries_per_request": None,
+        "peak_memory_kib": None,
+    }
+    if client.measures_queries and samples:
+        result.update(instrumented_pass(client, scenario, samples))
+    result.update(scenario.summary())
+    return result
+
+
+def instrumented_pass(client, scenario, samples):
+    """Queries and tracemalloc peaks, kept out of the timed requests."""
+    queries, peaks = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            request = scenario.build()
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            with CaptureQueriesContext(connection) as captured:
+                client.request(*request)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            queries.append(len(captured))
+    finally:
+        tracemalloc.stop()
+    return {
+        "queries_per_request": round(statistics.mean(queries), 2),
+        "peak_memory_kib": round(max(peaks) / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--restaurants", type=int, default=50)
+    parser.add_argument("--items", type=int, default=20, help="per restaurant")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=20, help="instrumented")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[scenario.name for scenario in SCENARIOS],
+        help="run only these scenarios",
+    )
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--output", type=Path)
+    options = parser.parse_args()
+
+    if options.url:
+        call_command("migrate", verbosity=0)
+        call_command("flush", interactive=False, verbosity=0)
+        client = HTTPClient(options.url)
+        test_database = None
+    else:
+        test_database = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        client = InProcessClient()
+
+    try:
+        dataset = generate(
+            options.restaurants,
+            options.items,
+            options.orders,
+            customers=options.customers,
+            seed=options.seed,
+        )
+        tokens = {
+            user.username: str(RefreshToken.for_user(user).access_token)
+            for user in User.objects.filter(username__in=dataset.customers)
+        }
+        dataset_summary = dataset.describe()
+        rng = random.Random(options.seed)
+
+        results = {}
+        for scenario_class in SCENARIOS:
+            if options.scenario and scenario_class.name not in options.scenario:
+                continue
+            scenario = scenario_class(dataset, tokens, rng)
+            results[scenario.name] = run_scenario(
+                client, scenario, options.requests, options.warmup, options.samples
+            )
+            print(
+                f"{scenario.name:20} p50 {results[scenario.name]['p50_ms']:8.2f}ms"
+                f"  p99 {results[scenario.name]['p99_ms']:8.2f}ms"
+                f"  queries {results[scenario.name]['queries_per_request']}"
+                f"  peak {results[scenario.name]['peak_memory_kib']} KiB"
+                f"  cache hits {results[scenario.name]['representation_cache_hit_rate']}"
+            )
+    finally:
+        if test_database is not None:
+            connection.creation.destroy_test_db(test_database, verbosity=0)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database": connection.vendor,
+        "target": options.url or "test-client",
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "dataset": dataset_summary,
+        "options": {
+            "requests": options.requests,
+            "warmup": options.warmup,
+            "samples": options.samples,
+            "seed": options.seed,
+        },
+        "scenarios": results,
+    }
+    output = options.output or RESULTS_DIR / (
+        f"{report['commit'] or 'unknown'}-{report['database']}-"
+        f"{datetime.now():%Y%m%d%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Settings for benchmark runs: the app's settings on a throwaway database.
+
+Uses a SQLite file in the temp directory unless BENCHMARK_DATABASE_URL points
+somewhere else, e.g. postgres://postgres@localhost/swiggy_benchmark. Serve it
+with `DJANGO_SETTINGS_MODULE=benchmarks.settings gunicorn swiggy.wsgi` to
+benchmark over HTTP.
+"""
+
+import os
+import tempfile
+
+import dj_database_url
+
+from swiggy.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": dj_database_url.parse(
+        os.environ.get(
+            "BENCHMARK_DATABASE_URL",
+            "sqlite:///"
+            + os.path.join(tempfile.gettempdir(), "swiggy-benchmark.sqlite3"),
+        ),
+        conn_max_age=600,
+    )
+}
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+PROFILING_ENABLED = False
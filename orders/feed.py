@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+
+
+class Subscription:
+    """A consumer's buffered view of one channel."""
+
+    def __init__(self, broker, channel, max_queue_size):
+        self.broker = broker
+        self.channel = channel
+        self.max_queue_size = max_queue_size
+
+    def deliver(self, event):
+        raise NotImplementedError
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class SyncSubscription(Subscription):
+    def __init__(self, broker, channel, max_queue_size):
+        super().__init__(broker, channel, max_queue_size)
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+    def deliver(self, event):
+        # Slow consumers lose their oldest events rather than block publishers
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """
+    Subscription consumed from an event loop. The loop is bound on the first
+    get(), so events published before then are buffered.
+    """
+
+    def __init__(self, broker, channel, max_queue_size):
+        super().__init__(broker, channel, max_queue_size)
+        self.lock = threading.Lock()
+        self.loop = None
+        self.queue = None
+        self.pending = deque(maxlen=max_queue_size)
+
+    def deliver(self, event):
+        with self.lock:
+            if self.loop is None:
+                self.pending.append(event)
+                return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The consumer's loop has shut down
+            self.close()
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        if self.queue is None:
+            with self.lock:
+                self.loop = asyncio.get_running_loop()
+                self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+                while self.pending:
+                    self._put(self.pending.popleft())
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BaseBroker:
+    """
+    Fan-out backend for order events. publish() may be called from any thread;
+    subscribe() returns a SyncSubscription or an AsyncSubscription.
+    """
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def publish_many(self, messages):
+        """Publish (channel, event) pairs."""
+        for channel, event in messages:
+            self.publish(channel, event)
+
+    def subscribe(self, channel, asynchronous=False):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def has_subscribers(self, channel):
+        # Backends that cannot tell should keep the default
+        return True
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Delivers events to subscribers in the same process only, so feeds must be
+    served by the process that handles the writes, e.g. in development.
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        """Fan an event out to this process's subscribers of `channel`."""
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel, asynchronous=False):
+        subscription_class = AsyncSubscription if asynchronous else SyncSubscription
+        subscription = subscription_class(self, channel, self.max_queue_size)
+        with self.lock:
+            self.subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+    def has_subscribers(self, channel):
+        return bool(self.subscribers.get(channel))
+
+
+class DatabaseBroker(InProcessBroker):
+    """
+    Shares events between processes through the OrderEvent table. publish()
+    inserts a row, and while a process has subscribers a thread polls for new
+    rows every ORDER_FEED_POLL_INTERVAL seconds and fans them out locally.
+
+    Rows are read again for ORDER_FEED_POLL_WINDOW seconds after they were
+    created, so an event whose insert commits late is still delivered, once.
+    Older rows are deleted by the pollers.
+    """
+
+    def __init__(self, max_queue_size=100, poll_interval=None, window=None):
+        super().__init__(max_queue_size)
+        if poll_interval is None:
+            poll_interval = getattr(settings, "ORDER_FEED_POLL_INTERVAL", 1.0)
+        if window is None:
+            window = getattr(settings, "ORDER_FEED_POLL_WINDOW", 30)
+        self.poll_interval = poll_interval
+        self.window = timedelta(seconds=window)
+        self.poller = None
+        self.started = None
+        # Ids of the rows within the window that were already delivered
+        self.seen = {}
+        self.next_cleanup = None
+
+    def publish(self, channel, event):
+        self.publish_many([(channel, event)])
+
+    def publish_many(self, messages):
+        from orders.models import OrderEvent
+
+        OrderEvent.objects.bulk_create(
+            [OrderEvent(channel=channel, payload=event) for channel, event in messages]
+        )
+
+    def subscribe(self, channel, asynchronous=False):
+        subscription = super().subscribe(channel, asynchronous)
+        with self.lock:
+            if self.poller is None:
+                # Only events created from now on are delivered
+                self.started = timezone.now()
+                self.seen = {}
+                self.poller = threading.Thread(
+                    target=self.run, name="order-feed-poller", daemon=True
+                )
+                self.poller.start()
+        return subscription
+
+    def has_subscribers(self, channel):
+        # Subscribers may be connected to any process
+        return True
+
+    def run(self):
+        try:
+            while True:
+                with self.lock:
+                    channels = list(self.subscribers)
+                    if not channels:
+                        self.poller = None
+                        return
+                close_old_connections()
+                try:
+                    self.poll(channels)
+                except Exception:
+                    logger.exception("Polling order feed events failed")
+                time.sleep(self.poll_interval)
+        finally:
+            connection.close()
+
+    def poll(self, channels):
+        from orders.models import OrderEvent
+
+        now = timezone.now()
+        cutoff = now - self.window
+        rows = (
+            OrderEvent.objects.filter(
+                channel__in=channels, created_at__gte=max(cutoff, self.started)
+            )
+            .order_by("created_at", "id")
+            .values_list("id", "channel", "payload", "created_at")
+        )
+        for pk, channel, payload, created_at in rows:
+            if pk not in self.seen:
+                self.seen[pk] = created_at
+                self.deliver(channel, payload)
+        self.seen = {
+            pk: created_at
+            for pk, created_at in self.seen.items()
+            if created_at >= cutoff
+        }
+
+        if self.next_cleanup is None or now >= self.next_cleanup:
+            # Every poller deletes rows no longer read; the deletes are idempotent
+            OrderEvent.objects.filter(created_at__lt=cutoff).delete()
+            self.next_cleanup = now + self.window
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_class = getattr(
+                settings, "ORDER_FEED_BROKER", "orders.feed.DatabaseBroker"
+            )
+            _broker = import_string(broker_class)()
+        return _broker
+
+
+def restaurant_channel(restaurant_id):
+    return f"restaurant:{restaurant_id}"
+
+
+def publish_order_event(event_type, restaurant_id, order_data):
+    """Publish an order event to its restaurant's feed once the write commits."""
+    channel = restaurant_channel(restaurant_id)
+    broker = get_broker()
+    if not broker.has_subscribers(channel):
+        return
+
+    event = {"type": event_type, "order": order_data}
+    transaction.on_commit(lambda: broker.publish(channel, event))
+
+
+def publish_order_events(event_type, orders):
+    """publish_order_event() for (restaurant_id, order_data) pairs, published together."""
+    broker = get_broker()
+    messages = [
+        (restaurant_channel(restaurant_id), {"type": event_type, "order": order_data})
+        for restaurant_id, order_data in orders
+    ]
+    messages = [
+        (channel, event)
+        for channel, event in messages
+        if broker.has_subscribers(channel)
+    ]
+    if messages:
+        transaction.on_commit(lambda: broker.publish_many(messages))
+
+
+def format_event(event):
+    data = json.dumps(event, cls=JSONEncoder)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+def _max_duration():
+    return getattr(settings, "ORDER_FEED_MAX_DURATION", 300)
+
+
+def stream_events(subscription):
+    """
+    Server-sent events for a sync worker. The stream ends after
+    ORDER_FEED_MAX_DURATION seconds and EventSource clients reconnect.
+    """
+    deadline = time.monotonic() + _max_duration()
+    try:
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=HEARTBEAT_SECONDS)
+            yield format_event(event) if event else ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+async def astream_events(subscription):
+    deadline = time.monotonic() + _max_duration()
+    try:
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            yield format_event(event) if event else ": keep-alive\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    Order.objects.update(updated_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0009_order_is_deleted"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="order_user_sync_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["restaurant", "updated_at", "id"],
+                name="order_restaurant_sync_idx",
+            ),
+        ),
+    ]
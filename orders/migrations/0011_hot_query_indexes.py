@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0010_order_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "-created_at", "-id"],
+                name="order_user_live_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["restaurant", "-created_at", "-id"],
+                name="order_restaurant_created_idx",
+            ),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.timezone import now
 from accounts.models import User
@@ -22,15 +25,60 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
     is_deleted = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # A customer's live order history, newest first
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(is_deleted=False),
+                name="order_user_live_created_idx",
+            ),
+            # A restaurant's order list, newest first
+            models.Index(
+                fields=["restaurant", "-created_at", "-id"],
+                name="order_restaurant_created_idx",
+            ),
+            # Delta sync scans a user's or restaurant's orders by (updated_at, id)
+            models.Index(
+                fields=["user", "updated_at", "id"], name="order_user_sync_idx"
+            ),
+            models.Index(
+                fields=["restaurant", "updated_at", "id"],
+                name="order_restaurant_sync_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.order_id:
             # Generate a unique order ID
-            import uuid
-
-            self.order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+            self.order_id = self.generate_order_id()
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def generate_order_id():
+        return f"ORD-{uuid.uuid4().hex[:8].upper()}"
+
+    @classmethod
+    def generate_order_ids(cls, count):
+        """
+        Pre-generate order ids for rows inserted with bulk_create(), which skips
+        save(). Each round checks its candidates against the table in one query.
+        """
+        order_ids = set()
+        while len(order_ids) < count:
+            candidates = {
+                cls.generate_order_id() for _ in range(count - len(order_ids))
+            }
+            candidates -= set(
+                cls.objects.filter(order_id__in=candidates).values_list(
+                    "order_id", flat=True
+                )
+            )
+            order_ids |= candidates
+        return list(order_ids)
+
     def __str__(self):
         return f"Order {self.id} for {self.user.username}"
 
@@ -44,3 +92,14 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.quantity} of {self.menu_item.name} in Order {self.order.id}"
+
+
+class OrderEvent(models.Model):
+    """An order feed event, shared between processes by orders.feed.DatabaseBroker."""
+
+    channel = models.CharField(max_length=50)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=now, db_index=True)
+
+    def __str__(self):
+        return f"{self.payload.get('type')} on {self.channel}"
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.mail import EmailMessage
+
+from orders.models import Order
+from tasks.queue import task
+
+
+def _email(order, subject, body):
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [order.user.email])
+
+
+def queue_order_emails():
+    """Whether order emails are queued; off unless a mail server is configured."""
+    return getattr(settings, "ORDER_EMAILS_ENABLED", False)
+
+
+@task()
+def send_order_receipt(order_id):
+    """
+    Email the receipt of an order to its customer, if they have an address.
+    Each order is its own task, so a retry only resends the one that failed.
+    """
+    order = (
+        Order.objects.filter(pk=order_id)
+        .exclude(user__email="")
+        .select_related("user", "restaurant")
+        .prefetch_related("order_items__menu_item")
+        .first()
+    )
+    if order is None:
+        return
+    lines = [
+        f"{item.quantity} x {item.menu_item.name}  {item.menu_item.price}"
+        for item in order.order_items.all()
+    ]
+    lines.append(f"Total: {order.total_price}")
+    _email(
+        order,
+        f"Your order {order.order_id} from {order.restaurant.name}",
+        "\n".join(lines),
+    ).send()
+
+
+@task()
+def send_order_status(order_id, status):
+    """Tell the customer their order moved to `status`, unless it moved on since."""
+    order = (
+        Order.objects.filter(pk=order_id, status=status)
+        .exclude(user__email="")
+        .select_related("user", "restaurant")
+        .first()
+    )
+    if order is not None:
+        _email(
+            order,
+            f"Your order {order.order_id} is {order.get_status_display().lower()}",
+            f"{order.restaurant.name} updated your order to "
+            f"{order.get_status_display()}.",
+        ).send()
@@ -1,3 +1,503 @@
-from django.test import TestCase
+import io
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from api.v1.orders.pagination import OrderSyncPagination
+from api.v1.renderers import ORJSONParser, ORJSONRenderer
+from orders.feed import (
+    DatabaseBroker,
+    InProcessBroker,
+    get_broker,
+    restaurant_channel,
+)
+from orders.models import Order, OrderEvent
+from restaurants.tests import CatalogFixtureMixin
+from swiggy.profiling import registry
+from tasks.models import Task
+
+
+class OrderFixtureMixin(CatalogFixtureMixin):
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(0)
+        self.menu = [
+            self.create_food_item(self.restaurant, f"Item {index}", price="40.50")
+            for index in range(5)
+        ]
+        self.customer = User.objects.create(username="customer", role=User.CUSTOMER)
+        self.client.force_authenticate(self.customer)
+
+    def order_payload(self, menu_items, restaurant=None, quantity=2):
+        return {
+            "restaurant": (restaurant or self.restaurant).pk,
+            "customer_location": "Kakkanad",
+            "customer_phone": "9999999999",
+            "order_items": [
+                {"menu_item": item.pk, "quantity": quantity} for item in menu_items
+            ],
+        }
+
+
+class OrderCreateTests(OrderFixtureMixin, APITestCase):
+    def place(self, payload):
+        return self.client.post(reverse("order-list-create"), payload, format="json")
+
+    def test_total_is_priced_server_side(self):
+        payload = self.order_payload(self.menu[:2])
+        payload["total_price"] = "1.00"
+
+        response = self.place(payload)
+
+        self.assertEqual(response.status_code, 201, response.data)
+        order = Order.objects.get()
+        self.assertEqual(order.total_price, Decimal("162.00"))
+        self.assertEqual(order.order_items.count(), 2)
+
+    def test_query_count_does_not_grow_with_line_items(self):
+        with CaptureQueriesContext(connection) as small_order:
+            self.assertEqual(
+                self.place(self.order_payload(self.menu[:1])).status_code, 201
+            )
+        with CaptureQueriesContext(connection) as large_order:
+            self.assertEqual(self.place(self.order_payload(self.menu)).status_code, 201)
+
+        self.assertEqual(len(small_order), len(large_order))
+
+    def test_rejects_items_from_another_restaurant(self):
+        other = self.create_restaurant(1)
+        foreign_item = self.create_food_item(other, "Elsewhere")
+
+        response = self.place(self.order_payload([self.menu[0], foreign_item]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_rejects_unavailable_items_and_bad_quantities(self):
+        self.menu[0].is_available = False
+        self.menu[0].save()
+
+        self.assertEqual(self.place(self.order_payload(self.menu[:1])).status_code, 400)
+        self.assertEqual(
+            self.place(self.order_payload(self.menu[1:2], quantity=0)).status_code,
+            400,
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_rejects_totals_the_order_cannot_store(self):
+        # 5 items * 1000 * 40.50 = 202500.00, beyond max_digits=7
+        response = self.place(self.order_payload(self.menu, quantity=1000))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("order_items", response.data)
+        self.assertEqual(
+            self.place(self.order_payload(self.menu[:1], quantity=10**12)).status_code,
+            400,
+        )
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderBatchCreateTests(OrderFixtureMixin, APITestCase):
+    def place_batch(self, orders, **extra):
+        return self.client.post(
+            reverse("order-batch-create"), {"orders": orders, **extra}, format="json"
+        )
+
+    def test_creates_valid_orders_and_reports_invalid_ones(self):
+        orders = [
+            self.order_payload(self.menu[:2]),
+            self.order_payload([]),
+            self.order_payload(self.menu[2:], quantity=1),
+        ]
+
+        response = self.place_batch(orders)
+
+        self.assertEqual(response.status_code, 207)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "error", "created"])
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(len({order.order_id for order in Order.objects.all()}), 2)
+        self.assertEqual(response.data["results"][2]["order"]["total_price"], "121.50")
+
+    def test_atomic_batch_is_all_or_nothing(self):
+        orders = [self.order_payload(self.menu[:1]), self.order_payload([])]
+
+        response = self.place_batch(orders, atomic=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small_batch:
+            self.place_batch([self.order_payload(self.menu[:1])])
+        with CaptureQueriesContext(connection) as large_batch:
+            self.place_batch([self.order_payload(self.menu)] * 20)
+
+        self.assertEqual(len(small_batch), len(large_batch))
+        self.assertEqual(Order.objects.count(), 21)
+
+    @override_settings(ORDER_EMAILS_ENABLED=True)
+    def test_queued_receipts_and_events_do_not_grow_with_batch_size(self):
+        def place(orders):
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.place_batch(orders)
+            return len(queries)
+
+        small_batch = place([self.order_payload(self.menu[:1])])
+        large_batch = place([self.order_payload(self.menu)] * 20)
+
+        self.assertEqual(small_batch, large_batch)
+        self.assertEqual(Task.objects.filter(name__startswith="orders.").count(), 21)
+        self.assertEqual(OrderEvent.objects.count(), 21)
+
+
+class OrderFeedTests(OrderFixtureMixin, APITestCase):
+    def test_broker_fans_out_to_channel_subscribers(self):
+        broker = InProcessBroker()
+        first = broker.subscribe("restaurant:1")
+        second = broker.subscribe("restaurant:1")
+        other = broker.subscribe("restaurant:2")
+
+        broker.publish("restaurant:1", {"type": "order.created"})
+
+        self.assertEqual(first.get(timeout=0), {"type": "order.created"})
+        self.assertEqual(second.get(timeout=0), {"type": "order.created"})
+        self.assertIsNone(other.get(timeout=0))
+        first.close()
+        broker.publish("restaurant:1", {"type": "order.status_changed"})
+        self.assertIsNone(first.get(timeout=0))
+
+    @override_settings(ORDER_FEED_BROKER="orders.feed.InProcessBroker")
+    @mock.patch("orders.feed._broker", None)
+    def test_new_orders_and_status_changes_are_published(self):
+        subscription = get_broker().subscribe(restaurant_channel(self.restaurant.pk))
+        self.addCleanup(subscription.close)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("order-list-create"),
+                self.order_payload(self.menu[:1]),
+                format="json",
+            )
+        event = subscription.get(timeout=0)
+        self.assertEqual(event["type"], "order.created")
+        self.assertEqual(event["order"]["id"], response.data["id"])
+
+        self.client.force_authenticate(self.restaurant.owner_name)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("order-list-detail", args=[response.data["id"]]),
+                {"status": "PROCESSING"},
+                format="json",
+            )
+        event = subscription.get(timeout=0)
+        self.assertEqual(event["type"], "order.status_changed")
+        self.assertEqual(event["order"]["status"], "PROCESSING")
+
+    @override_settings(ORDER_FEED_MAX_DURATION=0, ORDER_FEED_SYNC_STREAMS=True)
+    def test_feed_streams_server_sent_events_to_owners(self):
+        response = self.client.get(
+            reverse("order-feed"), HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.restaurant.owner_name)
+        response = self.client.get(
+            reverse("order-feed"), HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(b"".join(response.streaming_content), b"retry: 3000\n\n")
+
+    @override_settings(ORDER_FEED_SYNC_STREAMS=False)
+    def test_feed_is_not_streamed_from_sync_workers(self):
+        self.client.force_authenticate(self.restaurant.owner_name)
+        response = self.client.get(reverse("order-feed"))
+        self.assertEqual(response.status_code, 501)
+
+
+class DatabaseBrokerTests(TransactionTestCase):
+    def subscribe(self, broker, channel):
+        subscription = broker.subscribe(channel)
+        poller = broker.poller
+
+        def close():
+            subscription.close()
+            poller.join(timeout=5)
+
+        self.addCleanup(close)
+        return subscription
+
+    def test_events_reach_subscribers_of_other_brokers(self):
+        # Each broker stands in for the one of a separate process
+        publisher = DatabaseBroker()
+        broker = DatabaseBroker(poll_interval=0.01)
+        subscription = self.subscribe(broker, "restaurant:1")
+        other = self.subscribe(broker, "restaurant:2")
+
+        publisher.publish("restaurant:1", {"type": "order.created", "order": {"id": 1}})
+        self.assertEqual(
+            subscription.get(timeout=5), {"type": "order.created", "order": {"id": 1}}
+        )
+        self.assertIsNone(other.get(timeout=0.1))
+        # Rows are read again within the window but delivered once
+        self.assertIsNone(subscription.get(timeout=0.1))
+
+    def test_events_committed_late_are_delivered(self):
+        broker = DatabaseBroker(poll_interval=0.01)
+        subscription = self.subscribe(broker, "restaurant:1")
+        self.assertIsNone(subscription.get(timeout=0.1))
+
+        # Created before the last poll but committed after it
+        OrderEvent.objects.create(
+            channel="restaurant:1",
+            payload={"type": "order.created"},
+            created_at=datetime.now(timezone.utc) - timedelta(milliseconds=50),
+        )
+        self.assertEqual(subscription.get(timeout=5), {"type": "order.created"})
+
+    def test_pollers_delete_events_past_the_window(self):
+        OrderEvent.objects.create(
+            channel="restaurant:1",
+            payload={"type": "order.created"},
+            created_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+        )
+        broker = DatabaseBroker(window=60)
+        broker.started = datetime.now(timezone.utc)
+        broker.poll(["restaurant:1"])
+        self.assertFalse(OrderEvent.objects.exists())
+
+
+class OrderDeltaSyncTests(OrderFixtureMixin, APITestCase):
+    def sync(self, watermark=""):
+        response = self.client.get(reverse("order-list-create"), {"since": watermark})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def place(self):
+        response = self.client.post(
+            reverse("order-list-create"),
+            self.order_payload(self.menu[:1]),
+            format="json",
+        )
+        return Order.objects.get(pk=response.data["id"])
+
+    @override_settings(ORDER_SYNC_OVERLAP=0)
+    def test_returns_only_changes_after_the_watermark(self):
+        first, second = self.place(), self.place()
+
+        initial = self.sync()
+        self.assertEqual([o["id"] for o in initial["results"]], [first.pk, second.pk])
+        self.assertEqual(self.sync(initial["watermark"])["results"], [])
+
+        first.is_deleted = True
+        first.save()
+        third = self.place()
+
+        delta = self.sync(initial["watermark"])
+        self.assertEqual([o["id"] for o in delta["results"]], [third.pk])
+        self.assertEqual(delta["deleted"], [first.pk])
+        self.assertFalse(delta["has_more"])
+        self.assertEqual(self.sync(delta["watermark"])["results"], [])
+
+    def test_changes_committed_behind_the_watermark_are_returned(self):
+        first = self.place()
+        initial = self.sync()
+        # Saved before the first order but committed after the sync above
+        late = self.place()
+        Order.objects.filter(pk=late.pk).update(
+            updated_at=first.updated_at - timedelta(seconds=1)
+        )
+
+        delta = self.sync(initial["watermark"])
+        self.assertEqual([o["id"] for o in delta["results"]], [late.pk, first.pk])
+        # Once re-read, the watermark does not move back to the late order
+        self.assertEqual(
+            [o["id"] for o in self.sync(delta["watermark"])["results"]],
+            [late.pk, first.pk],
+        )
+
+        Order.objects.filter(pk=late.pk).update(
+            updated_at=first.updated_at - timedelta(seconds=120)
+        )
+        self.assertEqual(
+            [o["id"] for o in self.sync(delta["watermark"])["results"]], [first.pk]
+        )
+
+    def test_pages_continue_exactly_before_catching_up(self):
+        orders = [self.place() for _ in range(3)]
+
+        def sync_all(watermark=""):
+            ids = []
+            while True:
+                response = self.client.get(
+                    reverse("order-list-create"), {"since": watermark, "page_size": 1}
+                )
+                ids += [o["id"] for o in response.data["results"]]
+                watermark = response.data["watermark"]
+                if not response.data["has_more"]:
+                    return ids, watermark
+
+        ids, watermark = sync_all()
+        self.assertEqual(ids, [order.pk for order in orders])
+        # The overlap is re-read page by page and the sync still finishes
+        self.assertEqual(sync_all(watermark)[0], ids)
+
+    def test_edited_watermarks_are_not_found(self):
+        self.place()
+        encode = OrderSyncPagination().encode_token
+        for since in [
+            "not-a-watermark",
+            encode(["abc", 1]),
+            encode([None, 1]),
+            encode(["2024-01-01T00:00:00+00:00", None]),
+            encode(["2024-01-01T00:00:00+00:00"]),
+            encode(["2024-01-01T00:00:00+00:00", "1", 2]),
+        ]:
+            with self.subTest(since=since):
+                response = self.client.get(
+                    reverse("order-list-create"), {"since": since}
+                )
+                self.assertEqual(response.status_code, 404)
+
+
+class CompiledOrderReaderTests(OrderFixtureMixin, APITestCase):
+    def assert_parity(self, path, params=None):
+        compiled = self.client.get(path, params)
+        with override_settings(COMPILED_READ_SERIALIZERS=False):
+            serialized = self.client.get(path, params)
+        self.assertEqual(compiled.status_code, 200)
+        self.assertEqual(compiled.content, serialized.content)
+        return compiled.json()
+
+    def test_matches_order_serializer_output(self):
+        self.menu[0].image = "food_items/images/biryani.jpg"
+        self.menu[0].save()
+        for index in range(3):
+            self.client.post(
+                reverse("order-list-create"),
+                self.order_payload(self.menu[index : index + 2], quantity=index + 1),
+                format="json",
+            )
+        Order.objects.filter(pk=Order.objects.first().pk).update(
+            status="PROCESSING", is_deleted=True
+        )
+
+        data = self.assert_parity(reverse("order-list-create"))
+        self.assertEqual(data["count"], 2)
+        self.assert_parity(reverse("order-list-create"), {"cursor": ""})
+        self.assert_parity(reverse("order-list-create"), {"since": ""})
+
+        self.client.force_authenticate(self.restaurant.owner_name)
+        data = self.assert_parity(reverse("orders"))
+        self.assertEqual(len(data["results"]), 3)
+        self.assert_parity(reverse("restaurant-order-list"))
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.client.post(
+            reverse("order-list-create"), self.order_payload(self.menu), format="json"
+        )
+        with CaptureQueriesContext(connection) as one_order:
+            self.client.get(reverse("order-list-create"))
+
+        for _ in range(10):
+            self.client.post(
+                reverse("order-list-create"),
+                self.order_payload(self.menu),
+                format="json",
+            )
+        with CaptureQueriesContext(connection) as many_orders:
+            self.client.get(reverse("order-list-create"))
+
+        self.assertEqual(len(one_order), len(many_orders))
+
+
+class ORJSONRendererTests(APITestCase):
+    payload = {
+        "total_price": Decimal("121.50"),
+        "rating": Decimal("4.5"),
+        "created_at": datetime(2026, 10, 18, 9, 30, 15, 123456, tzinfo=timezone.utc),
+        "opening_time": time(9, 0),
+        "delivered_on": date(2026, 10, 18),
+        "note": "Kappa\u2028biryani\u2029 ക",
+        "items": [{1: "first"}, None, True, 2.5],
+    }
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.payload), JSONRenderer().render(self.payload)
+        )
+        self.assertEqual(
+            ORJSONRenderer().render(self.payload, "application/json; indent=2"),
+            JSONRenderer().render(self.payload, "application/json; indent=2"),
+        )
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch("api.v1.renderers.orjson", None):
+            self.assertEqual(
+                ORJSONRenderer().render(self.payload),
+                JSONRenderer().render(self.payload),
+            )
+            self.assertEqual(
+                ORJSONParser().parse(io.BytesIO(b'{"quantity": 2}')), {"quantity": 2}
+            )
+
+    def test_parser_rejects_invalid_json(self):
+        parser = ORJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO('{"name": "Kappa ക"}'.encode())),
+            {"name": "Kappa ക"},
+        )
+        for body in (b'{"quantity": 2', b'{"price": NaN}'):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+class ProfilingMiddlewareTests(OrderFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        for _ in range(4):
+            self.client.post(
+                reverse("order-list-create"),
+                self.order_payload(self.menu[:2]),
+                format="json",
+            )
+        registry.reset()
+
+    def test_reports_timings_and_repeated_queries(self):
+        with override_settings(COMPILED_READ_SERIALIZERS=False):
+            response = self.client.get(reverse("order-list-create"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("serializer;dur=", response["Server-Timing"])
+        self.assertIn("n-plus-one", response["Server-Timing"])
+
+        response = self.client.get(reverse("order-list-create"))
+        self.assertNotIn("n-plus-one", response["Server-Timing"])
+
+        self.client.force_authenticate(
+            User.objects.create(username="admin", is_staff=True)
+        )
+        metrics = self.client.get(reverse("internal-metrics")).json()
+        (endpoint,) = [
+            endpoint
+            for endpoint in metrics["endpoints"]
+            if endpoint["endpoint"] == "order-list-create"
+        ]
+        self.assertEqual(endpoint["requests"], 2)
+        self.assertEqual(endpoint["n_plus_one_requests"], 1)
+        self.assertGreater(endpoint["repeated_queries"][0]["count"], 3)
+
+    def test_metrics_are_admin_only(self):
+        response = self.client.get(reverse("internal-metrics"))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from restaurants.models import FoodItem
+from api.v1.representation_cache import invalidate_representations
+
+
+class AvailabilityIndex:
+    """
+    Availability of one restaurant's menu as a bitset: bit i is set when the
+    i-th item by id is available. Menu documents hold every item and are
+    filtered through this index when served, so flipping an item only has to
+    drop a few bytes from the cache instead of rebuilding the document.
+    """
+
+    def __init__(self, rows):
+        self.ids = array("q")
+        self.bits = 0
+        for position, (pk, is_available) in enumerate(rows):
+            self.ids.append(pk)
+            if is_available:
+                self.bits |= 1 << position
+
+    def is_available(self, pk):
+        position = bisect_left(self.ids, pk)
+        return (
+            position < len(self.ids)
+            and self.ids[position] == pk
+            and bool(self.bits >> position & 1)
+        )
+
+    def available_items(self, items):
+        """The item representations of `items` that are available, flagged so."""
+        available = []
+        for item in items:
+            if self.is_available(item["id"]):
+                # Flags stored in menu documents may be stale; the index is not
+                item["is_available"] = True
+                available.append(item)
+        return available
+
+
+def _timeout():
+    return getattr(settings, "AVAILABILITY_CACHE_TIMEOUT", 60)
+
+
+def _cache_key(restaurant_id):
+    return f"menu-availability:{restaurant_id}"
+
+
+def _rows(restaurant_id):
+    return (
+        FoodItem.objects.filter(restaurant_id=restaurant_id)
+        .order_by("id")
+        .values_list("id", "is_available")
+    )
+
+
+def availability_index(restaurant_id):
+    index = cache.get(_cache_key(restaurant_id))
+    if index is None:
+        index = AvailabilityIndex(_rows(restaurant_id))
+        cache.set(_cache_key(restaurant_id), index, _timeout())
+    return index
+
+
+async def aavailability_index(restaurant_id):
+    index = await cache.aget(_cache_key(restaurant_id))
+    if index is None:
+        index = AvailabilityIndex([row async for row in _rows(restaurant_id)])
+        await cache.aset(_cache_key(restaurant_id), index, _timeout())
+    return index
+
+
+def availability_changed(restaurant_ids):
+    """
+    Drop the indexes of these restaurants now, for readers in this transaction,
+    and again after commit. AVAILABILITY_CACHE_TIMEOUT bounds how long an index
+    rebuilt from pre-commit rows can be served.
+    """
+    keys = [_cache_key(pk) for pk in set(restaurant_ids) if pk is not None]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def set_availability(restaurant_id, food_item_ids, is_available):
+    """
+    Mark menu items of a restaurant (un)available with a single UPDATE and
+    return the ids that changed. Menu documents are left as they are.
+    """
+    with transaction.atomic():
+        changed = list(
+            FoodItem.objects.filter(restaurant_id=restaurant_id, pk__in=food_item_ids)
+            .exclude(is_available=is_available)
+            .values_list("id", flat=True)
+        )
+        if changed:
+            FoodItem.objects.filter(pk__in=changed).update(is_available=is_available)
+            invalidate_representations(FoodItem, changed)
+            availability_changed([restaurant_id])
+    return changed
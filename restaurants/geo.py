@@ -0,0 +1,180 @@
+import math
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from restaurants.models import Restaurant
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Precision stored on restaurants, about 5m x 5m
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Neighbouring cells scanned on each side of the query point's cell
+CELL_REACH = 2
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a point; nearby points share long prefixes."""
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+    while len(geohash) < precision:
+        bounds, value = (
+            (longitude_range, longitude) if even else (latitude_range, latitude)
+        )
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = bit_count = 0
+    return "".join(geohash)
+
+
+def cell_degrees(precision):
+    """(height, width) of a geohash cell of this precision, in degrees."""
+    latitude_bits = 5 * precision // 2
+    return 180 / 2**latitude_bits, 360 / 2 ** (5 * precision - latitude_bits)
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells cover every point within radius_km: the cell
+    of the point and CELL_REACH cells around it in every direction, at the
+    finest precision whose cells are at least radius_km / CELL_REACH across.
+    A 5x5 block of small cells scans far less area than a 3x3 block of cells
+    as wide as the radius, e.g. about 8 rather than 80 times the circle for
+    5 km around Kochi.
+    """
+    # Cells narrow towards the poles, so size them at the circle's far edge
+    far_latitude = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.9)
+    shrink = math.cos(math.radians(far_latitude))
+
+    def spans_radius(precision):
+        height, width = cell_degrees(precision)
+        return min(height, width * shrink) * KM_PER_DEGREE * CELL_REACH >= radius_km
+
+    precision = 1
+    while precision < GEOHASH_PRECISION and spans_radius(precision + 1):
+        precision += 1
+
+    height, width = cell_degrees(precision)
+    steps = range(-CELL_REACH, CELL_REACH + 1)
+    return sorted(
+        {
+            encode(
+                min(max(latitude + row * height, -90.0), 90.0),
+                (longitude + column * width + 180) % 360 - 180,
+                precision,
+            )
+            for row in steps
+            for column in steps
+        }
+    )
+
+
+def _prefix_end(prefix):
+    """The smallest string above every geohash starting with `prefix`."""
+    prefix = prefix.rstrip(BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[BASE32.index(prefix[-1]) + 1]
+
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(longitude2 - longitude1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def restaurant_local_time(now=None):
+    """
+    `now`, the current time by default, on the wall clock restaurants keep
+    their opening hours in, RESTAURANT_TIME_ZONE.
+    """
+    zone = ZoneInfo(getattr(settings, "RESTAURANT_TIME_ZONE", settings.TIME_ZONE))
+    return timezone.localtime(now, timezone=zone)
+
+
+def is_open(working_days, opening_time, closing_time, at):
+    """
+    Whether a restaurant is open at the local datetime `at`, e.g. from
+    restaurant_local_time(). Hours past
+    midnight belong to the day they started on, and no working_days means
+    every day.
+    """
+
+    def works(day):
+        return not working_days or DAYS[day.weekday()] in working_days
+
+    now = at.time()
+    if opening_time < closing_time:
+        return works(at) and opening_time <= now < closing_time
+    return (works(at) and now >= opening_time) or (
+        works(at - timedelta(days=1)) and now < closing_time
+    )
+
+
+def _cell_ranges(cells):
+    """[start, end) geohash ranges of sorted cells, adjacent cells merged."""
+    ranges = []
+    for cell in cells:
+        end = _prefix_end(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1][1] = end
+        else:
+            ranges.append([cell, end])
+    return ranges
+
+
+def nearby_candidates(latitude, longitude, radius_km):
+    """Restaurants in the cells covering radius_km, a superset of the hits."""
+    condition = Q()
+    for start, end in _cell_ranges(covering_cells(latitude, longitude, radius_km)):
+        condition |= (
+            Q(geohash__gte=start, geohash__lt=end) if end else Q(geohash__gte=start)
+        )
+    return Restaurant.objects.filter(condition)
+
+
+def nearby_restaurants(latitude, longitude, radius_km, open_at=None):
+    """
+    (restaurant id, distance in km) pairs within radius_km, nearest first.
+    Candidates come from range scans of the geohash index over the covering
+    cells; exact distances and opening hours are checked on those rows only.
+    """
+
+    columns = ["id", "latitude", "longitude"]
+    if open_at is not None:
+        columns += ["working_days", "opening_time", "closing_time"]
+
+    hits = []
+    for pk, restaurant_latitude, restaurant_longitude, *hours in (
+        nearby_candidates(latitude, longitude, radius_km)
+        .values_list(*columns)
+        .order_by()
+    ):
+        distance = haversine_km(
+            latitude, longitude, float(restaurant_latitude), float(restaurant_longitude)
+        )
+        if distance <= radius_km and (open_at is None or is_open(*hours, open_at)):
+            hits.append((distance, pk))
+    hits.sort()
+    return [(pk, distance) for distance, pk in hits]
@@ -0,0 +1,125 @@
+import hashlib
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from restaurants.models import Restaurant, FoodItem
+from api.v1.representation_cache import invalidate_representations
+
+logger = logging.getLogger(__name__)
+
+# Variant widths in pixels; originals are never scaled up
+WIDTHS = (160, 320, 640)
+# Variant formats by extension, in the order clients should prefer them
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+QUALITY = 80
+
+# (image field, variants field) of each model with uploaded images
+IMAGE_FIELDS = {
+    Restaurant: ("featured_image", "featured_image_variants"),
+    FoodItem: ("image", "image_variants"),
+}
+
+
+def variant_name(digest, width, extension):
+    """Storage name of a variant, addressed by the SHA-256 of the original."""
+    return f"variants/{digest[:2]}/{digest}/{width}.{extension}"
+
+
+def render_variants(field_file):
+    """
+    Resize an uploaded image to WIDTHS in every format of FORMATS and store
+    the results. Returns {"source": original name, extension: {width: name}}.
+    Variants are named after the original's content, so an image uploaded
+    twice, or shared by several items, is only resized once.
+    """
+    storage = field_file.storage
+    with field_file.open("rb") as original:
+        content = original.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    image = Image.open(io.BytesIO(content))
+    # JPEG decoders can scale down while decoding, which is far cheaper
+    image.draft("RGB", (max(WIDTHS), max(WIDTHS) * image.height // image.width))
+    image = ImageOps.exif_transpose(image)
+    if "A" in image.getbands() or "transparency" in image.info:
+        image = image.convert("RGBA")
+    else:
+        image = image.convert("RGB")
+    widths = [width for width in WIDTHS if width < image.width] or [image.width]
+
+    variants = {"source": field_file.name}
+    for extension, image_format in FORMATS.items():
+        variants[extension] = {}
+        for width in widths:
+            name = variant_name(digest, width, extension)
+            if not storage.exists(name):
+                height = max(round(image.height * width / image.width), 1)
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+                if image_format == "JPEG" and resized.mode == "RGBA":
+                    # JPEG has no alpha; flatten onto white rather than black
+                    background = Image.new("RGB", resized.size, "white")
+                    background.paste(resized, mask=resized.getchannel("A"))
+                    resized = background
+                buffer = io.BytesIO()
+                resized.save(buffer, image_format, quality=QUALITY, optimize=True)
+                name = storage.save(name, ContentFile(buffer.getvalue()))
+            variants[extension][str(width)] = name
+    return variants
+
+
+def srcset(variants, storage):
+    """
+    {extension: {width: relative URL}} for the stored variants of an image, or
+    None until they have been generated.
+    """
+    if not variants.get("source"):
+        return None
+    return {
+        extension: {
+            width: storage.url(name) for width, name in variants[extension].items()
+        }
+        for extension in FORMATS
+        if extension in variants
+    }
+
+
+def needs_variants(instance):
+    image_field, variants_field = IMAGE_FIELDS[type(instance)]
+    image = getattr(instance, image_field)
+    return getattr(instance, variants_field).get("source") != (image.name or None)
+
+
+def generate_variants(model, pk):
+    """Generate and save the variants of one object's image, if it still has it."""
+    image_field, variants_field = IMAGE_FIELDS[model]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not getattr(instance, image_field):
+        return None
+    image = getattr(instance, image_field)
+    try:
+        variants = render_variants(image)
+    except (OSError, Image.DecompressionBombError) as exc:
+        logger.warning("No variants for %s %s: %s", model.__name__, image.name, exc)
+        return None
+
+    # Skipped when the image was replaced while this one was being resized
+    updated = model.objects.filter(pk=pk, **{image_field: image.name}).update(
+        **{variants_field: variants}
+    )
+    if updated:
+        _variants_changed(instance)
+    return variants
+
+
+def _variants_changed(instance):
+    # update() sends no signals, so invalidate as signals.py would
+    from restaurants.signals import menu_changed
+
+    if isinstance(instance, FoodItem):
+        invalidate_representations(FoodItem, [instance.pk])
+        menu_changed([instance.restaurant_id])
+    else:
+        menu_changed([instance.pk])
@@ -0,0 +1,222 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import force_authenticate
+
+from accounts.models import User
+from orders.models import Order
+from restaurants.models import Restaurant, FoodItem
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)$")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every GET endpoint of the API against the current database, EXPLAIN "
+        "each SELECT it issues and flag sequential scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="Postgres only: disable seq scans so small tables still show "
+            "whether an index can serve each query.",
+        )
+        parser.add_argument(
+            "--fail-on-seq-scan",
+            action="store_true",
+            help="Exit with an error when an unexpected sequential scan is found.",
+        )
+        parser.add_argument(
+            "--plans", action="store_true", help="Print every query plan."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("postgresql", "sqlite"):
+            raise CommandError("Only Postgres and SQLite are supported.")
+
+        flagged = 0
+        # Views may write, e.g. by building a missing menu document
+        with transaction.atomic():
+            if options["no_seqscan"] and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, path, params, user, expected_scans in self.get_endpoints():
+                flagged += self.explain_endpoint(
+                    name, path, params, user, expected_scans, options["plans"]
+                )
+            transaction.set_rollback(True)
+
+        if flagged:
+            message = f"{flagged} unexpected sequential scan(s) found."
+            if options["fail_on_seq_scan"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No unexpected sequential scans."))
+
+    def get_endpoints(self):
+        """(name, path, query params, user, tables a full scan of is expected)."""
+        restaurant = Restaurant.objects.select_related("owner_name").first()
+        owner = restaurant.owner_name if restaurant else None
+        order = Order.objects.select_related("user").first()
+        customer = (
+            order.user if order else User.objects.filter(role=User.CUSTOMER).first()
+        )
+        food_item = FoodItem.objects.filter(is_available=True).first()
+
+        restaurant_pk = restaurant.pk if restaurant else 0
+        food_item_pk = food_item.pk if food_item else 0
+        order_pk = order.pk if order else 0
+
+        # Listing pages walk the restaurant primary key in order up to the LIMIT
+        restaurant_pages = {"restaurants_restaurant"}
+
+        return [
+            ("restaurant list", reverse("restaurant-list"), {}, None, restaurant_pages),
+            (
+                "restaurant list, keyset page",
+                reverse("restaurant-list"),
+                {"cursor": ""},
+                None,
+                restaurant_pages,
+            ),
+            (
+                "restaurant search",
+                reverse("restaurant-list"),
+                {"q": restaurant.name if restaurant else "biryani"},
+                None,
+                {"restaurants_search_document"},
+            ),
+            (
+                "nearby restaurants",
+                reverse("restaurant-list"),
+                {
+                    "lat": getattr(restaurant, "latitude", None) or 0,
+                    "lng": getattr(restaurant, "longitude", None) or 0,
+                    "open_now": 1,
+                },
+                None,
+                set(),
+            ),
+            (
+                "restaurant details",
+                reverse("restaurantDetails-list", args=[restaurant_pk]),
+                {},
+                None,
+                set(),
+            ),
+            ("food items", reverse("food_item"), {}, None, set()),
+            (
+                "food item",
+                reverse("fooditem-detail", args=[food_item_pk]),
+                {},
+                None,
+                set(),
+            ),
+            (
+                "categories",
+                reverse("category-list"),
+                {},
+                None,
+                {"restaurants_food_category"},
+            ),
+            (
+                "locations",
+                reverse("Locations-list"),
+                {},
+                None,
+                {"restaurants_locations"},
+            ),
+            ("customer orders", reverse("order-list-create"), {}, customer, set()),
+            (
+                "customer orders, keyset page",
+                reverse("order-list-create"),
+                {"cursor": ""},
+                customer,
+                set(),
+            ),
+            (
+                "customer orders, delta sync",
+                reverse("order-list-create"),
+                {"since": ""},
+                customer,
+                set(),
+            ),
+            ("restaurant orders", reverse("orders"), {}, owner, set()),
+            (
+                "restaurant orders, keyset page",
+                reverse("restaurant-order-list"),
+                {"cursor": ""},
+                owner,
+                set(),
+            ),
+            (
+                "order detail",
+                reverse("order-list-detail", args=[order_pk]),
+                {},
+                customer,
+                set(),
+            ),
+        ]
+
+    def explain_endpoint(self, name, path, params, user, expected_scans, show_plans):
+        request = RequestFactory(HTTP_HOST="localhost").get(path, params)
+        if user is not None:
+            force_authenticate(request, user=user)
+        match = resolve(path)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            elif response.streaming:
+                b"".join(response.streaming_content)
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{name}: {path} -> {response.status_code}, {len(queries)} queries"
+            )
+        )
+
+        flagged = 0
+        for query in queries.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = self.explain(sql)
+            scans = self.sequential_scans(plan) - expected_scans
+            if scans:
+                flagged += 1
+                self.stdout.write(
+                    self.style.WARNING(f"  seq scan on {', '.join(sorted(scans))}")
+                )
+                self.stdout.write(f"    {sql}")
+            if scans or show_plans:
+                for line in plan:
+                    self.stdout.write(f"      {line}")
+        return flagged
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN {sql}")
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def sequential_scans(self, plan):
+        pattern = POSTGRES_SCAN if connection.vendor == "postgresql" else SQLITE_SCAN
+        scans = set()
+        for line in plan:
+            match = pattern.search(line.strip())
+            if match:
+                scans.add(match.group(1))
+        return scans
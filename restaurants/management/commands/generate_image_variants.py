@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from restaurants.images import IMAGE_FIELDS, generate_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the resized variants of restaurant and food item images that "
+        "have none yet, e.g. images uploaded before variants existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Regenerate every image's variants."
+        )
+
+    def handle(self, *args, **options):
+        for model, (image_field, variants_field) in IMAGE_FIELDS.items():
+            pending = [
+                pk
+                for pk, image, variants in model.objects.exclude(**{image_field: ""})
+                .exclude(**{f"{image_field}__isnull": True})
+                .values_list("pk", image_field, variants_field)
+                .iterator()
+                if options["all"] or variants.get("source") != image
+            ]
+            generated = sum(generate_variants(model, pk) is not None for pk in pending)
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {generated} of "
+                f"{len(pending)} image(s) resized"
+            )
@@ -0,0 +1,59 @@
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurants.menu_io import (
+    FORMATS,
+    MenuImportError,
+    format_from_name,
+    import_menu,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert food items from a CSV or JSON lines file, as exported from "
+        "/api/v1/restaurants/<id>/menu/. Nothing is written if any row is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Menu file, or "-" for stdin.')
+        parser.add_argument(
+            "--restaurant",
+            type=int,
+            help="Import every row into this restaurant instead of the rows' "
+            "restaurant column.",
+        )
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Defaults to the file's extension."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or format_from_name(path)
+        if path == "-":
+            stream = nullcontext(sys.stdin)
+        else:
+            try:
+                stream = open(path, encoding="utf-8-sig", newline="")
+            except OSError as exc:
+                raise CommandError(exc)
+
+        try:
+            with stream as lines:
+                summary = import_menu(
+                    read_rows(lines, fmt), restaurant_id=options["restaurant"]
+                )
+        except MenuImportError as exc:
+            for error in exc.errors[:20]:
+                self.stderr.write(f"line {error['line']}: {error['errors']}")
+            raise CommandError(f"Menu import failed: {exc}.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['created']} item(s) created, "
+                f"{summary['updated']} updated."
+            )
+        )
@@ -0,0 +1,307 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from restaurants.models import Restaurant, FoodItem, Category
+from restaurants.availability import availability_changed
+from restaurants.signals import menu_changed
+from api.v1.representation_cache import invalidate_representations
+
+FORMATS = ("csv", "jsonl")
+
+# Columns of an exported menu; imports read the same ones except image, which
+# is uploaded separately
+COLUMNS = (
+    "id",
+    "restaurant",
+    "name",
+    "description",
+    "price",
+    "food_type",
+    "rating",
+    "is_available",
+    "categories",
+    "image",
+)
+VALUE_FIELDS = ("name", "description", "price", "food_type", "rating", "is_available")
+# Columns a row must have to create an item; updates only write the columns
+# the file has, so partial files such as "id,price" leave the rest alone
+REQUIRED_FIELDS = tuple(
+    name
+    for name in VALUE_FIELDS
+    if not FoodItem._meta.get_field(name).has_default()
+    and not FoodItem._meta.get_field(name).blank
+)
+
+# Category ids are joined with this in CSV cells
+CATEGORY_SEPARATOR = ";"
+
+BATCH_SIZE = 500
+
+
+class MenuImportError(Exception):
+    """Raised with the errors of every invalid row; nothing is written then."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+def format_from_name(name, default="jsonl"):
+    extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    return {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension, default)
+
+
+def read_rows(lines, fmt):
+    """(line number, raw row dict) pairs from an iterable of text lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            raise MenuImportError(
+                [
+                    {
+                        "line": line_number,
+                        "errors": {"non_field_errors": ["Expected a JSON object."]},
+                    }
+                ]
+            )
+        yield line_number, row
+
+
+def _clean_value(field, value):
+    if value is None or value == "":
+        if field.has_default():
+            return field.get_default()
+        value = None if field.null else ""
+    return field.clean(value, None)
+
+
+def _parse_ids(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.split(CATEGORY_SEPARATOR) if part.strip()]
+    if not isinstance(value, list):
+        raise ValueError
+    return [int(part) for part in value]
+
+
+def clean_row(raw, restaurant_id=None):
+    """Validate one row without touching the database; returns (row, errors)."""
+    row, errors = {}, {}
+    for name in VALUE_FIELDS:
+        if name not in raw:
+            continue
+        try:
+            row[name] = _clean_value(FoodItem._meta.get_field(name), raw.get(name))
+        except ValidationError as exc:
+            errors[name] = exc.messages
+
+    for name in ("id", "restaurant"):
+        value = raw.get(name)
+        try:
+            row[name] = None if value is None or value == "" else int(value)
+        except (TypeError, ValueError):
+            errors[name] = ["A valid integer is required."]
+    if restaurant_id is not None:
+        if row.get("restaurant") not in (None, restaurant_id):
+            errors["restaurant"] = ["Rows must belong to this restaurant."]
+        row["restaurant"] = restaurant_id
+    elif row.get("restaurant") is None and "restaurant" not in errors:
+        errors["restaurant"] = ["This field is required."]
+    if row.get("id") is None and "name" not in raw:
+        # Rows without an id are matched to items by name
+        errors["name"] = ["This field is required."]
+
+    if "categories" in raw:
+        try:
+            row["categories"] = _parse_ids(raw["categories"])
+        except (TypeError, ValueError):
+            errors["categories"] = ["Expected category ids."]
+    return row, errors
+
+
+def import_menu(rows, restaurant_id=None):
+    """
+    Upsert food items from (line number, raw row) pairs, e.g. from read_rows().
+    Rows with an id update that item; rows without one update the item of the
+    same name in the restaurant, or create it. Restaurant, category and item
+    ids are checked against sets loaded with one query each, every row is
+    validated before anything is written, and the writes are bulk statements.
+    Updates only write the columns present in the row, and rows that create
+    an item must have every column of REQUIRED_FIELDS. Rows with a categories
+    column replace the item's categories.
+    """
+    cleaned, errors = [], []
+    for line_number, raw in rows:
+        row, row_errors = clean_row(raw, restaurant_id)
+        if row_errors:
+            errors.append({"line": line_number, "errors": row_errors})
+        else:
+            cleaned.append((line_number, row))
+
+    restaurant_ids = {row["restaurant"] for _, row in cleaned}
+    known_restaurants = set(
+        Restaurant.objects.filter(pk__in=restaurant_ids).values_list("id", flat=True)
+    )
+    known_categories = set(
+        Category.objects.filter(
+            pk__in={pk for _, row in cleaned for pk in row.get("categories", [])}
+        ).values_list("id", flat=True)
+    )
+    existing = list(
+        FoodItem.objects.filter(restaurant__in=known_restaurants).values_list(
+            "id", "restaurant_id", "name"
+        )
+    )
+    restaurant_of = {pk: restaurant for pk, restaurant, _ in existing}
+    by_name = {(restaurant, name): pk for pk, restaurant, name in existing}
+
+    seen = set()
+    for line_number, row in cleaned:
+        row_errors = {}
+        if row["restaurant"] not in known_restaurants:
+            row_errors["restaurant"] = ["Unknown restaurant."]
+        unknown = set(row.get("categories", [])) - known_categories
+        if unknown:
+            row_errors["categories"] = [f"Unknown categories: {sorted(unknown)}"]
+        if row["id"] is not None and restaurant_of.get(row["id"]) != row["restaurant"]:
+            row_errors["id"] = ["Not an item of this restaurant."]
+        if row["id"] is None:
+            row["id"] = by_name.get((row["restaurant"], row["name"]))
+        if row["id"] is None:
+            for name in REQUIRED_FIELDS:
+                if name not in row:
+                    row_errors[name] = ["This field is required to create an item."]
+        key = row["id"] or (row["restaurant"], row["name"])
+        if key in seen:
+            row_errors["name"] = ["This item appears more than once."]
+        seen.add(key)
+        if row_errors:
+            errors.append({"line": line_number, "errors": row_errors})
+    if errors:
+        raise MenuImportError(sorted(errors, key=lambda error: error["line"]))
+
+    return _write(
+        [row for _, row in cleaned if row["id"] is not None],
+        [row for _, row in cleaned if row["id"] is None],
+    )
+
+
+def _food_item(row):
+    return FoodItem(
+        pk=row["id"],
+        restaurant_id=row["restaurant"],
+        **{name: row[name] for name in VALUE_FIELDS if name in row},
+    )
+
+
+def _write(updates, creates):
+    through = FoodItem.categories.through
+    # One bulk update per set of columns, usually one for a whole file
+    updates_by_fields = {}
+    for row in updates:
+        fields = tuple(name for name in VALUE_FIELDS if name in row)
+        updates_by_fields.setdefault(fields, []).append(row)
+
+    with transaction.atomic():
+        for fields, rows in updates_by_fields.items():
+            if fields:
+                FoodItem.objects.bulk_update(
+                    [_food_item(row) for row in rows], fields, batch_size=BATCH_SIZE
+                )
+        created = FoodItem.objects.bulk_create(
+            [_food_item(row) for row in creates], batch_size=BATCH_SIZE
+        )
+        if any(food_item.pk is None for food_item in created):
+            # Backends that cannot return ids from a bulk insert
+            ids = {
+                (restaurant, name): pk
+                for restaurant, name, pk in FoodItem.objects.filter(
+                    restaurant__in={row["restaurant"] for row in creates}
+                ).values_list("restaurant_id", "name", "id")
+            }
+            for row in creates:
+                row["id"] = ids[(row["restaurant"], row["name"])]
+        else:
+            for row, food_item in zip(creates, created):
+                row["id"] = food_item.pk
+
+        categorized = [row for row in updates + creates if "categories" in row]
+        through.objects.filter(
+            fooditem_id__in=[row["id"] for row in categorized]
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(fooditem_id=row["id"], category_id=category_id)
+                for row in categorized
+                for category_id in dict.fromkeys(row["categories"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        # Bulk statements send no signals, so invalidate as signals.py would
+        restaurant_ids = {row["restaurant"] for row in updates + creates}
+        invalidate_representations(FoodItem, [row["id"] for row in updates])
+        availability_changed(restaurant_ids)
+        menu_changed(restaurant_ids)
+    return {"created": len(creates), "updated": len(updates)}
+
+
+def export_rows(restaurant_ids, chunk_size=BATCH_SIZE):
+    """Every item of these restaurants as a dict of COLUMNS, read in chunks."""
+    columns = [column for column in COLUMNS if column != "categories"]
+    food_items = (
+        FoodItem.objects.filter(restaurant__in=restaurant_ids)
+        .order_by("id")
+        .values(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(food_items, chunk_size)):
+        categories = {}
+        through_rows = (
+            FoodItem.categories.through.objects.filter(
+                fooditem_id__in=[row["id"] for row in chunk]
+            )
+            .order_by("category_id")
+            .values_list("fooditem_id", "category_id")
+        )
+        for food_item_id, category_id in through_rows:
+            categories.setdefault(food_item_id, []).append(category_id)
+        for row in chunk:
+            row["categories"] = categories.get(row["id"], [])
+            yield {column: row[column] for column in COLUMNS}
+
+
+def render_rows(rows, fmt):
+    """Encode export_rows() output as CSV or JSON lines, one string per row."""
+    if fmt != "csv":
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        row["categories"] = CATEGORY_SEPARATOR.join(map(str, row["categories"]))
+        writer.writerow([row[column] for column in COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0013_alter_locations_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuDocument",
+            fields=[
+                (
+                    "restaurant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="menu_document",
+                        serialize=False,
+                        to="restaurants.restaurant",
+                    ),
+                ),
+                ("content", models.TextField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "restaurants_menu_document",
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRES_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX restaurants_search_document_fts "
+    "ON restaurants_search_document USING gin (to_tsvector('simple', content))",
+    "CREATE INDEX restaurants_search_document_trgm "
+    "ON restaurants_search_document USING gin (content gin_trgm_ops)",
+]
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in POSTGRES_INDEXES:
+        schema_editor.execute(statement)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS restaurants_search_document_fts")
+    schema_editor.execute("DROP INDEX IF EXISTS restaurants_search_document_trgm")
+
+
+def populate_search_documents(apps, schema_editor):
+    Restaurant = apps.get_model("restaurants", "Restaurant")
+    RestaurantSearchDocument = apps.get_model("restaurants", "RestaurantSearchDocument")
+
+    documents = []
+    restaurants = Restaurant.objects.prefetch_related(
+        "categories", "food_items__categories"
+    )
+    for restaurant in restaurants:
+        parts = [restaurant.name, restaurant.outlet, restaurant.address]
+        parts += [category.name for category in restaurant.categories.all()]
+        for item in restaurant.food_items.all():
+            parts += [item.name, item.description]
+            parts += [category.name for category in item.categories.all()]
+        documents.append(
+            RestaurantSearchDocument(
+                restaurant=restaurant,
+                content=" ".join(dict.fromkeys(part for part in parts if part)),
+            )
+        )
+    RestaurantSearchDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0014_menudocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RestaurantSearchDocument",
+            fields=[
+                (
+                    "restaurant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="restaurants.restaurant",
+                    ),
+                ),
+                ("content", models.TextField(blank=True, default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "restaurants_search_document",
+            },
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0015_restaurantsearchdocument"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                fields=["restaurant", "is_available"],
+                name="fooditem_restaurant_avail_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                condition=models.Q(("is_available", False)),
+                fields=["id"],
+                name="fooditem_listed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-18 15:19
+
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+
+def flip_availability(apps, schema_editor):
+    # is_available was renamed from is_deleted in 0010 without inverting it,
+    # so the listed items are the ones where it is False
+    FoodItem = apps.get_model("restaurants", "FoodItem")
+    FoodItem.objects.update(
+        is_available=Case(When(is_available=True, then=Value(False)), default=True)
+    )
+    # Stored menu documents only hold the previously listed items; they are
+    # rebuilt with every item on the next read
+    apps.get_model("restaurants", "MenuDocument").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0016_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="fooditem",
+            name="fooditem_listed_idx",
+        ),
+        migrations.AlterField(
+            model_name="fooditem",
+            name="is_available",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(flip_availability, flip_availability),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                condition=models.Q(("is_available", True)),
+                fields=["id"],
+                name="fooditem_listed_idx",
+            ),
+        ),
+    ]
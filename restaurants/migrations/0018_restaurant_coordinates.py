@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+def drop_menu_documents(apps, schema_editor):
+    # Stored documents predate the coordinates; they are rebuilt on the next read
+    apps.get_model("restaurants", "MenuDocument").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0017_food_item_availability"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="geohash",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="latitude",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=9, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="longitude",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=9, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(fields=["geohash"], name="restaurant_geohash_idx"),
+        ),
+        migrations.RunPython(drop_menu_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+def drop_menu_documents(apps, schema_editor):
+    # Stored documents predate the image srcsets; they are rebuilt on the next read
+    apps.get_model("restaurants", "MenuDocument").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0018_restaurant_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fooditem",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="featured_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(drop_menu_documents, migrations.RunPython.noop),
+    ]
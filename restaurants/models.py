@@ -31,6 +31,8 @@ class Restaurant(models.Model):
     owner_name = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     featured_image = models.ImageField(upload_to="restaurants/images/")
+    # Resized copies of featured_image; see restaurants/images.py
+    featured_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
     location = models.ForeignKey(Locations, on_delete=models.CASCADE)
     outlet = models.CharField(max_length=255, blank=True, null=True)
@@ -43,10 +45,22 @@ class Restaurant(models.Model):
     closing_time = models.TimeField()
     offer_text = models.CharField(max_length=50, blank=True, null=True)
     delivery_time = models.CharField(max_length=20, blank=True, null=True)
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True
+    )
+    # Geohash of latitude/longitude, kept in step on save; see restaurants/geo.py
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False)
 
     class Meta:
         db_table = "restaurants_restaurant"
         ordering = ["id"]
+        indexes = [
+            # Nearby searches range-scan geohash prefixes
+            models.Index(fields=["geohash"], name="restaurant_geohash_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if self.owner_name.role != "restaurant_owner":
@@ -69,6 +83,7 @@ class FoodItem(models.Model):
         Restaurant, on_delete=models.CASCADE, related_name="food_items"
     )
     image = models.ImageField(upload_to="food_items/images/", blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -77,10 +92,63 @@ class FoodItem(models.Model):
     )
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
     categories = models.ManyToManyField(Category, related_name="food_items")
-    is_available = models.BooleanField(default=False)
+    is_available = models.BooleanField(default=True)
 
     class Meta:
         db_table = "restaurants_food_items"
+        indexes = [
+            # Menus filtered by availability within a restaurant
+            models.Index(
+                fields=["restaurant", "is_available"],
+                name="fooditem_restaurant_avail_idx",
+            ),
+            # The catalog-wide FoodItems listing only reads available items
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_available=True),
+                name="fooditem_listed_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    @property
+    def is_orderable(self):
+        return self.is_available
+
+
+class MenuDocument(models.Model):
+    restaurant = models.OneToOneField(
+        Restaurant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="menu_document",
+    )
+    # Pre-rendered RestaurantDetails payload, kept as text so key order survives.
+    content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "restaurants_menu_document"
+
+    def __str__(self):
+        return f"Menu document for restaurant {self.restaurant_id}"
+
+
+class RestaurantSearchDocument(models.Model):
+    restaurant = models.OneToOneField(
+        Restaurant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    # Restaurant, category and menu text that ?q= searches run against.
+    content = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "restaurants_search_document"
+
+    def __str__(self):
+        return f"Search document for restaurant {self.restaurant_id}"
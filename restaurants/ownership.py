@@ -0,0 +1,84 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.models import User
+from restaurants.models import Restaurant
+
+# Cached for owners without a restaurant, which None cannot tell from a miss
+NO_RESTAURANT = 0
+
+
+def _timeout():
+    return getattr(settings, "OWNERSHIP_CACHE_TIMEOUT", 300)
+
+
+def _version_key(user_id):
+    return f"owned-restaurant-version:{user_id}"
+
+
+def _cache_key(user_id, version):
+    return f"owned-restaurant:{user_id}:{version}"
+
+
+def _version(user_id):
+    """
+    Current cache version of a user's ownership. A missing one, e.g. evicted,
+    is replaced with a fresh one rather than reset, as in representation_cache.
+    """
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _lookup(user_id):
+    return (
+        Restaurant.objects.filter(owner_name_id=user_id)
+        .values_list("id", flat=True)
+        .first()
+    ) or NO_RESTAURANT
+
+
+def owned_restaurant_id(user, request=None):
+    """
+    Id of the restaurant `user` owns, or None. Memoized on `request` when one
+    is given and cached across processes until the restaurant is saved or
+    deleted, so owner dashboards look it up once per OWNERSHIP_CACHE_TIMEOUT.
+    Entries are cached under the version read before the lookup, so one that
+    raced a change is never served: ownership_changed() retires that version.
+    """
+    if isinstance(user, AnonymousUser) or user.role != User.RESTAURANT_OWNER:
+        return None
+
+    memo = getattr(request, "_owned_restaurant_ids", None)
+    if memo is None:
+        memo = {}
+        if request is not None:
+            request._owned_restaurant_ids = memo
+    if user.pk not in memo:
+        key = _cache_key(user.pk, _version(user.pk))
+        restaurant_id = cache.get(key)
+        if restaurant_id is None:
+            restaurant_id = _lookup(user.pk)
+            cache.add(key, restaurant_id, _timeout())
+        memo[user.pk] = restaurant_id or None
+    return memo[user.pk]
+
+
+def ownership_changed(user_ids):
+    """Retire the cached restaurants of these users, now and after commit."""
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return
+
+    def bump():
+        cache.set_many({_version_key(pk): time.time_ns() for pk in user_ids}, None)
+
+    bump()
+    transaction.on_commit(bump)
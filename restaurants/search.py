@@ -0,0 +1,186 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Case, Count, IntegerField, Max, When
+
+from restaurants.models import Restaurant, RestaurantSearchDocument
+
+SEARCH_RESULT_LIMIT = 500
+
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.4
+FUZZY_THRESHOLD = 0.3
+
+# Both expressions must match the indexes created in migration 0015.
+POSTGRES_SEARCH_SQL = """
+    SELECT restaurant_id
+    FROM restaurants_search_document
+    WHERE to_tsvector('simple', content) @@ to_tsquery('simple', %(tsquery)s)
+       OR %(query)s <%% content
+    ORDER BY ts_rank(to_tsvector('simple', content), to_tsquery('simple', %(tsquery)s))
+             + word_similarity(%(query)s, content) DESC,
+             restaurant_id
+    LIMIT %(limit)s
+"""
+
+
+def tokenize(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def search_document_text(restaurant):
+    """Text indexed for a restaurant; expects categories and menu prefetched."""
+    parts = [restaurant.name, restaurant.outlet, restaurant.address]
+    parts += [category.name for category in restaurant.categories.all()]
+    for item in restaurant.food_items.all():
+        parts += [item.name, item.description]
+        parts += [category.name for category in item.categories.all()]
+    return " ".join(dict.fromkeys(part for part in parts if part))
+
+
+def refresh_search_documents(restaurant_ids):
+    restaurants = Restaurant.objects.filter(pk__in=restaurant_ids).prefetch_related(
+        "categories", "food_items__categories"
+    )
+    for restaurant in restaurants:
+        RestaurantSearchDocument.objects.update_or_create(
+            restaurant=restaurant,
+            defaults={"content": search_document_text(restaurant)},
+        )
+
+
+class InvertedIndex:
+    """
+    In-memory term index used where Postgres full-text and trigram search is not
+    available, e.g. SQLite test runs. Every query term must match, either exactly,
+    as a prefix of an indexed term, or within trigram distance of one.
+    """
+
+    def __init__(self, documents):
+        self.postings = defaultdict(dict)
+        for restaurant_id, content in documents:
+            for term in tokenize(content):
+                postings = self.postings[term]
+                postings[restaurant_id] = postings.get(restaurant_id, 0) + 1
+
+        self.vocabulary = sorted(self.postings)
+        self.trigram_terms = defaultdict(set)
+        for term in self.vocabulary:
+            for gram in trigrams(term):
+                self.trigram_terms[gram].add(term)
+
+    def expand(self, term):
+        """Indexed terms matching a query term, weighted exact > prefix > fuzzy."""
+        matches = {}
+        if term in self.postings:
+            matches[term] = 1.0
+
+        for candidate in self.vocabulary[bisect_left(self.vocabulary, term) :]:
+            if not candidate.startswith(term):
+                break
+            matches.setdefault(candidate, PREFIX_WEIGHT)
+
+        if not matches:
+            grams = trigrams(term)
+            candidates = set()
+            for gram in grams:
+                candidates |= self.trigram_terms.get(gram, set())
+            for candidate in candidates:
+                candidate_grams = trigrams(candidate)
+                similarity = len(grams & candidate_grams) / len(grams | candidate_grams)
+                if similarity >= FUZZY_THRESHOLD:
+                    matches[candidate] = FUZZY_WEIGHT * similarity
+        return matches
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        scores = None
+        for term in tokenize(query):
+            term_scores = {}
+            for candidate, weight in self.expand(term).items():
+                for restaurant_id, frequency in self.postings[candidate].items():
+                    score = weight * (1 + math.log(frequency))
+                    if score > term_scores.get(restaurant_id, 0):
+                        term_scores[restaurant_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    restaurant_id: score + term_scores[restaurant_id]
+                    for restaurant_id, score in scores.items()
+                    if restaurant_id in term_scores
+                }
+
+        ranked = sorted((scores or {}).items(), key=lambda hit: (-hit[1], hit[0]))
+        return [restaurant_id for restaurant_id, _ in ranked[:limit]]
+
+
+_index_lock = threading.Lock()
+_index = None
+_index_fingerprint = None
+
+
+def get_inverted_index():
+    """
+    The process-local index, rebuilt whenever the search documents change.
+    The fingerprint query keeps processes in step with each other's writes.
+    """
+    global _index, _index_fingerprint
+
+    fingerprint = RestaurantSearchDocument.objects.aggregate(
+        count=Count("pk"), updated_at=Max("updated_at")
+    )
+    with _index_lock:
+        if _index is None or fingerprint != _index_fingerprint:
+            _index = InvertedIndex(
+                RestaurantSearchDocument.objects.values_list("restaurant_id", "content")
+            )
+            _index_fingerprint = fingerprint
+        return _index
+
+
+def ranked_restaurant_ids(query, limit=SEARCH_RESULT_LIMIT):
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    if connection.vendor != "postgresql":
+        return get_inverted_index().search(query, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            POSTGRES_SEARCH_SQL,
+            {
+                "tsquery": " & ".join(f"{term}:*" for term in terms),
+                "query": " ".join(terms),
+                "limit": limit,
+            },
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_restaurants(queryset, query):
+    """Filter a restaurant queryset to search hits, best match first."""
+    return order_by_rank(queryset, ranked_restaurant_ids(query))
+
+
+def order_by_rank(queryset, restaurant_ids):
+    """Filter a restaurant queryset to `restaurant_ids`, in that order."""
+    if not restaurant_ids:
+        return queryset.none()
+
+    return queryset.filter(pk__in=restaurant_ids).order_by(
+        Case(
+            *[When(pk=pk, then=rank) for rank, pk in enumerate(restaurant_ids)],
+            output_field=IntegerField(),
+        )
+    )
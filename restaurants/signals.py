@@ -0,0 +1,167 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from restaurants.models import Restaurant, FoodItem, Category, Locations, MenuDocument
+from restaurants.search import refresh_search_documents
+from restaurants.availability import availability_changed
+from restaurants.geo import encode
+from restaurants.images import IMAGE_FIELDS, needs_variants
+from restaurants.tasks import schedule_variants
+from restaurants.ownership import ownership_changed
+from api.v1.reference_cache import bump_table_version
+from api.v1.representation_cache import invalidate_representations
+
+
+def menu_changed(restaurant_ids):
+    """
+    Drop the menu documents of these restaurants and rebuild them, along with
+    their search documents, once the surrounding transaction commits.
+    """
+    restaurant_ids = {pk for pk in restaurant_ids if pk is not None}
+    if not restaurant_ids:
+        return
+
+    MenuDocument.objects.filter(restaurant_id__in=restaurant_ids).delete()
+    transaction.on_commit(lambda: _rebuild_documents(restaurant_ids))
+
+
+def _rebuild_documents(restaurant_ids):
+    from api.v1.restaurants.documents import refresh_menu_document
+
+    for restaurant_id in restaurant_ids:
+        refresh_menu_document(restaurant_id)
+    refresh_search_documents(restaurant_ids)
+
+
+def _restaurants_using_category(category):
+    return set(
+        Restaurant.objects.filter(categories=category).values_list("id", flat=True)
+    ) | set(
+        FoodItem.objects.filter(categories=category).values_list(
+            "restaurant_id", flat=True
+        )
+    )
+
+
+@receiver(pre_save, sender=Restaurant)
+def restaurant_geohash(sender, instance, **kwargs):
+    if instance.latitude is None or instance.longitude is None:
+        instance.geohash = ""
+    else:
+        instance.geohash = encode(float(instance.latitude), float(instance.longitude))
+
+
+@receiver(pre_save, sender=Restaurant)
+def restaurant_owner_changing(sender, instance, **kwargs):
+    instance._previous_owner_id = (
+        Restaurant.objects.filter(pk=instance.pk)
+        .values_list("owner_name_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved(sender, instance, **kwargs):
+    menu_changed([instance.pk])
+    ownership_changed([instance.owner_name_id, instance._previous_owner_id])
+
+
+@receiver(post_delete, sender=Restaurant)
+def restaurant_deleted(sender, instance, **kwargs):
+    ownership_changed([instance.owner_name_id])
+
+
+@receiver(pre_save, sender=Restaurant)
+@receiver(pre_save, sender=FoodItem)
+def image_replaced(sender, instance, update_fields=None, **kwargs):
+    image_field, variants_field = IMAGE_FIELDS[sender]
+    if update_fields is not None and image_field not in update_fields:
+        return
+    if needs_variants(instance):
+        # Variants of the previous image must not be served with this one
+        setattr(instance, variants_field, {})
+        instance._variants_pending = bool(getattr(instance, image_field))
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_save, sender=FoodItem)
+def image_saved(sender, instance, **kwargs):
+    if getattr(instance, "_variants_pending", False):
+        instance._variants_pending = False
+        schedule_variants(instance)
+
+
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+def food_item_changed(sender, instance, update_fields=None, **kwargs):
+    invalidate_representations(FoodItem, [instance.pk])
+    availability_changed([instance.restaurant_id])
+    # Menu documents hold unavailable items too, see restaurants/availability.py
+    if update_fields is not None and set(update_fields) == {"is_available"}:
+        return
+    menu_changed([instance.restaurant_id])
+
+
+@receiver(m2m_changed, sender=Restaurant.categories.through)
+def restaurant_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            menu_changed([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        menu_changed(pk_set)
+    elif action == "pre_clear":
+        menu_changed(instance.restaurant_set.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=FoodItem.categories.through)
+def food_item_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_representations(FoodItem, [instance.pk])
+            menu_changed([instance.restaurant_id])
+        return
+
+    if action in ("post_add", "post_remove"):
+        food_items = FoodItem.objects.filter(pk__in=pk_set)
+    elif action == "pre_clear":
+        food_items = instance.food_items.all()
+    else:
+        return
+    food_items = list(food_items.values_list("id", "restaurant_id"))
+    invalidate_representations(FoodItem, [pk for pk, _ in food_items])
+    menu_changed([restaurant_id for _, restaurant_id in food_items])
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    invalidate_representations(
+        FoodItem, instance.food_items.values_list("id", flat=True)
+    )
+    menu_changed(_restaurants_using_category(instance))
+
+
+@receiver(post_save, sender=Locations)
+def location_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    menu_changed(instance.restaurant_set.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Locations)
+@receiver(post_delete, sender=Locations)
+def reference_table_changed(sender, **kwargs):
+    bump_table_version(sender)
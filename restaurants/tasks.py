@@ -0,0 +1,15 @@
+from django.apps import apps
+
+from restaurants.images import generate_variants
+from tasks.queue import enqueue, task
+
+
+@task()
+def generate_image_variants(model_label, pk):
+    """Resize the current image of a restaurant or food item into its variants."""
+    generate_variants(apps.get_model(model_label), pk)
+
+
+def schedule_variants(instance):
+    """Queue the resizing of an object's image; it runs once the save commits."""
+    enqueue(generate_image_variants, instance._meta.label, instance.pk)
@@ -1,3 +1,915 @@
-from django.test import TestCase
+import io
+import json
+import math
+import os
+import random
+import tempfile
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from accounts.models import User
+from api.v1.restaurants.documents import (
+    build_menu_document,
+    get_menu_document,
+    refresh_menu_document,
+)
+from api.v1.restaurants.queries import food_item_queryset
+from api.v1.restaurants.serializers import FoodItemSerializer
+from api.v1.categories.views import AsyncCategoryList
+from api.v1.pagination import KeysetPagination
+from api.v1.locations.views import AsyncLocationsList
+from api.v1.restaurants.views import (
+    FoodItems,
+    AsyncRestaurantList,
+    AsyncRestaurantDetails,
+    AsyncFoodItems,
+)
+from restaurants import geo, ownership
+from restaurants.ownership import owned_restaurant_id, ownership_changed
+from restaurants.models import Restaurant, FoodItem, Category, Locations, MenuDocument
+from tasks.brokers import DatabaseBroker
+from tasks.worker import Worker
+
+
+class CatalogFixtureMixin:
+    def setUp(self):
+        self.location = Locations.objects.create(name="Kochi")
+        self.categories = [
+            Category.objects.create(name="Biryani"),
+            Category.objects.create(name="Desserts"),
+        ]
+
+    def create_restaurant(self, index, menu_size=0):
+        owner = User.objects.create(
+            username=f"owner-{index}", role=User.RESTAURANT_OWNER
+        )
+        restaurant = Restaurant.objects.create(
+            owner_name=owner,
+            name=f"Restaurant {index}",
+            featured_image="restaurants/images/featured.jpg",
+            rating="4.5",
+            location=self.location,
+            email=f"owner-{index}@example.com",
+            address="MG Road",
+            phone_number="9999999999",
+            working_days=["monday", "tuesday"],
+            opening_time=time(9, 0),
+            closing_time=time(22, 30),
+        )
+        restaurant.categories.set(self.categories)
+        for item_index in range(menu_size):
+            self.create_food_item(restaurant, f"Item {item_index}")
+        return restaurant
+
+    def create_food_item(self, restaurant, name, price="120.00", **kwargs):
+        food_item = FoodItem.objects.create(
+            restaurant=restaurant, name=name, price=price, **kwargs
+        )
+        food_item.categories.set(self.categories)
+        return food_item
+
+
+class RestaurantListQueryCountTests(CatalogFixtureMixin, APITestCase):
+    def count_queries(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("restaurant-list"), {"page_size": page_size}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), page_size)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_page_and_menu_size(self):
+        for index in range(2):
+            self.create_restaurant(index, menu_size=1)
+        small_page = self.count_queries(page_size=2)
+
+        for index in range(2, 10):
+            self.create_restaurant(index, menu_size=30)
+        large_page = self.count_queries(page_size=10)
+
+        self.assertEqual(small_page, large_page)
+
+
+class MenuDocumentTests(CatalogFixtureMixin, APITestCase):
+    def get_menu(self, restaurant):
+        response = self.client.get(
+            reverse("restaurantDetails-list", args=[restaurant.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]
+
+    def test_menu_document_is_rebuilt_after_menu_changes(self):
+        restaurant = self.create_restaurant(0, menu_size=1)
+        self.assertEqual(len(self.get_menu(restaurant)["food_menu"]), 1)
+        self.assertTrue(MenuDocument.objects.filter(restaurant=restaurant).exists())
+
+        self.create_food_item(restaurant, "Falooda")
+        self.categories[0].name = "Mandi"
+        self.categories[0].save()
+
+        menu = self.get_menu(restaurant)
+        self.assertEqual(len(menu["food_menu"]), 2)
+        self.assertIn("Mandi", menu["categories"])
+        self.assertTrue(menu["featured_image"].startswith("http://testserver/"))
+
+    def test_read_misses_do_not_overwrite_a_rebuilt_document(self):
+        restaurant = self.create_restaurant(0, menu_size=1)
+        stale = build_menu_document(restaurant.pk)
+
+        def rebuilt_meanwhile(restaurant_id):
+            # A write commits and rebuilds while the miss is rendering
+            self.create_food_item(restaurant, "Falooda")
+            build.side_effect = build_menu_document
+            refresh_menu_document(restaurant_id)
+            return stale
+
+        with mock.patch(
+            "api.v1.restaurants.documents.build_menu_document",
+            side_effect=rebuilt_meanwhile,
+        ) as build:
+            self.assertEqual(len(get_menu_document(restaurant.pk)["food_menu"]), 1)
+        self.assertEqual(len(self.get_menu(restaurant)["food_menu"]), 2)
+
+    def test_missing_restaurant_returns_not_found(self):
+        response = self.client.get(reverse("restaurantDetails-list", args=[404]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FoodItemAvailabilityTests(CatalogFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant = self.create_restaurant(0, menu_size=3)
+        self.menu = list(self.restaurant.food_items.order_by("id"))
+
+    def menu_ids(self):
+        response = self.client.get(
+            reverse("restaurantDetails-list", args=[self.restaurant.pk])
+        )
+        return [item["id"] for item in response.data["data"]["food_menu"]]
+
+    def toggle(self, food_items, is_available):
+        return self.client.post(
+            reverse("food-item-availability", args=[self.restaurant.pk]),
+            {
+                "food_items": [item.pk for item in food_items],
+                "is_available": is_available,
+            },
+            format="json",
+        )
+
+    def test_toggles_are_served_without_rebuilding_the_menu_document(self):
+        self.assertEqual(self.menu_ids(), [item.pk for item in self.menu])
+        document = MenuDocument.objects.get(restaurant=self.restaurant)
+
+        self.client.force_authenticate(self.restaurant.owner_name)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.toggle(self.menu[:2], False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["data"]["updated"], [item.pk for item in self.menu[:2]]
+        )
+
+        with mock.patch(
+            "api.v1.restaurants.documents.build_menu_document"
+        ) as build_menu_document:
+            self.assertEqual(self.menu_ids(), [self.menu[2].pk])
+            self.menu[0].is_available = True
+            with self.captureOnCommitCallbacks(execute=True):
+                self.menu[0].save(update_fields=["is_available"])
+            self.assertEqual(self.menu_ids(), [self.menu[0].pk, self.menu[2].pk])
+        build_menu_document.assert_not_called()
+        self.assertEqual(
+            MenuDocument.objects.get(restaurant=self.restaurant).content,
+            document.content,
+        )
+
+        response = self.client.get(reverse("food_item"))
+        listed = json.loads(b"".join(response.streaming_content))["data"]
+        self.assertEqual(
+            {item["id"]: item["is_available"] for item in listed},
+            {self.menu[0].pk: True, self.menu[2].pk: True},
+        )
+
+    def test_only_the_owner_can_toggle_their_own_items(self):
+        self.client.force_authenticate(
+            User.objects.create(username="customer", role=User.CUSTOMER)
+        )
+        self.assertEqual(self.toggle(self.menu, False).status_code, 403)
+
+        other = self.create_restaurant(1, menu_size=1)
+        self.client.force_authenticate(self.restaurant.owner_name)
+        response = self.toggle(self.menu + list(other.food_items.all()), False)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(FoodItem.objects.filter(is_available=True).count(), 4)
+
+
+class MenuImportExportTests(CatalogFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(0, menu_size=1)
+        self.client.force_authenticate(self.restaurant.owner_name)
+        self.url = reverse("restaurant-menu", args=[self.restaurant.pk])
+
+    def import_csv(self, rows):
+        body = "name,price,food_type,categories\n" + "".join(
+            f"{name},{price},veg,{categories}\n" for name, price, categories in rows
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.generic(
+                "POST", self.url, body, content_type="text/csv"
+            )
+        return response, len(queries)
+
+    def export(self, fmt="jsonl"):
+        response = self.client.get(self.url, {"as": fmt})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_upserts_in_a_fixed_number_of_queries(self):
+        biryani, desserts = (category.pk for category in self.categories)
+        response, few = self.import_csv(
+            [("Item 0", "99.00", desserts), ("Falooda", "80", f"{biryani};{desserts}")]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"], {"created": 1, "updated": 1})
+
+        response, many = self.import_csv(
+            [(f"Item {index}", "50", biryani) for index in range(40)]
+        )
+        self.assertEqual(response.data["data"], {"created": 39, "updated": 1})
+        self.assertEqual(few, many)
+
+        exported = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual(len(exported), 41)
+        falooda = next(row for row in exported if row["name"] == "Falooda")
+        self.assertEqual(falooda["price"], "80.00")
+        self.assertEqual(falooda["categories"], [biryani, desserts])
+        self.assertEqual(exported[0]["categories"], [biryani])
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        other = self.create_restaurant(1, menu_size=1)
+        lines = [
+            {"name": "Falooda", "price": "80", "categories": [999]},
+            {"name": "Parotta", "price": "cheap"},
+            {"id": other.food_items.get().pk, "name": "Elsewhere", "price": "10"},
+            {"name": "Shake", "price": "60", "restaurant": other.pk},
+        ]
+        response = self.client.generic(
+            "POST",
+            self.url,
+            "\n".join(json.dumps(line) for line in lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [
+                (error["line"], list(error["errors"]))
+                for error in response.data["errors"]
+            ],
+            [(1, ["categories"]), (2, ["price"]), (3, ["id"]), (4, ["restaurant"])],
+        )
+        self.assertEqual(self.restaurant.food_items.count(), 1)
+
+    def test_partial_files_only_write_their_columns(self):
+        item = self.restaurant.food_items.get()
+        FoodItem.objects.filter(pk=item.pk).update(
+            description="Spicy", rating="4.2", is_available=False
+        )
+        response = self.client.generic(
+            "POST", self.url, f"id,price\n{item.pk},75\n", content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"], {"created": 0, "updated": 1})
+        item.refresh_from_db()
+        self.assertEqual(
+            (item.name, item.price, item.description, item.rating, item.is_available),
+            ("Item 0", Decimal("75.00"), "Spicy", Decimal("4.2"), False),
+        )
+        self.assertEqual(item.categories.count(), 2)
+
+        response = self.client.generic(
+            "POST",
+            self.url,
+            json.dumps({"name": "Falooda", "description": "Cold"}),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["errors"][0]["errors"]), ["price"])
+
+    def test_csv_export_round_trips_through_the_command(self):
+        self.create_food_item(self.restaurant, "Falooda, large", description="Cold")
+        exported = self.export("csv")
+        self.assertTrue(exported.startswith("id,restaurant,name,"))
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as menu:
+            menu.write(exported.replace("Cold", "Chilled"))
+        self.addCleanup(os.remove, menu.name)
+        out = io.StringIO()
+        call_command("import_menu", menu.name, stdout=out)
+
+        self.assertIn("0 item(s) created, 2 updated", out.getvalue())
+        self.assertEqual(
+            self.restaurant.food_items.get(name="Falooda, large").description,
+            "Chilled",
+        )
+        self.assertEqual(self.export("csv"), exported.replace("Cold", "Chilled"))
+
+    def test_only_the_owner_can_use_the_menu(self):
+        self.client.force_authenticate(
+            User.objects.create(username="customer", role=User.CUSTOMER)
+        )
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class RestaurantSearchTests(CatalogFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paragon = self.create_restaurant(0)
+            self.paragon.name = "Paragon"
+            self.paragon.save()
+            self.create_food_item(self.paragon, "Malabar Parotta")
+
+            self.rahmath = self.create_restaurant(1)
+            self.rahmath.name = "Rahmath Hotel"
+            self.rahmath.save()
+            self.create_food_item(self.rahmath, "Beef Fry", description="Kerala style")
+
+    def search(self, query):
+        response = self.client.get(reverse("restaurant-list"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [restaurant["id"] for restaurant in response.data["data"]]
+
+    def test_matches_restaurant_and_menu_text(self):
+        self.assertEqual(self.search("paragon"), [self.paragon.pk])
+        self.assertEqual(self.search("beef kerala"), [self.rahmath.pk])
+
+    def test_prefix_and_typo_tolerance(self):
+        self.assertEqual(self.search("parot"), [self.paragon.pk])
+        self.assertEqual(self.search("rahmat hotle"), [self.rahmath.pk])
+
+    def test_exact_matches_rank_above_prefix_matches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            snacks = self.create_restaurant(2)
+            self.create_food_item(snacks, "Fryums")
+
+        self.assertEqual(self.search("fry"), [self.rahmath.pk, snacks.pk])
+        self.assertEqual(self.search("zzzz"), [])
+
+
+class NearbyRestaurantTests(CatalogFixtureMixin, APITestCase):
+    # Kochi
+    origin = (9.9312, 76.2673)
+
+    def place(self, restaurant, north_km, east_km):
+        restaurant.latitude = round(self.origin[0] + north_km / geo.KM_PER_DEGREE, 6)
+        restaurant.longitude = round(
+            self.origin[1]
+            + east_km / (geo.KM_PER_DEGREE * math.cos(math.radians(self.origin[0]))),
+            6,
+        )
+        restaurant.save()
+        return restaurant
+
+    def nearby(self, **params):
+        response = self.client.get(
+            reverse("restaurant-list"),
+            {"lat": self.origin[0], "lng": self.origin[1], **params},
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (restaurant["id"], restaurant["distance_km"])
+            for restaurant in response.data["data"]
+        ]
+
+    def test_geohash(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744), "u4pruydqq")
+
+    def test_lists_restaurants_in_range_nearest_first(self):
+        far = self.place(self.create_restaurant(0), 6, 6)
+        near = self.place(self.create_restaurant(1), 0, -0.5)
+        middle = self.place(self.create_restaurant(2), -3, 0)
+        self.create_restaurant(3)
+
+        results = self.nearby()
+        self.assertEqual([pk for pk, _ in results], [near.pk, middle.pk])
+        self.assertAlmostEqual(results[0][1], 0.5, places=2)
+        self.assertEqual(
+            [pk for pk, _ in self.nearby(radius=10)], [near.pk, middle.pk, far.pk]
+        )
+
+        with override_settings(COMPILED_READ_SERIALIZERS=False):
+            serialized = self.client.get(
+                reverse("restaurant-list"),
+                {"lat": self.origin[0], "lng": self.origin[1]},
+            )
+        compiled = self.client.get(
+            reverse("restaurant-list"), {"lat": self.origin[0], "lng": self.origin[1]}
+        )
+        self.assertEqual(compiled.content, serialized.content)
+
+    def test_matches_a_full_scan_across_cell_boundaries(self):
+        rng = random.Random(0)
+        for index in range(60):
+            self.place(
+                self.create_restaurant(index),
+                rng.uniform(-8, 8),
+                rng.uniform(-8, 8),
+            )
+        points = Restaurant.objects.values_list("id", "latitude", "longitude")
+        for latitude, longitude, radius in [
+            (*self.origin, 5),
+            (9.95, 76.29, 2.5),
+            (9.90, 76.24, 7),
+        ]:
+            expected = sorted(
+                pk
+                for pk, point_latitude, point_longitude in points
+                if geo.haversine_km(
+                    latitude, longitude, float(point_latitude), float(point_longitude)
+                )
+                <= radius
+            )
+            found = geo.nearby_restaurants(latitude, longitude, radius)
+            self.assertEqual(sorted(pk for pk, _ in found), expected)
+
+    def test_open_now(self):
+        day = self.place(self.create_restaurant(0), 0, 1)
+        late = self.place(self.create_restaurant(1), 0, 2)
+        late.opening_time, late.closing_time = time(18, 0), time(2, 0)
+        late.working_days = ["monday"]
+        late.save()
+
+        # A Monday at 23:00 in Kochi and the Tuesday 01:00 after it, in UTC
+        monday_night = datetime(2024, 1, 1, 17, 30, tzinfo=dt_timezone.utc)
+        for now, expected in [
+            (monday_night, [late.pk]),
+            (monday_night + timedelta(hours=2), [late.pk]),
+            (monday_night - timedelta(hours=12), [day.pk]),
+        ]:
+            with mock.patch("django.utils.timezone.now", return_value=now):
+                self.assertEqual([pk for pk, _ in self.nearby(open_now=1)], expected)
+
+        # Hours are kept on the restaurants' clock, not the server's
+        with override_settings(RESTAURANT_TIME_ZONE="UTC"), mock.patch(
+            "django.utils.timezone.now", return_value=monday_night
+        ):
+            self.assertEqual([pk for pk, _ in self.nearby(open_now=1)], [day.pk])
+
+    def test_rejects_invalid_locations(self):
+        response = self.client.get(reverse("restaurant-list"), {"lat": 100})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data["errors"]), {"lat", "lng"})
+
+
+class OwnershipResolverTests(CatalogFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(0)
+        self.owner = self.restaurant.owner_name
+
+    def resolve(self, user, request=None):
+        with CaptureQueriesContext(connection) as queries:
+            restaurant_id = owned_restaurant_id(user, request)
+        return restaurant_id, len(queries)
+
+    def test_lookups_are_memoized_per_request_and_cached(self):
+        request = APIRequestFactory().get("/")
+        owner = User.objects.get(pk=self.owner.pk)
+        ownership_changed([owner.pk])
+
+        self.assertEqual(self.resolve(owner, request), (self.restaurant.pk, 1))
+        with mock.patch("restaurants.ownership.cache.get") as cache_get:
+            self.assertEqual(self.resolve(owner, request), (self.restaurant.pk, 0))
+        cache_get.assert_not_called()
+        self.assertEqual(self.resolve(owner), (self.restaurant.pk, 0))
+
+        customer = User.objects.create(username="customer", role=User.CUSTOMER)
+        self.assertEqual(self.resolve(customer), (None, 0))
+
+    def test_saves_and_deletes_invalidate(self):
+        self.assertEqual(owned_restaurant_id(self.owner), self.restaurant.pk)
+        other = User.objects.create(username="other", role=User.RESTAURANT_OWNER)
+        self.assertIsNone(owned_restaurant_id(other))
+
+        self.restaurant.owner_name = other
+        self.restaurant.save()
+        self.assertIsNone(owned_restaurant_id(self.owner))
+        self.assertEqual(owned_restaurant_id(other), self.restaurant.pk)
+
+        self.restaurant.delete()
+        self.assertIsNone(owned_restaurant_id(other))
+
+    def test_lookups_racing_a_change_are_not_served_afterwards(self):
+        other = User.objects.create(username="other", role=User.RESTAURANT_OWNER)
+
+        def changed_meanwhile(user_id):
+            # Read the previous owner, then lose the race to the commit
+            stale = lookup(user_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.restaurant.owner_name = other
+                self.restaurant.save()
+            return stale
+
+        lookup = ownership._lookup
+        with mock.patch.object(ownership, "_lookup", side_effect=changed_meanwhile):
+            self.assertEqual(owned_restaurant_id(self.owner), self.restaurant.pk)
+        self.assertIsNone(owned_restaurant_id(self.owner))
+
+
+class ImageVariantTests(CatalogFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.restaurant = self.create_restaurant(0)
+
+    def upload(self, name, size=(800, 400), mode="RGBA"):
+        buffer = io.BytesIO()
+        Image.new(mode, size, (200, 80, 20, 128)[: len(mode)]).save(buffer, "PNG")
+        food_item = self.create_food_item(
+            self.restaurant, name, image=SimpleUploadedFile(name, buffer.getvalue())
+        )
+        self.run_tasks()
+        food_item.refresh_from_db()
+        return food_item
+
+    def run_tasks(self):
+        # Variants are resized by the task workers
+        Worker(DatabaseBroker()).run(once=True)
+
+    def test_uploads_get_content_addressed_variants(self):
+        food_item = self.upload("dosa.png")
+        variants = food_item.image_variants
+
+        self.assertEqual(variants["source"], food_item.image.name)
+        self.assertEqual(set(variants["webp"]), {"160", "320", "640"})
+        storage = food_item.image.storage
+        with storage.open(variants["webp"]["320"]) as variant:
+            self.assertEqual(Image.open(variant).size, (320, 160))
+        with storage.open(variants["jpeg"]["640"]) as variant:
+            self.assertEqual(Image.open(variant).format, "JPEG")
+
+        # The same picture uploaded again reuses the stored variants
+        self.assertEqual(
+            self.upload("dosa-copy.png").image_variants["webp"], variants["webp"]
+        )
+        # Small originals are not scaled up
+        small = self.upload("chutney.png", size=(100, 50), mode="RGB")
+        self.assertEqual(set(small.image_variants["jpeg"]), {"100"})
+
+        # Images without variants are backfilled by the management command
+        FoodItem.objects.filter(pk=food_item.pk).update(image_variants={})
+        call_command("generate_image_variants", stdout=io.StringIO())
+        food_item.refresh_from_db()
+        self.assertEqual(food_item.image_variants, variants)
+
+    def test_srcsets_are_served_and_reset_when_the_image_changes(self):
+        food_item = self.upload("dosa.png")
+        response = self.client.get(
+            reverse("restaurantDetails-list", args=[self.restaurant.pk])
+        )
+        item = response.json()["data"]["food_menu"][0]
+        self.assertEqual(
+            item["image_srcset"]["webp"]["160"],
+            "http://testserver/media/" + food_item.image_variants["webp"]["160"],
+        )
+
+        food_item.image = "food_items/images/missing.png"
+        food_item.save()
+        self.run_tasks()
+        food_item.refresh_from_db()
+        self.assertEqual(food_item.image_variants, {})
+        self.assertIsNone(FoodItemSerializer(food_item).data["image_srcset"])
+
+
+class RestaurantCursorPaginationTests(CatalogFixtureMixin, APITestCase):
+    def test_walks_pages_forwards_and_backwards(self):
+        restaurants = [self.create_restaurant(index) for index in range(5)]
+        expected = [restaurant.pk for restaurant in restaurants]
+
+        response = self.client.get(
+            reverse("restaurant-list"), {"cursor": "", "page_size": 2}
+        )
+        self.assertIsNone(response.data["count"])
+        self.assertIsNone(response.data["previous"])
+        seen = [restaurant["id"] for restaurant in response.data["data"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen += [restaurant["id"] for restaurant in response.data["data"]]
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [restaurant["id"] for restaurant in response.data["data"]], expected[2:4]
+        )
+
+    def test_count_is_opt_in(self):
+        for index in range(3):
+            self.create_restaurant(index)
+        response = self.client.get(
+            reverse("restaurant-list"), {"cursor": "", "with_count": "1"}
+        )
+        self.assertEqual(response.data["count"], 3)
+
+    def test_edited_cursors_are_not_found(self):
+        self.create_restaurant(0)
+        encode = KeysetPagination().encode_token
+        for cursor in [
+            "not-a-cursor",
+            encode(["abc"]),
+            encode([None]),
+            encode([1, 2]),
+            encode([]),
+            encode([{"id": 1}]),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse("restaurant-list"), {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 404)
+
+
+class ReferenceDataCacheTests(APITestCase):
+    def test_categories_support_conditional_requests(self):
+        Category.objects.create(name="Biryani")
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("category-list"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.create(name="Desserts")
+        response = self.client.get(reverse("category-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            [category["name"] for category in response.json()], ["Biryani", "Desserts"]
+        )
+
+    def test_locations_are_rendered_once_per_version(self):
+        Locations.objects.create(name="Kochi")
+        self.client.get(reverse("Locations-list"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("Locations-list"))
+        self.assertEqual([location["name"] for location in response.json()], ["Kochi"])
+
+
+class FoodItemRepresentationCacheTests(CatalogFixtureMixin, APITestCase):
+    def list_food_items(self):
+        response = self.client.get(reverse("food_item"))
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(b"".join(response.streaming_content))["data"]
+        return {item["id"]: item for item in data}
+
+    def test_items_render_once_until_they_change(self):
+        restaurant = self.create_restaurant(0, menu_size=3)
+        parotta = self.create_food_item(
+            restaurant, "Parotta", image="restaurants/food_items/parotta.jpg"
+        )
+        self.list_food_items()
+
+        with mock.patch.object(
+            FoodItemSerializer,
+            "render_representation",
+            autospec=True,
+            side_effect=FoodItemSerializer.render_representation,
+        ) as render:
+            items = self.list_food_items()
+            self.assertEqual(render.call_count, 0)
+            self.assertTrue(items[parotta.pk]["image"].startswith("http://testserver/"))
+
+            parotta.name = "Kerala Parotta"
+            parotta.save()
+            self.categories[0].name = "Mandi"
+            self.categories[0].save()
+            items = self.list_food_items()
+
+        self.assertEqual(render.call_count, 4)
+        self.assertEqual(items[parotta.pk]["name"], "Kerala Parotta")
+        self.assertIn("Mandi", items[parotta.pk]["categories"])
+
+    def test_category_changes_invalidate_cached_items(self):
+        restaurant = self.create_restaurant(0)
+        food_item = self.create_food_item(restaurant, "Falooda")
+        self.list_food_items()
+
+        food_item.categories.remove(self.categories[0])
+        self.assertEqual(
+            self.list_food_items()[food_item.pk]["categories"], ["Desserts"]
+        )
+        self.categories[1].food_items.clear()
+        self.assertEqual(self.list_food_items()[food_item.pk]["categories"], [])
+
+
+class FoodItemStreamingTests(CatalogFixtureMixin, APITestCase):
+    def get_stream(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("food_item"))
+            body = b"".join(response.streaming_content)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return body, len(queries)
+
+    def test_stream_matches_the_buffered_response(self):
+        restaurant = self.create_restaurant(0, menu_size=5)
+        self.create_food_item(restaurant, "Hidden", is_available=False)
+        body, _ = self.get_stream()
+
+        request = APIRequestFactory().get(reverse("food_item"))
+        serializer = FoodItemSerializer(
+            food_item_queryset().filter(is_available=True),
+            many=True,
+            context={"request": request},
+        )
+        expected = {"status_code": 6000, "data": serializer.data}
+        self.assertEqual(body, JSONRenderer().render(expected))
+        self.assertEqual(len(json.loads(body)["data"]), 5)
+
+    def test_empty_catalog(self):
+        self.assertEqual(self.get_stream()[0], b'{"status_code":6000,"data":[]}')
+
+    @mock.patch.object(FoodItems, "stream_chunk_size", 2)
+    def test_rows_are_read_in_chunks(self):
+        restaurant = self.create_restaurant(0, menu_size=2)
+        _, one_chunk = self.get_stream()
+
+        for index in range(2, 6):
+            self.create_food_item(restaurant, f"Item {index}")
+        _, three_chunks = self.get_stream()
+
+        # Categories are prefetched once per chunk of rows
+        self.assertEqual(three_chunks - one_chunk, 2)
+
+
+class CompiledRestaurantReaderTests(CatalogFixtureMixin, APITestCase):
+    def assert_parity(self, params):
+        compiled = self.client.get(reverse("restaurant-list"), params)
+        with override_settings(COMPILED_READ_SERIALIZERS=False):
+            serialized = self.client.get(reverse("restaurant-list"), params)
+        self.assertEqual(compiled.status_code, 200)
+        self.assertEqual(compiled.content, serialized.content)
+        return compiled.json()["data"]
+
+    def test_matches_restaurant_serializer_output(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.create_restaurant(0, menu_size=3)
+            self.create_food_item(
+                first,
+                "Parotta",
+                image="food_items/images/parotta.jpg",
+                rating="4.0",
+                description="Layered",
+                is_available=False,
+            )
+            second = self.create_restaurant(1)
+            second.categories.set([self.categories[1]])
+            second.rating = None
+            second.outlet = "Edappally"
+            second.save()
+            self.create_restaurant(2, menu_size=1)
+
+        data = self.assert_parity({"page_size": 2})
+        self.assertEqual(
+            [restaurant["id"] for restaurant in data], [first.pk, second.pk]
+        )
+        self.assertEqual(len(data[0]["food_menu"]), 4)
+        self.assert_parity({"page": 2, "page_size": 2})
+        self.assert_parity({"cursor": "", "page_size": 2})
+        self.assert_parity({"q": "restaurant"})
+
+    def test_relations_are_listed_in_id_order(self):
+        restaurant = self.create_restaurant(0)
+        food_items = [self.create_food_item(restaurant, f"Item {i}") for i in range(3)]
+        # Link categories in reverse, so insertion order differs from id order
+        restaurant.categories.clear()
+        restaurant.categories.add(self.categories[1])
+        restaurant.categories.add(self.categories[0])
+        food_items[0].categories.clear()
+        food_items[0].categories.add(self.categories[1])
+        food_items[0].categories.add(self.categories[0])
+
+        # Row order is only guaranteed with ORDER BY, whatever SQLite returns
+        for compiled in (True, False):
+            with override_settings(
+                COMPILED_READ_SERIALIZERS=compiled
+            ), CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("restaurant-list"))
+            for query in queries:
+                if not query["sql"].startswith("SELECT COUNT"):
+                    self.assertIn("ORDER BY", query["sql"])
+
+        (data,) = self.assert_parity({})
+        names = [category.name for category in self.categories]
+        self.assertEqual(data["categories"], names)
+        self.assertEqual(data["food_menu"][0]["categories"], names)
+        self.assertEqual(
+            [item["id"] for item in data["food_menu"]],
+            [item.pk for item in food_items],
+        )
+
+
+class AsyncCatalogViewTests(CatalogFixtureMixin, APITestCase):
+    async def get_async(self, view_class, url, params=None, **kwargs):
+        request = AsyncRequestFactory().get(url, params or {})
+        response = await view_class.as_view()(request, **kwargs)
+        if response.streaming:
+            return response, b"".join(
+                [chunk async for chunk in response.streaming_content]
+            )
+        return response, response.content
+
+    def get_sync(self, url, params):
+        response = self.client.get(url, params or {})
+        if response.streaming:
+            return response, b"".join(response.streaming_content)
+        return response, response.content
+
+    async def assert_parity(self, view_class, url, params=None, **kwargs):
+        response, body = await self.get_async(view_class, url, params, **kwargs)
+        expected, expected_body = await sync_to_async(self.get_sync)(url, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+        self.assertEqual(body, expected_body)
+        return response
+
+    async def test_restaurant_list_matches_the_sync_view(self):
+        def create_restaurants():
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self.create_restaurant(0, menu_size=2)
+                self.create_food_item(
+                    first, "Parotta", image="food_items/images/parotta.jpg"
+                )
+                for index in range(1, 4):
+                    self.create_restaurant(index, menu_size=1)
+
+        await sync_to_async(create_restaurants)()
+        url = reverse("restaurant-list")
+        for params in (
+            {"page_size": 2},
+            {"page": 2, "page_size": 2},
+            {"page": 9},
+            {"cursor": "", "page_size": 2},
+            {"q": "restaurant 2"},
+        ):
+            with self.subTest(params=params):
+                await self.assert_parity(AsyncRestaurantList, url, params)
+
+    async def test_restaurant_details_and_food_items_match_the_sync_views(self):
+        restaurant = await sync_to_async(self.create_restaurant)(0, menu_size=3)
+        await sync_to_async(self.create_food_item)(
+            restaurant, "Hidden", is_available=False
+        )
+        for pk in (restaurant.pk, restaurant.pk + 1):
+            await self.assert_parity(
+                AsyncRestaurantDetails,
+                reverse("restaurantDetails-list", args=[pk]),
+                pk=pk,
+            )
+
+        with mock.patch.object(FoodItems, "stream_chunk_size", 2):
+            response = await self.assert_parity(AsyncFoodItems, reverse("food_item"))
+        self.assertTrue(response.streaming)
+
+    async def test_reference_lists_match_the_sync_views(self):
+        response = await self.assert_parity(AsyncCategoryList, reverse("category-list"))
+        request = AsyncRequestFactory().get(
+            reverse("category-list"), headers={"If-None-Match": response["ETag"]}
+        )
+        response = await AsyncCategoryList.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+
+        await Locations.objects.acreate(name="Thrissur")
+        await self.assert_parity(AsyncLocationsList, reverse("Locations-list"))
+
+    async def test_writes_and_authenticated_reads_go_to_the_sync_view(self):
+        request = AsyncRequestFactory().post(
+            reverse("category-list"), {"name": "Mandi"}, content_type="application/json"
+        )
+        response = await AsyncCategoryList.as_view()(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Category.objects.filter(name="Mandi").aexists())
+
+        request = AsyncRequestFactory().get(
+            reverse("food_item"), headers={"Authorization": "Bearer invalid"}
+        )
+        response = await AsyncFoodItems.as_view()(request)
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the ASGI profile, see swiggy/settings_asgi.py.
+
+    DJANGO_SETTINGS_MODULE=swiggy.settings_asgi gunicorn swiggy.asgi -c swiggy/gunicorn_asgi.py
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Restart workers now and then to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+timeout = 30
+graceful_timeout = 30
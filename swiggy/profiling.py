@@ -0,0 +1,246 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_active = ContextVar("profile", default=None)
+
+# Collapses "IN (%s, %s, ...)" and literals so queries differing only in
+# their arguments share a fingerprint
+_PLACEHOLDER_LISTS = re.compile(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def fingerprint(sql):
+    sql = _LITERALS.sub("?", sql)
+    return _PLACEHOLDER_LISTS.sub("(...)", sql)
+
+
+class RequestProfile:
+    """SQL and serializer timings of one sampled request."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.fingerprints = Counter()
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.sql_seconds += elapsed
+            self.fingerprints[fingerprint(sql)] += 1
+            if elapsed * 1000 >= self.slow_query_ms:
+                self.slow_queries.append((round(elapsed * 1000, 2), sql))
+
+    def repeated_queries(self, threshold):
+        """Fingerprints run at least `threshold` times, the usual N+1 shape."""
+        return {
+            sql: count for sql, count in self.fingerprints.items() if count >= threshold
+        }
+
+
+@contextmanager
+def serializer_timer():
+    """Time serialization within a sampled request; nested calls count once."""
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+
+    profile.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_depth -= 1
+        if not profile.serializer_depth:
+            profile.serializer_seconds += time.perf_counter() - started
+
+
+def _timed_property(prop):
+    def getter(self):
+        with serializer_timer():
+            return prop.fget(self)
+
+    return property(getter)
+
+
+def _timed_method(method):
+    def wrapper(*args, **kwargs):
+        with serializer_timer():
+            return method(*args, **kwargs)
+
+    wrapper.__wrapped__ = method
+    return wrapper
+
+
+_instrumented = False
+
+
+def instrument_serializers():
+    """Route serializer .data and compiled reads through serializer_timer()."""
+    global _instrumented
+    if _instrumented:
+        return
+    from api.v1.compiled import CompiledReader
+
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        serializer_class.data = _timed_property(serializer_class.data)
+    CompiledReader.read = _timed_method(CompiledReader.read)
+    _instrumented = True
+
+
+class MetricsRegistry:
+    """Per-process aggregate of sampled requests, keyed by URL name."""
+
+    def __init__(self, max_slow_queries=20):
+        self.max_slow_queries = max_slow_queries
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = defaultdict(
+                lambda: {
+                    "requests": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "queries": 0,
+                    "sql_ms": 0.0,
+                    "serializer_ms": 0.0,
+                    "n_plus_one_requests": 0,
+                }
+            )
+            self.repeated = defaultdict(Counter)
+            self.slow_queries = []
+
+    def record(self, name, total_seconds, profile, repeated):
+        total_ms = total_seconds * 1000
+        with self.lock:
+            stats = self.endpoints[name]
+            stats["requests"] += 1
+            stats["total_ms"] += total_ms
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            stats["queries"] += profile.queries
+            stats["sql_ms"] += profile.sql_seconds * 1000
+            stats["serializer_ms"] += profile.serializer_seconds * 1000
+            if repeated:
+                stats["n_plus_one_requests"] += 1
+                self.repeated[name].update(repeated)
+
+            self.slow_queries.extend(
+                {"endpoint": name, "ms": ms, "sql": sql}
+                for ms, sql in profile.slow_queries
+            )
+            self.slow_queries.sort(key=lambda query: query["ms"], reverse=True)
+            del self.slow_queries[self.max_slow_queries :]
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = []
+            for name, stats in self.endpoints.items():
+                requests = stats["requests"]
+                endpoints.append(
+                    {
+                        "endpoint": name,
+                        "requests": requests,
+                        "avg_ms": round(stats["total_ms"] / requests, 2),
+                        "max_ms": round(stats["max_ms"], 2),
+                        "avg_queries": round(stats["queries"] / requests, 2),
+                        "avg_sql_ms": round(stats["sql_ms"] / requests, 2),
+                        "avg_serializer_ms": round(
+                            stats["serializer_ms"] / requests, 2
+                        ),
+                        "n_plus_one_requests": stats["n_plus_one_requests"],
+                        "repeated_queries": [
+                            {"sql": sql, "count": count}
+                            for sql, count in self.repeated[name].most_common(5)
+                        ],
+                    }
+                )
+            endpoints.sort(
+                key=lambda endpoint: endpoint["avg_ms"] * endpoint["requests"],
+                reverse=True,
+            )
+            return {"endpoints": endpoints, "slow_queries": list(self.slow_queries)}
+
+
+registry = MetricsRegistry()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests: query count, SQL time, repeated query
+    fingerprints and serializer time, reported in a Server-Timing header and
+    aggregated per URL name for the /internal/metrics endpoint.
+
+    Enabled with PROFILING_ENABLED; PROFILING_SAMPLE_RATE is the fraction of
+    requests profiled, so unsampled requests only pay for a random() call.
+    Queries run while a streaming response is consumed are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.01)
+        self.slow_query_ms = getattr(settings, "PROFILING_SLOW_QUERY_MS", 100)
+        self.repeat_threshold = getattr(settings, "PROFILING_REPEAT_THRESHOLD", 3)
+        instrument_serializers()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile(self.slow_query_ms)
+        token = _active.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _active.reset(token)
+        total_seconds = time.perf_counter() - started
+
+        match = request.resolver_match
+        name = (match.view_name if match else None) or "<unresolved>"
+        repeated = profile.repeated_queries(self.repeat_threshold)
+        registry.record(name, total_seconds, profile, repeated)
+        if repeated:
+            logger.warning(
+                "%s ran %d queries, repeating: %s",
+                name,
+                profile.queries,
+                "; ".join(f"{count}x {sql}" for sql, count in repeated.items()),
+            )
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={profile.sql_seconds * 1000:.2f};desc="{profile.queries} queries"',
+                f"serializer;dur={profile.serializer_seconds * 1000:.2f}",
+                f"total;dur={total_seconds * 1000:.2f}",
+            ]
+            + ([f'n-plus-one;desc="{len(repeated)} repeated"'] if repeated else [])
+        )
+        return response
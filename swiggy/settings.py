@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     "restaurants",
     "accounts",
     "orders",
+    "tasks",
     "corsheaders",
 ]
 
@@ -37,6 +38,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "swiggy.profiling.ProfilingMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -94,11 +96,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Django's defaults with PBKDF2 computed on a bounded thread pool; see
+# accounts/hashers.py and `python -m benchmarks.hashers` for picking rounds
+PASSWORD_HASHERS = [
+    "accounts.hashers.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# PBKDF2 rounds for new and rehashed passwords, never fewer than Django's
+# default (600k), which is also used when unset. Stored hashes with fewer
+# rounds are upgraded to this on their next login; none are downgraded.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", "0"))
+
+# Threads hashing passwords per process; 0 hashes on the request thread
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+)
+
+# Logins within this many seconds of the last recorded one skip the
+# last_login UPDATE
+LAST_LOGIN_RESOLUTION = 300
+
 
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
 
+# Restaurants' opening_time, closing_time and working_days are wall-clock
+# hours in this zone, e.g. for ?open_now=1 on nearby listings
+RESTAURANT_TIME_ZONE = os.environ.get("RESTAURANT_TIME_ZONE", "Asia/Kolkata")
+
 USE_I18N = True
 
 USE_TZ = True
@@ -118,10 +148,20 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 100,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.v1.auth.authentication.ClaimsJWTAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # orjson when it is installed, DRF's stdlib JSON otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.v1.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.v1.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -135,3 +175,95 @@ SIMPLE_JWT = {
 }
 
 AUTH_USER_MODEL = "accounts.User"
+
+# Set REDIS_URL to share cached data and invalidations between worker processes.
+# The per-process cache holds two entries per cached food item (a version and
+# a representation), so it is sized for the whole catalog rather than
+# Django's default of 300, which a single listing page would overflow
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("LOCAL_CACHE_MAX_ENTRIES", 100_000)),
+        },
+    }
+}
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+# Seconds a categories/locations response may be served after a change
+# that another process made, when the cache is not shared
+REFERENCE_CACHE_TIMEOUT = 300
+
+# Lifetime of cached food item representations, which bounds staleness when
+# the cache is not shared between processes
+REPRESENTATION_CACHE_TIMEOUT = 300
+
+# Render restaurant and order listings from .values() rows instead of going
+# through the DRF serializers; the output is identical
+COMPILED_READ_SERIALIZERS = True
+
+# Lifetime of the cached per-restaurant availability bitsets, which bounds
+# staleness when an index is rebuilt while a toggle is committing
+AVAILABILITY_CACHE_TIMEOUT = 60
+
+# Lifetime of cached owner-to-restaurant ids, which bounds staleness when a
+# restaurant changes hands in another process and the cache is not shared
+OWNERSHIP_CACHE_TIMEOUT = 300
+
+# Route catalog reads and logins to the async views in api/v1/*/views.py;
+# only useful under ASGI, see swiggy/settings_asgi.py
+ASYNC_CATALOG_VIEWS = False
+
+# Serve the order feed from sync (WSGI) workers, each stream holding a worker
+# for up to ORDER_FEED_MAX_DURATION seconds; fine for runserver only. Otherwise
+# the feed answers 501 unless served by the ASGI deployment, see README.md
+ORDER_FEED_SYNC_STREAMS = DEBUG
+
+# Seconds of changes re-read by order delta syncs that have caught up, to
+# return orders whose transactions committed after a later watermark was
+# handed out; see api/v1/orders/pagination.py
+ORDER_SYNC_OVERLAP = 60
+
+# Order feed events are written to the database and polled by every process
+# with open feeds, so writes served by any process reach them; see
+# orders/feed.py. orders.feed.InProcessBroker only reaches the writing process.
+ORDER_FEED_BROKER = "orders.feed.DatabaseBroker"
+ORDER_FEED_POLL_INTERVAL = 1.0
+# Seconds an event is read again for, covering inserts that commit late
+ORDER_FEED_POLL_WINDOW = 30
+
+# Per-request SQL and serializer profiling, reported in Server-Timing headers
+# and at /internal/metrics; see swiggy/profiling.py
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED") == "1"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SLOW_QUERY_MS = 100
+PROFILING_REPEAT_THRESHOLD = 3
+
+# Outgoing mail. Order receipt and status emails are only queued when
+# ORDER_EMAILS_ENABLED, which defaults to on once EMAIL_HOST is set
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "587"))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "1") == "1"
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "orders@localhost")
+ORDER_EMAILS_ENABLED = (
+    os.environ.get("ORDER_EMAILS_ENABLED", "1" if EMAIL_HOST else "0") == "1"
+)
+
+# Background tasks, run by `manage.py run_workers`; see tasks/brokers.py.
+# tasks.brokers.ImmediateBroker runs them in the web process instead.
+TASK_BROKER = "tasks.brokers.DatabaseBroker"
+TASK_MAX_ATTEMPTS = 5
+# Retries wait TASK_RETRY_BACKOFF * 2**(attempts - 1) seconds, at most the max
+TASK_RETRY_BACKOFF = 10
+TASK_RETRY_BACKOFF_MAX = 3600
+# Running tasks are handed to another worker after this long
+TASK_LEASE_SECONDS = 600
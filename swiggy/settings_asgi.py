@@ -0,0 +1,24 @@
+from .settings_production import *
+
+# ASGI deployment profile, served by gunicorn with uvicorn workers:
+#   gunicorn swiggy.asgi -c swiggy/gunicorn_asgi.py
+# with DJANGO_SETTINGS_MODULE=swiggy.settings_asgi
+
+# Serve restaurant, food item, category and location reads, and logins, from
+# the async views
+ASYNC_CATALOG_VIEWS = True
+
+# Sync-only middleware makes Django run the rest of the chain in a thread, so
+# it is left out here; static files are expected to be served by the proxy
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in (
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+        "swiggy.profiling.ProfilingMiddleware",
+    )
+]
+
+# Persistent connections are not reused across async requests
+DATABASES["default"] = dj_database_url.config(conn_max_age=0, ssl_require=True)
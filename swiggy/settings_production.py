@@ -3,6 +3,9 @@ from .settings import *
 # Production settings
 DEBUG = False
 
+# Sync workers must not be held by order feed streams, see settings_asgi.py
+ORDER_FEED_SYNC_STREAMS = False
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
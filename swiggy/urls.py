@@ -8,6 +8,11 @@ from swiggy import views
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", views.home_view, name="home"),
+    path(
+        "internal/metrics",
+        views.ProfilingMetricsView.as_view(),
+        name="internal-metrics",
+    ),
     path("api/v1/restaurants/", include("api.v1.restaurants.urls")),
     path("api/v1/categories/", include("api.v1.categories.urls")),
     path("api/v1/auth/", include("api.v1.auth.urls")),
@@ -1,7 +1,25 @@
 from django.http import JsonResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from swiggy.profiling import registry
 
 
 def home_view(request):
     return JsonResponse(
         {"message": "Welcome to the API! Use /api/v1/ for the endpoints."}
     )
+
+
+class ProfilingMetricsView(APIView):
+    """Aggregated ProfilingMiddleware samples of this process."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(registry.snapshot())
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=204)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from tasks.models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "attempts", "run_at", "created_at"]
+    list_filter = ["status", "name"]
+
+
+admin.site.register(Task, TaskAdmin)
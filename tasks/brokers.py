@@ -0,0 +1,118 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import resolve
+
+logger = logging.getLogger(__name__)
+
+
+class BaseBroker:
+    """
+    Storage for queued tasks. enqueue() is called inside the caller's
+    transaction and must not make the task runnable before it commits.
+    Workers claim() due tasks, which come back as Task instances (saved or
+    not), and report each one with complete(), retry() or fail().
+    """
+
+    def enqueue(self, name, args, kwargs, max_attempts):
+        raise NotImplementedError
+
+    def enqueue_many(self, tasks):
+        """enqueue() each of these (name, args, kwargs, max_attempts) tuples."""
+        for task in tasks:
+            self.enqueue(*task)
+
+    def claim(self, worker_id, limit):
+        raise NotImplementedError
+
+    def complete(self, task):
+        raise NotImplementedError
+
+    def retry(self, task, error, run_at):
+        raise NotImplementedError
+
+    def fail(self, task, error):
+        raise NotImplementedError
+
+
+class DatabaseBroker(BaseBroker):
+    """
+    Tasks as rows of tasks_task. They are inserted in the enqueuing
+    transaction, so they commit or roll back with the work that queued them.
+    Claims skip rows other workers have locked where the database supports
+    it, and running tasks whose worker held them past TASK_LEASE_SECONDS,
+    e.g. because it died, are claimed again.
+    """
+
+    def enqueue(self, name, args, kwargs, max_attempts):
+        self.enqueue_many([(name, args, kwargs, max_attempts)])
+
+    def enqueue_many(self, tasks):
+        Task.objects.bulk_create(
+            [
+                Task(name=name, args=args, kwargs=kwargs, max_attempts=max_attempts)
+                for name, args, kwargs, max_attempts in tasks
+            ]
+        )
+
+    def claim(self, worker_id, limit):
+        now = timezone.now()
+        lease = timedelta(seconds=getattr(settings, "TASK_LEASE_SECONDS", 600))
+        claimable = Q(status=Task.QUEUED, run_at__lte=now) | Q(
+            status=Task.RUNNING, locked_at__lt=now - lease
+        )
+        with transaction.atomic():
+            candidates = Task.objects.filter(claimable).order_by("run_at", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            pks = list(candidates.values_list("id", flat=True)[:limit])
+            # Rows another worker claimed since they were read no longer match
+            Task.objects.filter(claimable, pk__in=pks).update(
+                status=Task.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+        return list(
+            Task.objects.filter(
+                pk__in=pks, status=Task.RUNNING, locked_by=worker_id, locked_at=now
+            ).order_by("run_at", "id")
+        )
+
+    def complete(self, task):
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()
+
+    def retry(self, task, error, run_at):
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+            status=Task.QUEUED, run_at=run_at, locked_by="", last_error=error
+        )
+
+    def fail(self, task, error):
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+            status=Task.FAILED, locked_by="", last_error=error
+        )
+
+
+class ImmediateBroker(BaseBroker):
+    """
+    Runs each task in the enqueuing process once its transaction commits,
+    once and without retries, so no worker is needed. For development.
+    """
+
+    def enqueue(self, name, args, kwargs, max_attempts):
+        def run():
+            try:
+                resolve(name)(*args, **kwargs)
+            except Exception:
+                logger.exception("Task %s failed", name)
+
+        transaction.on_commit(run)
+
+    def claim(self, worker_id, limit):
+        return []
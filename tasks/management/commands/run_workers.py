@@ -0,0 +1,44 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks, such as order receipts. Start one per "
+        "host or container; SIGTERM lets running tasks finish before exiting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Tasks run at the same time by this process.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between checks for due tasks while idle.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no task is due, e.g. when run from cron.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=max(options["concurrency"], 1),
+            poll_interval=options["poll_interval"],
+        )
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(
+            f"Worker {worker.worker_id} running {worker.concurrency} task(s) at a time"
+        )
+        worker.run(once=options["once"])
@@ -0,0 +1,51 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A queued call of a function registered with @task, stored by
+    tasks.brokers.DatabaseBroker. Finished tasks are deleted; failed ones are
+    kept with their last error.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "tasks_task"
+        indexes = [
+            # Workers poll for due tasks and for running ones whose lease ran out
+            models.Index(
+                fields=["run_at"],
+                condition=models.Q(status="queued"),
+                name="task_due_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="task_leased_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
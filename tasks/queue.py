@@ -0,0 +1,71 @@
+import random
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def task(max_attempts=None):
+    """
+    Register a function as a task, run by workers with the JSON-serializable
+    arguments given to enqueue(). Failed attempts are retried with backoff up
+    to `max_attempts` times, TASK_MAX_ATTEMPTS by default, so tasks must be
+    safe to run more than once.
+    """
+
+    def register(func):
+        func.task_name = f"{func.__module__}.{func.__qualname__}"
+        func.max_attempts = max_attempts
+        return func
+
+    return register
+
+
+def resolve(name):
+    """The registered task function called `name`."""
+    func = import_string(name)
+    if getattr(func, "task_name", None) != name:
+        raise ImportError(f"{name} is not a registered task")
+    return func
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_class = getattr(
+                settings, "TASK_BROKER", "tasks.brokers.DatabaseBroker"
+            )
+            _broker = import_string(broker_class)()
+        return _broker
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Queue a call of the task `func`. It runs after the surrounding
+    transaction commits, and not at all if it rolls back.
+    """
+    enqueue_many(func, [args], kwargs)
+
+
+def enqueue_many(func, calls, kwargs=None):
+    """
+    enqueue() `func` once per tuple of positional arguments in `calls`, e.g.
+    one task per order, written together where the broker supports it.
+    """
+    max_attempts = func.max_attempts or getattr(settings, "TASK_MAX_ATTEMPTS", 5)
+    get_broker().enqueue_many(
+        [(func.task_name, list(args), kwargs or {}, max_attempts) for args in calls]
+    )
+
+
+def retry_delay(attempts):
+    """Seconds before retrying a task that failed `attempts` times."""
+    base = getattr(settings, "TASK_RETRY_BACKOFF", 10)
+    cap = getattr(settings, "TASK_RETRY_BACKOFF_MAX", 3600)
+    delay = min(base * 2 ** (attempts - 1), cap)
+    # Jitter keeps tasks that failed together from retrying together
+    return delay * random.uniform(1, 1.25)
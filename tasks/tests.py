@@ -0,0 +1,184 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from orders.models import Order
+from orders.tests import OrderFixtureMixin
+from tasks.brokers import DatabaseBroker
+from tasks.models import Task
+from tasks.queue import enqueue, task
+from tasks.worker import Worker
+
+calls = []
+
+
+@task(max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail():
+    raise RuntimeError("unavailable")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.broker = DatabaseBroker()
+
+    def work(self):
+        Worker(self.broker).run(once=True)
+
+    def test_tasks_run_after_commit_only(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            enqueue(record, "rolled back")
+            raise ValueError
+        enqueue(record, "committed")
+
+        self.work()
+        self.assertEqual(calls, ["committed"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failures_are_retried_with_backoff_then_kept(self):
+        enqueue(fail)
+        self.work()
+
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.QUEUED, 1))
+        self.assertIn("RuntimeError: unavailable", failed.last_error)
+        self.assertGreaterEqual(failed.run_at, timezone.now() + timedelta(seconds=9))
+
+        # Not due yet
+        self.work()
+        self.assertEqual(Task.objects.get().attempts, 1)
+
+        Task.objects.update(run_at=timezone.now())
+        self.work()
+        self.assertEqual(
+            Task.objects.values_list("status", "attempts").get(), (Task.FAILED, 2)
+        )
+
+    def test_claims_respect_the_limit_and_expired_leases(self):
+        for value in range(3):
+            enqueue(record, value)
+        claimed = self.broker.claim("worker-a", 2)
+        self.assertEqual([task.args for task in claimed], [[0], [1]])
+        self.assertEqual(len(self.broker.claim("worker-b", 5)), 1)
+        self.assertEqual(self.broker.claim("worker-c", 5), [])
+
+        Task.objects.filter(pk=claimed[0].pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        reclaimed = self.broker.claim("worker-c", 5)
+        self.assertEqual([task.pk for task in reclaimed], [claimed[0].pk])
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+        # The first worker lost the task, so its result is ignored
+        self.broker.complete(claimed[0])
+        self.assertTrue(Task.objects.filter(pk=claimed[0].pk).exists())
+
+
+@override_settings(ORDER_EMAILS_ENABLED=True)
+class OrderTaskTests(OrderFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer.email = "customer@example.com"
+        self.customer.save()
+        # The fixture's images queued their resizing
+        Task.objects.all().delete()
+
+    def test_orders_and_status_changes_only_enqueue_in_the_request(self):
+        with mock.patch("django.core.mail.EmailMessage.send") as send:
+            response = self.client.post(
+                reverse("order-list-create"),
+                self.order_payload(self.menu[:2]),
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        send.assert_not_called()
+        self.assertEqual(Task.objects.get().name, "orders.tasks.send_order_receipt")
+
+        self.client.force_authenticate(self.restaurant.owner_name)
+        self.client.patch(
+            reverse("order-list-detail", args=[response.data["id"]]),
+            {"status": "PROCESSING"},
+            format="json",
+        )
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(mail.outbox, [])
+
+        Worker().run(once=True)
+        order = Order.objects.get()
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            [
+                f"Your order {order.order_id} from {self.restaurant.name}",
+                f"Your order {order.order_id} is processing",
+            ],
+        )
+        self.assertIn("Total: 162.00", mail.outbox[0].body)
+        self.assertFalse(Task.objects.exists())
+
+    def test_a_failed_receipt_is_retried_without_resending_the_others(self):
+        response = self.client.post(
+            reverse("order-batch-create"),
+            {
+                "orders": [
+                    self.order_payload(self.menu[:1]),
+                    self.order_payload(self.menu[1:2]),
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.count(), 2)
+
+        send = mail.EmailMessage.send
+        calls = []
+
+        def fail_first(message, *args, **kwargs):
+            calls.append(message.subject)
+            if len(calls) == 1:
+                raise ConnectionRefusedError
+            return send(message, *args, **kwargs)
+
+        with mock.patch("django.core.mail.EmailMessage.send", fail_first):
+            Worker().run(once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        failed = Task.objects.get()
+        self.assertEqual(failed.attempts, 1)
+
+        Task.objects.update(run_at=timezone.now())
+        Worker().run(once=True)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(len({message.subject for message in mail.outbox}), 2)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(ORDER_EMAILS_ENABLED=False)
+    def test_nothing_is_queued_without_order_emails(self):
+        response = self.client.post(
+            reverse("order-list-create"),
+            self.order_payload(self.menu[:1]),
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_BROKER="tasks.brokers.ImmediateBroker")
+    def test_immediate_broker_runs_on_commit(self):
+        with mock.patch("tasks.queue._broker", None):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse("order-list-create"),
+                    self.order_payload(self.menu[:1]),
+                    format="json",
+                )
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,104 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.db import DatabaseError, close_old_connections, connections
+from django.utils import timezone
+
+from tasks.queue import get_broker, resolve, retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Claims due tasks from the broker and runs up to `concurrency` of them at a
+    time on threads, or on the calling thread when `concurrency` is 1. Polls
+    every `poll_interval` seconds while idle. stop() lets running tasks finish.
+    """
+
+    def __init__(self, broker=None, concurrency=1, poll_interval=1.0):
+        self.broker = broker or get_broker()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.stopping = threading.Event()
+
+    def stop(self):
+        self.stopping.set()
+
+    def run(self, once=False):
+        """Work until stop(), or with `once` until no task is due."""
+        if self.concurrency == 1:
+            return self._run_inline(once)
+
+        running = set()
+        with ThreadPoolExecutor(self.concurrency, "task-worker") as pool:
+            while not self.stopping.is_set():
+                tasks = self._claim(self.concurrency - len(running))
+                running |= {
+                    pool.submit(self._run_in_thread, task) for task in tasks or ()
+                }
+                if once and not running and tasks is not None:
+                    break
+                if running:
+                    _, running = wait(
+                        running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                    )
+                else:
+                    self.stopping.wait(self.poll_interval)
+
+    def _run_inline(self, once):
+        while not self.stopping.is_set():
+            tasks = self._claim(1)
+            for task in tasks or ():
+                self.run_task(task)
+            if not tasks:
+                if once and tasks is not None:
+                    break
+                self.stopping.wait(self.poll_interval)
+
+    def _claim(self, limit):
+        """Up to `limit` due tasks, or None when the broker could not be read."""
+        if limit <= 0:
+            return []
+        close_old_connections()
+        try:
+            return self.broker.claim(self.worker_id, limit)
+        except DatabaseError:
+            logger.exception("Claiming tasks failed")
+            return None
+
+    def _run_in_thread(self, task):
+        try:
+            self.run_task(task)
+        finally:
+            # Pool threads are reused, so nothing else closes their connections
+            connections.close_all()
+
+    def run_task(self, task):
+        try:
+            resolve(task.name)(*task.args, **task.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if task.attempts < task.max_attempts:
+                run_at = timezone.now() + timedelta(seconds=retry_delay(task.attempts))
+                logger.warning(
+                    "Task %s %s failed, retrying at %s", task.name, task.pk, run_at
+                )
+                self.broker.retry(task, error, run_at)
+            else:
+                logger.error(
+                    "Task %s %s failed %s times, giving up",
+                    task.name,
+                    task.pk,
+                    task.attempts,
+                )
+                self.broker.fail(task, error)
+            return False
+        self.broker.complete(task)
+        return True